@@ -10,19 +10,32 @@ from pymongo import MongoClient
 import uuid
 from chat.context import ChatContext
 from chat.prompt import build_prompt
-from chat.ollama_client import ollama_chat
-from central_agent import CentralAgent, BillingService, AuthService
+from chat.ollama_client import get_default_client
+from central_agent import CentralAgent, AgentConfig, BillingService, AuthService
+from db.session_backend import MongoSessionBackend
 from mock_apis import MockTelecomAPIs
 import tempfile
 import asyncio
 import edge_tts
 import base64
 
-services = {
-    "billing": BillingService(),
-    "auth": AuthService()
-}
-agent = CentralAgent(ollama_chat_func=ollama_chat, external_services=services)
+# Ajan her yeniden çalıştırmada değil, süreç başına bir kez oluşturulur; arka planda
+# tamamlanan duygu analizi sonuçları da aynı ajan üzerinde görünür
+@st.cache_resource(show_spinner=False)
+def get_agent():
+    services = {
+        "billing": BillingService(),
+        "auth": AuthService()
+    }
+    # Tüm oturumlar aynı bağlantı havuzunu paylaşır
+    llm_client = get_default_client()
+    # Konuşma durumu MongoDB'de; birden fazla worker süreci aynı oturumu sürdürebilir
+    config = AgentConfig()
+    session_backend = MongoSessionBackend("mongodb://localhost:27017/", "callcenter", ttl_seconds=config.session_idle_ttl)
+    return CentralAgent(ollama_chat_func=llm_client, external_services=services, config=config,
+                        session_backend=session_backend)
+
+agent = get_agent()
 
 st.set_page_config(page_title="Sanal Telekom Çağrı Merkezi", page_icon="📞", layout="wide")
 
@@ -189,9 +202,13 @@ with st.sidebar:
         test_customers,
         format_func=lambda x: f"{x} - {MockTelecomAPIs().customers[x]['name']} {MockTelecomAPIs().customers[x]['surname']}"
     )
+    # Müşteri seçimi oturum başlangıcıdır: ilk mesaj yazılırken müşteri ve fatura verisi önbelleğe çekilir
+    if st.session_state.get("oturum_musterisi") != selected_customer:
+        st.session_state["oturum_musterisi"] = selected_customer
+        agent.start_session(selected_customer)
     if st.button("Müşteri Bilgilerini Göster"):
-        from mock_apis import getUserInfo
-        customer_info = getUserInfo(selected_customer)
+        from tools import call_api
+        customer_info = call_api("getUserInfo", selected_customer)
         if customer_info["success"]:
             st.json(customer_info["data"])
         else:
@@ -260,9 +277,16 @@ with st.container():
         send = st.form_submit_button("Gönder")
         if send and user_input:
             messages_col.insert_one({"user_id": selected_customer, "role": "user", "message": user_input})
+            yanit_akisi = agent.generate_response_stream(user_input, selected_customer)
+            # Spinner sadece ilk token gelene kadar gösterilir, sonrası balonda akar
             with st.spinner("🤖 Ajan düşünüyor..."):
-                bot_response = agent.generate_response(user_input, selected_customer)
-                messages_col.insert_one({"user_id": selected_customer, "role": "bot", "message": bot_response})
+                bot_response = next(yanit_akisi, "")
+            yanit_alani = st.empty()
+            for parca in yanit_akisi:
+                bot_response += parca
+                yanit_alani.markdown(f'<div class="sohbet-bubble-bot"><span style="font-size:1.3rem;">🤖</span> <span><strong>Bot:</strong> {bot_response}▌</span></div>', unsafe_allow_html=True)
+            yanit_alani.markdown(f'<div class="sohbet-bubble-bot"><span style="font-size:1.3rem;">🤖</span> <span><strong>Bot:</strong> {bot_response}</span></div>', unsafe_allow_html=True)
+            messages_col.insert_one({"user_id": selected_customer, "role": "bot", "message": bot_response})
             st.session_state.chat_history = get_chat_history(selected_customer)
             st.rerun()
     col_temizle, col_durum = st.columns([1,1])
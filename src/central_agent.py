@@ -1,9 +1,14 @@
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import copy
 from enum import Enum
 import asyncio
+import os
+import threading
 import time
 from tools import (
     get_customer_info,
@@ -15,10 +20,38 @@ from tools import (
     process_payment,
     get_contract_info,
     activate_service,
-    search_knowledge_base
+    search_knowledge_base,
+    prefetch_user_data,
+    is_prefetched,
+    TOOL_PREFETCH_CALLS,
+    aget_customer_info,
+    aget_billing_info,
+    aget_packages,
+    achange_package,
+    areset_password,
+    acreate_ticket,
+    aprocess_payment,
+    aget_contract_info,
+    aactivate_service,
+    asearch_knowledge_base
 )
 import re
 import random
+from chat.ollama_client import AsyncOllamaClient, OllamaClient
+from chat.schemas import INTENT_SCHEMA, SENTIMENT_SCHEMA, TURN_ANALYSIS_SCHEMA
+from intent_cache import SemanticIntentCache
+from intent_classifier import DEFAULT_MODEL_PATH, LocalIntentClassifier
+from response_templates import ResponseRenderer
+from session_store import SessionStore
+from db.session_backend import SessionBackend
+from message_history import MessageHistory
+from fast_path import DEFAULT_ROUTER, FastPathRouter, RATING_ROUTE, CLOSING_ROUTE, THANKS_ROUTE
+from tool_executor import ToolExecutor, CRITICAL_TOOLS, deadline_result, tool_call_key
+from deadline import Deadline
+from tool_planner import ToolPlanner, RESPONSE_PRIORITY
+from slot_filling import SlotFiller
+from intent_decomposer import IntentDecomposer, distinct_intents, merge_analyses
+from intent_transitions import SESSION_GAP, IntentTransitionModel, append_log
 
 # Logging ayarları
 logging.basicConfig(level=logging.INFO)
@@ -49,39 +82,230 @@ class ToolType(Enum):
     ACTIVATE_SERVICE = "hizmet_aktifleştir"
     SEARCH_KNOWLEDGE_BASE = "bilgi_tabanı_ara"
 
+# Hızlı yol yanıtları
+TESEKKUR_YANITLARI = (
+    "Rica ederim, size yardımcı olmaktan memnuniyet duydum.",
+    "Ne demek, her zaman hizmetinizdeyiz.",
+    "Yardımcı olabildiysem ne mutlu bana. Başka bir konuda destek gerekirse çekinmeden yazabilirsiniz.",
+    "Teşekkür ederim, size en iyi hizmeti sunmaya devam edeceğiz."
+)
+KAPANIS_YANITLARI = (
+    "Size yardımcı olmaktan memnuniyet duydum. İyi günler dilerim.",
+    "Görüşmek üzere, sağlıklı günler dilerim.",
+    "Size hizmet vermekten mutluluk duydum. Hoşça kalın.",
+    "İyi günler, tekrar görüşmek dileğiyle."
+)
+SELAMLASMA_YANITLARI = (
+    "Merhaba, size nasıl yardımcı olabilirim?",
+    "Merhaba! Fatura, paket, ödeme veya teknik destek konularında size yardımcı olabilirim.",
+)
+DEVAM_SORUSU = "\n\nBaşka bir isteğiniz var mı?"
+GECICI_HATA_YANITI = (
+    "Sistemde geçici bir sorun oluştu. Lütfen daha sonra tekrar deneyin veya destek ekibimizle iletişime geçin."
+)
+ANKET_SORUSU = "Birkaç dakika ayırıp hizmetimizi 10 puan üzerinden değerlendirir misiniz? (1-10 arası bir sayı yazın)"
+
+@dataclass
+class AgentConfig:
+    """CentralAgent çalışma modu ayarları"""
+    # Niyet JSON'u akarken required_tools ve parameters tamamlanınca salt-okunur araçları başlat
+    stream_tool_dispatch: bool = True
+    max_tool_workers: int = 4
+    # Niyet, araçlar, parametreler ve duygu analizini tek yapılandırılmış LLM çağrısında al
+    combined_analysis: bool = False
+    max_background_workers: int = 2
+    # Yerel niyet sınıflandırıcı (intent_classifier.py ile eğitilir); dosya yoksa kullanılmaz
+    intent_classifier_path: Optional[str] = DEFAULT_MODEL_PATH
+    local_intent_threshold: float = 0.85
+    # LLM niyet analizlerinin sınıflandırıcı eğitimi için yazılacağı JSONL dosyası
+    intent_log_path: Optional[str] = None
+    # Şablonu olan araç sonuçlarını (fatura, ödeme, paket, şifre) da LLM ile özetle
+    llm_summarization: bool = False
+    # Bellekte tutulacak en fazla oturum, boşta kalan oturumun silinme süresi (sn, None: süresiz)
+    # ve oturum başına saklanan en fazla mesaj
+    max_sessions: int = 10000
+    session_idle_ttl: Optional[float] = 1800
+    max_history_messages: int = 50
+    # Oturum başında (müşteri seçilince) müşteri ve fatura verisini arka planda önbelleğe al
+    session_prefetch: bool = True
+    # Tur süre bütçesi (sn, None: sınırsız). Kalan süre azaldıkça sırasıyla LLM duygu analizi,
+    # LLM niyet analizi (anahtar kelimeye düşülür) ve LLM özeti (ham araç metni) atlanır
+    turn_budget_seconds: Optional[float] = 30.0
+    # Bir LLM aşamasının bütçe hesabında kullanılan tahmini süresi (sn)
+    llm_stage_seconds: float = 5.0
+    # generate_responses'ta aynı anda işlenen kullanıcı/LLM çağrısı sayısı
+    batch_workers: int = 8
+    # Birleşik istekleri alt niyetlere bölüp tek turda yanıtla
+    multi_intent: bool = True
+    # Turların (kullanıcı, niyet, araçlar) yazıldığı JSONL; açılışta niyet geçiş tablosu buradan kurulur
+    conversation_log_path: Optional[str] = None
+    # Yanıttan sonra olası sonraki araç sonuçlarını arka planda önbelleğe al: en düşük olasılık ve
+    # tur başına harcanabilecek tahmini backend süresi (sn, Tool.expected_latency toplamı)
+    speculative_prefetch: bool = True
+    speculative_min_probability: float = 0.3
+    speculative_cost_cap: float = 1.0
+
 @dataclass
 class Tool:
     name: str
     description: str
     parameters: Dict[str, Any]
     function: callable
+    # agenerate_response yolunda kullanılan asenkron karşılığı
+    async_function: Optional[Callable] = None
+    # Sistemde değişiklik yapmaz; niyet analizi bitmeden ve paralel başlatılabilir
+    read_only: bool = False
+    # Ortalama backend gecikmesi (sn); planlayıcı yavaş okumaları önce başlatır
+    expected_latency: float = 0.0
+    # Sonucu tool_cache.py'de kullanıcı bazında önbelleğe alınır
+    cacheable: bool = False
+    # Plandaysa bu araçtan önce çalışması gereken araçlar
+    depends_on: Tuple[str, ...] = ()
 
-@dataclass
+@dataclass(slots=True)
 class ConversationState:
     user_id: str
     current_intent: Optional[IntentType] = None
     context: Dict[str, Any] = None
-    pending_actions: List[str] = None
-    conversation_history: List[Dict[str, str]] = None
+    # Cevabı beklenen slot ve bekleyen araç çağrıları (slot_filling.py)
+    pending_actions: List[Dict[str, Any]] = None
+    # Son max_history mesajı tutan halka tampon; [-5:] gibi dilimler sözlük listesi döndürür
+    conversation_history: MessageHistory = None
+    # Memnuniyet verileri; oturumla birlikte silinir
+    satisfaction_rating: Optional[int] = None
+    sentiment_result: Optional[Dict[str, Any]] = None
+    sentiment_seq: int = 0
+    survey_shown: bool = False
+    # Niyet geçiş kaydının oturum anahtarı: oturumun ilk mesajının zamanı
+    session_id: Optional[str] = None
+    max_history: Optional[int] = None
     
     def __post_init__(self):
         if self.context is None:
             self.context = {}
         if self.pending_actions is None:
             self.pending_actions = []
-        if self.conversation_history is None:
-            self.conversation_history = []
+        if not isinstance(self.conversation_history, MessageHistory):
+            self.conversation_history = MessageHistory(self.max_history, self.conversation_history)
+
+    def add_message(self, role: str, message: str):
+        """Geçmişe mesaj ekler; kapasite doluysa en eski mesajın üzerine yazılır"""
+        self.conversation_history.append(role, message)
+
+    def to_record(self) -> Dict[str, Any]:
+        """Oturum arka ucu için kısa anahtarlı kayıt; geçmiş sütunlar halinde yazılır"""
+        return {
+            "u": self.user_id,
+            "i": self.current_intent.value if self.current_intent else None,
+            "c": self.context,
+            "p": self.pending_actions,
+            "h": self.conversation_history.columns(),
+            "r": self.satisfaction_rating,
+            "s": self.sentiment_result,
+            "q": self.sentiment_seq,
+            "a": self.survey_shown,
+            "o": self.session_id,
+        }
+
+    def sentiment_fields(self) -> Dict[str, Any]:
+        """Duygu sonucunun kayıttaki alanı (SessionStore.update ile tek başına yazılır)"""
+        return {"s": self.sentiment_result}
+
+    def merge_remote(self, remote: "ConversationState"):
+        """Yazma çakışmasında arka uçtaki kaydı yerel duruma katar.
+
+        Başka worker'da işlenen turun mesajları geçmişe zaman sırasıyla eklenir,
+        yerelde olmayan memnuniyet verisi alınır. Niyet, bağlam ve bekleyen
+        işlemler bu turu işleyen yerel kopyadan gelir.
+        """
+        seen = {(m["timestamp"], m["role"], m["message"]) for m in self.conversation_history}
+        extra = [m for m in remote.conversation_history if (m["timestamp"], m["role"], m["message"]) not in seen]
+        if extra:
+            merged = sorted([*self.conversation_history, *extra], key=lambda m: m["timestamp"])
+            self.conversation_history = MessageHistory(self.conversation_history.capacity, merged)
+        if remote.sentiment_seq > self.sentiment_seq:
+            self.sentiment_seq = remote.sentiment_seq
+            self.sentiment_result = remote.sentiment_result
+        elif self.sentiment_result is None:
+            self.sentiment_result = remote.sentiment_result
+        if self.satisfaction_rating is None:
+            self.satisfaction_rating = remote.satisfaction_rating
+        self.survey_shown = self.survey_shown or remote.survey_shown
+
+    @classmethod
+    def from_record(cls, record: Dict[str, Any], max_history: Optional[int] = None) -> "ConversationState":
+        return cls(
+            user_id=record["u"],
+            current_intent=IntentType(record["i"]) if record.get("i") else None,
+            context=record.get("c") or {},
+            pending_actions=record.get("p") or [],
+            conversation_history=MessageHistory.from_columns(max_history, *record["h"]),
+            satisfaction_rating=record.get("r"),
+            sentiment_result=record.get("s"),
+            sentiment_seq=record.get("q", 0),
+            survey_shown=record.get("a", False),
+            session_id=record.get("o"),
+            max_history=max_history,
+        )
 
 class CentralAgent:
-    def __init__(self, ollama_chat_func, external_services=None):
+    def __init__(self, ollama_chat_func, external_services=None, intent_cache: Optional[SemanticIntentCache] = None,
+                 config: Optional[AgentConfig] = None, async_llm_client: Optional[AsyncOllamaClient] = None,
+                 fast_path: Optional[FastPathRouter] = None,
+                 intent_classifier: Optional[LocalIntentClassifier] = None,
+                 session_backend: Optional[SessionBackend] = None):
         self.ollama_chat = ollama_chat_func
+        self.config = config or AgentConfig()
+        # OllamaClient verilirse akış ve çağrı noktasına göre önbellek kullanılır
+        self.llm_client = ollama_chat_func if isinstance(ollama_chat_func, OllamaClient) else None
+        # agenerate_response için; verilmezse senkron istemci thread'de çalıştırılır
+        self.async_llm_client = async_llm_client
         self.external_services = external_services or {}
-        self.conversation_states: Dict[str, ConversationState] = {}
+        # Oturumlar (konuşma durumu + memnuniyet verileri) sınırlı, LRU ve boşta kalma süreli depoda
+        # session_backend verilirse (ör. MongoSessionBackend) depo onun önünde okuma önbelleğidir ve
+        # durum tur sonunda geri yazılır; böylece aynı kullanıcı farklı worker süreçlerine düşebilir
+        max_history = self.config.max_history_messages
+        self.sessions = SessionStore(
+            lambda user_id: ConversationState(user_id=user_id, max_history=max_history),
+            max_sessions=self.config.max_sessions, idle_ttl=self.config.session_idle_ttl,
+            backend=session_backend, dumps=ConversationState.to_record,
+            loads=lambda record: ConversationState.from_record(record, max_history),
+            merge=ConversationState.merge_remote
+        )
+        # Benzer mesajlar için LLM niyet analizini atlayan önbellek (None ile kapatılabilir)
+        self.intent_cache = intent_cache if intent_cache is not None else SemanticIntentCache()
+        # Güveni yüksek mesajlarda LLM niyet çağrısı yerine yerel model kullanılır
+        self.intent_classifier = intent_classifier or self._load_intent_classifier()
+        self._intent_log_lock = threading.Lock()
         self.tools = self._initialize_tools()
-        # Memnuniyet verilerini agent içinde sakla
-        self.satisfaction_ratings = {}
-        self.sentiment_results = {}
-        self.satisfaction_survey_shown = {}
+        # required_tools'u tekrarsız, kullanılmayacak okumalardan arınmış ve sıralı plana çevirir
+        self.tool_planner = ToolPlanner(self.tools, critical_tools=CRITICAL_TOOLS)
+        # Eksik parametreyi sorar; kullanıcının yanıtı LLM'siz ayrıştırılıp bekleyen araçlar çalıştırılır
+        self.slot_filler = SlotFiller(self.tools)
+        # Birleşik isteklerin alt niyetleri ve yanıt özetleri bu havuzda eşzamanlı üretilir
+        self.intent_decomposer = IntentDecomposer()
+        self._subintent_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="subintent")
+        # Niyet geçiş tablosu; tur sonunda olası sonraki okumalar ısıtılır
+        self.transitions = self._load_transitions()
+        self._conversation_log_lock = threading.Lock()
+        self.response_renderer = ResponseRenderer()
+        # Puan, kapanış, teşekkür ve selamlaşma mesajları LLM'e gitmeden yanıtlanır
+        self.fast_path = fast_path or DEFAULT_ROUTER
+        # Bağımsız salt-okunur araçlar paralel, yazma araçları sırayla çalışır
+        self.tool_executor = ToolExecutor(
+            self._execute_tool, self._is_read_only,
+            max_workers=self.config.max_tool_workers, aexecute=self._aexecute_tool
+        )
+        # Duygu analizi yanıtı bekletmez, arka planda çalışıp sonucu oturumun sentiment_result alanına yazar;
+        # konuşma kaydı satırları da bu havuzda yazılır
+        self._background_pool = ThreadPoolExecutor(max_workers=self.config.max_background_workers, thread_name_prefix="sentiment")
+        self._sentiment_lock = threading.Lock()
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+        # Kuyrukta bekleyen veya süren tahmini ön yüklemeler (kullanıcı, çağrı); aynı çağrı yeniden gönderilmez
+        self._speculative_pending = set()
+        self._speculative_lock = threading.Lock()
+        # Asenkron duygu analizi görevleri; referans tutulmazsa görev tamamlanmadan toplanabilir
+        self._background_tasks = set()
         
     def _initialize_tools(self) -> Dict[str, Tool]:
         """Kullanılabilir araçları tanımlar"""
@@ -90,72 +314,212 @@ class CentralAgent:
                 name="Müşteri Bilgilerini Al",
                 description="Müşterinin hesap bilgilerini, paket durumunu ve fatura geçmişini getirir",
                 parameters={"user_id": "string"},
-                function=get_customer_info
+                function=get_customer_info,
+                async_function=aget_customer_info,
+                read_only=True, expected_latency=0.3, cacheable=True
             ),
             ToolType.GET_BILLING_INFO.value: Tool(
                 name="Fatura Bilgilerini Al",
                 description="Müşterinin güncel ve geçmiş faturalarını getirir",
                 parameters={"user_id": "string", "period": "string"},
-                function=get_billing_info
+                function=get_billing_info,
+                async_function=aget_billing_info,
+                read_only=True, expected_latency=0.4, cacheable=True
             ),
             ToolType.GET_PACKAGES.value: Tool(
                 name="Paket Listesini Al",
                 description="Müşterinin mevcut paketini ve değiştirebileceği paketleri listeler",
                 parameters={"user_id": "string"},
-                function=get_packages
+                function=get_packages,
+                async_function=aget_packages,
+                read_only=True, expected_latency=0.5, cacheable=True
             ),
             ToolType.CHANGE_PACKAGE.value: Tool(
                 name="Paket Değiştir",
                 description="Müşterinin paketini değiştirir",
                 parameters={"user_id": "string", "new_package_id": "string"},
-                function=change_package
+                function=change_package,
+                async_function=achange_package,
+                expected_latency=1.0, depends_on=(ToolType.GET_CUSTOMER_INFO.value,)
             ),
             ToolType.RESET_PASSWORD.value: Tool(
                 name="Şifre Sıfırla",
                 description="Müşterinin şifresini sıfırlar ve e-posta gönderir",
                 parameters={"user_id": "string"},
-                function=reset_password
+                function=reset_password,
+                async_function=areset_password,
+                expected_latency=0.75, depends_on=(ToolType.GET_CUSTOMER_INFO.value,)
             ),
             ToolType.CREATE_TICKET.value: Tool(
                 name="Destek Talebi Oluştur",
                 description="Teknik destek talebi oluşturur",
                 parameters={"user_id": "string", "issue_type": "string", "description": "string"},
-                function=create_ticket
+                function=create_ticket,
+                async_function=acreate_ticket,
+                expected_latency=0.55
             ),
             ToolType.PROCESS_PAYMENT.value: Tool(
                 name="Ödeme İşlemi",
                 description="Fatura ödemesi işlemi yapar",
                 parameters={"user_id": "string", "amount": "float", "payment_method": "string"},
-                function=process_payment
+                function=process_payment,
+                async_function=aprocess_payment,
+                expected_latency=1.5, depends_on=(ToolType.GET_CUSTOMER_INFO.value,)
             ),
             ToolType.GET_CONTRACT_INFO.value: Tool(
                 name="Sözleşme Bilgilerini Al",
                 description="Müşterinin sözleşme detaylarını getirir",
                 parameters={"user_id": "string"},
-                function=get_contract_info
+                function=get_contract_info,
+                async_function=aget_contract_info,
+                read_only=True, expected_latency=0.3, cacheable=True
             ),
             ToolType.ACTIVATE_SERVICE.value: Tool(
                 name="Hizmet Aktifleştir",
                 description="Yeni hizmet aktifleştirir",
                 parameters={"user_id": "string", "service_type": "string"},
-                function=activate_service
+                function=activate_service,
+                async_function=aactivate_service,
+                depends_on=(ToolType.GET_CUSTOMER_INFO.value,)
             ),
             ToolType.SEARCH_KNOWLEDGE_BASE.value: Tool(
                 name="Bilgi Tabanında Ara",
                 description="Genel sorular için bilgi tabanında arama yapar",
                 parameters={"query": "string"},
-                function=search_knowledge_base
+                function=search_knowledge_base,
+                async_function=asearch_knowledge_base,
+                read_only=True
             )
         }
 
+    def _load_intent_classifier(self) -> Optional[LocalIntentClassifier]:
+        path = self.config.intent_classifier_path
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            classifier = LocalIntentClassifier.load(path, threshold=self.config.local_intent_threshold)
+            logger.info(f"Yerel niyet sınıflandırıcı yüklendi: {path}")
+            return classifier
+        except Exception as e:
+            logger.error(f"Yerel niyet sınıflandırıcı yüklenemedi: {e}")
+            return None
+
+    def _load_transitions(self) -> IntentTransitionModel:
+        path = self.config.conversation_log_path
+        if not path or not os.path.exists(path):
+            return IntentTransitionModel()
+        try:
+            return IntentTransitionModel.from_log(path)
+        except OSError as e:
+            logger.error(f"Konuşma kaydı okunamadı: {e}")
+            return IntentTransitionModel()
+
     def _get_conversation_state(self, user_id: str) -> ConversationState:
         """Kullanıcının konuşma durumunu alır veya oluşturur"""
-        if user_id not in self.conversation_states:
-            self.conversation_states[user_id] = ConversationState(user_id=user_id)
-        return self.conversation_states[user_id]
+        return self.sessions.get_or_create(user_id)
+
+    def _has_budget(self, deadline: Optional[Deadline], llm_stages: int) -> bool:
+        """Kalan tur süresi verilen sayıda LLM aşamasına yetiyor mu"""
+        return deadline is None or deadline.has(llm_stages * self.config.llm_stage_seconds)
+
+    def _analyze_intent_with_llm(self, user_message: str, conversation_history: List[Dict[str, str]],
+                                 on_tools_ready: Optional[Callable[[List[str], Dict[str, Any]], None]] = None,
+                                 include_sentiment: bool = False, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Niyeti LLM ile belirler.
+
+        on_tools_ready verilirse ve istemci akışı destekliyorsa, required_tools ve
+        parameters alanları üretilir üretilmez geri çağrılır; kalan alanlar beklenmez.
+        include_sentiment True ise aynı çağrıda duygu analizi de istenir ve
+        sonuç "sentiment" anahtarında döner (önbellek/fallback yanıtlarında bulunmaz).
+        """
+        logger.info(f"Niyet analizi başlatıldı. Kullanıcı mesajı: {user_message}")
+        local = self._local_intent_analysis(user_message, conversation_history)
+        if local is not None:
+            return local
+        # Niyet ve yanıt özeti için süre kalmadıysa anahtar kelime analizi
+        if not self._has_budget(deadline, 2):
+            logger.warning(f"Tur bütçesi yetersiz ({deadline}), LLM niyet analizi atlanıyor")
+            return self._fallback_intent_analysis(user_message)
+        analysis_prompt, schema = self._build_intent_prompt(user_message, conversation_history, include_sentiment)
+        try:
+            intent_analysis = None
+            if self.llm_client and on_tools_ready and self.config.stream_tool_dispatch:
+                intent_analysis = {}
+                for field, value in self.llm_client.chat_json_stream(analysis_prompt, schema, call_site="intent",
+                                                                     deadline=deadline):
+                    intent_analysis[field] = value
+                    if field in ("required_tools", "parameters") and \
+                            "required_tools" in intent_analysis and "parameters" in intent_analysis:
+                        on_tools_ready(intent_analysis["required_tools"], intent_analysis["parameters"])
+            elif self.llm_client:
+                # Şemaya bağlı çıktı: JSON ayıklama ve başarısız üretim yok
+                intent_analysis = self.llm_client.chat_json(analysis_prompt, schema, call_site="intent", deadline=deadline)
+            else:
+                response = self._llm_chat(analysis_prompt, call_site="intent", deadline=deadline)
+                logger.info(f"LLM yanıtı: {response}")
+                intent_analysis = self._parse_llm_json(response)
+            if intent_analysis is not None:
+                self._remember_intent(user_message, intent_analysis, conversation_history)
+                return intent_analysis
+        except Exception as e:
+            logger.error(f"LLM analiz hatası: {e}")
+        
+        # Fallback analiz
+        return self._fallback_intent_analysis(user_message)
 
-    def _analyze_intent_with_llm(self, user_message: str, conversation_history: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def _aanalyze_intent_with_llm(self, user_message: str, conversation_history: List[Dict[str, str]],
+                                        include_sentiment: bool = False, deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """_analyze_intent_with_llm'in asenkron karşılığı (erken araç başlatma yapılmaz)"""
         logger.info(f"Niyet analizi başlatıldı. Kullanıcı mesajı: {user_message}")
+        local = self._local_intent_analysis(user_message, conversation_history)
+        if local is not None:
+            return local
+        if not self._has_budget(deadline, 2):
+            logger.warning(f"Tur bütçesi yetersiz ({deadline}), LLM niyet analizi atlanıyor")
+            return self._fallback_intent_analysis(user_message)
+        analysis_prompt, schema = self._build_intent_prompt(user_message, conversation_history, include_sentiment)
+        try:
+            intent_analysis = await self._allm_chat_json(analysis_prompt, schema, call_site="intent", deadline=deadline)
+            if intent_analysis is None:
+                response = await self._allm_chat(analysis_prompt, call_site="intent", deadline=deadline)
+                logger.info(f"LLM yanıtı: {response}")
+                intent_analysis = self._parse_llm_json(response)
+            if intent_analysis is not None:
+                self._remember_intent(user_message, intent_analysis, conversation_history)
+                return intent_analysis
+        except Exception as e:
+            logger.error(f"LLM analiz hatası: {e}")
+
+        return self._fallback_intent_analysis(user_message)
+
+    @staticmethod
+    def _has_prior_turns(conversation_history) -> bool:
+        # Geçmiş, analiz edilen mesajı da içerir
+        return conversation_history is not None and len(conversation_history) > 1
+
+    def _local_intent_analysis(self, user_message: str, conversation_history=None) -> Optional[Dict[str, Any]]:
+        """LLM'siz niyet: önce anlamsal önbellek, sonra yerel sınıflandırıcı.
+
+        Önbellek anahtarı sadece mesajdır; "peki geçen ayki?" gibi önceki turlara
+        bağlı mesajlar başka bir konuşmanın analiziyle eşleşmesin diye konuşmanın
+        ilk mesajı dışında kullanılmaz.
+        """
+        if self.intent_cache is not None and not self._has_prior_turns(conversation_history):
+            cached = self.intent_cache.lookup(user_message)
+            if cached is not None:
+                return cached
+        if self.intent_classifier is not None:
+            analysis = self.intent_classifier.analyze(user_message)
+            # Yazma araçları mesajdan tam parametre almadan çalıştırılmaz; LLM'e bırakılır
+            if analysis is not None and all(
+                    self.tools.get(name) is not None and self.tools[name].read_only
+                    for name in analysis["required_tools"]):
+                return analysis
+        return None
+
+    def _build_intent_prompt(self, user_message: str, conversation_history: List[Dict[str, str]],
+                             include_sentiment: bool = False):
+        """Niyet analizi promptunu ve beklenen JSON şemasını döndürür"""
         context = "\n".join([f"{msg['role']}: {msg['message']}" for msg in conversation_history[-5:]])
         
         analysis_prompt = f"""
@@ -192,20 +556,96 @@ class CentralAgent:
         
         Niyet tipleri: fatura_sorgula, paket_degistir, sifre_sifirla, teknik_destek, sikayet, genel_soru, musteri_bilgi, odeme, sozlesme_yenile, hizmet_aktifleştir
         """
-        
+        schema = INTENT_SCHEMA
+        if include_sentiment:
+            schema = TURN_ANALYSIS_SCHEMA
+            analysis_prompt += """
+        Ayrıca kullanıcının son mesajının duygu durumunu "sentiment" alanında ver:
+        "sentiment": {"sentiment": "positive|negative|neutral", "confidence": 0.95, "emotion": "satisfied|frustrated|happy|angry|neutral|confused", "satisfaction_score": 8.5}
+        satisfaction_score: 1-10 arası, 10 en memnun
+        """
+        return analysis_prompt, schema
+
+    def _reusable_intent(self, intent_analysis: Dict[str, Any]) -> bool:
+        """Analiz benzer mesajlara aynen verilebilir mi.
+
+        Yazma araçları ve mesajdan çıkarılmış parametreler (paket, tutar, dönem ...)
+        içeren analizler önbelleğe alınmaz; aksi halde "PN3'e geç" isteği önbellekteki
+        PN2 isteğinin parametresiyle çalışır. query önbellekten okunurken yenilenir.
+        """
+        tools = intent_analysis.get("required_tools") or []
+        if not all(self._is_read_only(tool_name) for tool_name in tools):
+            return False
+        return all(key == "query" or value in (None, "")
+                   for key, value in (intent_analysis.get("parameters") or {}).items())
+
+    def _remember_intent(self, user_message: str, intent_analysis: Dict[str, Any], conversation_history=None):
+        logger.info(f"LLM niyet analizi: {intent_analysis}")
+        if self.intent_cache is not None and not self._has_prior_turns(conversation_history) \
+                and self._reusable_intent(intent_analysis):
+            # Duygu sonucu mesaja özeldir, benzer mesajlara taşınmaz
+            self.intent_cache.add(user_message, {k: v for k, v in intent_analysis.items() if k != "sentiment"})
+        if self.config.intent_log_path:
+            self._log_intent(user_message, intent_analysis)
+
+    def _log_intent(self, user_message: str, intent_analysis: Dict[str, Any]):
+        """LLM niyet sonucunu yerel sınıflandırıcının eğitim verisi olarak JSONL'e ekler"""
+        row = {
+            "message": user_message,
+            "intent": intent_analysis.get("intent"),
+            "required_tools": intent_analysis.get("required_tools", []),
+            "timestamp": time.time()
+        }
         try:
-            response = self.ollama_chat(analysis_prompt)
-            logger.info(f"LLM yanıtı: {response}")
-            if "{" in response and "}" in response:
-                start = response.find("{")
-                end = response.rfind("}") + 1
-                json_str = response[start:end]
-                return json.loads(json_str)
-        except Exception as e:
-            logger.error(f"LLM analiz hatası: {e}")
-        
-        # Fallback analiz
-        return self._fallback_intent_analysis(user_message)
+            with self._intent_log_lock, open(self.config.intent_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+        except OSError as e:
+            logger.error(f"Niyet kaydı yazılamadı: {e}")
+
+    @staticmethod
+    def _parse_llm_json(response: str) -> Optional[Dict[str, Any]]:
+        """Serbest metin LLM yanıtındaki ilk { ile son } arasını JSON olarak çözer"""
+        if "{" in response and "}" in response:
+            start = response.find("{")
+            end = response.rfind("}") + 1
+            return json.loads(response[start:end])
+        return None
+
+    def _is_read_only(self, tool_name: str) -> bool:
+        tool = self.tools.get(tool_name)
+        return bool(tool and tool.read_only)
+
+    def _run_tools(self, required_tools: List[str], parameters: Dict[str, Any], user_id: str,
+                   prefetched: Optional[Dict[str, Any]] = None, deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Planlanan araçları çalıştırır; yanıtta kullanılacak araç başarısızsa elenen okumalar yedek olarak çalışır"""
+        plan = self.tool_planner.plan(required_tools)
+        results = self.tool_executor.run(plan.tools, parameters, user_id, prefetched=prefetched, deadline=deadline)
+        if plan.needs_fallback(results):
+            logger.info(f"{plan.primary} başarısız, yedek araçlar çalıştırılıyor: {plan.fallbacks}")
+            results += self.tool_executor.run(plan.fallbacks, parameters, user_id, prefetched=prefetched,
+                                              deadline=deadline)
+        return results
+
+    async def _arun_tools(self, required_tools: List[str], parameters: Dict[str, Any], user_id: str,
+                          deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        plan = self.tool_planner.plan(required_tools)
+        results = await self.tool_executor.arun(plan.tools, parameters, user_id, deadline=deadline)
+        if plan.needs_fallback(results):
+            logger.info(f"{plan.primary} başarısız, yedek araçlar çalıştırılıyor: {plan.fallbacks}")
+            results += await self.tool_executor.arun(plan.fallbacks, parameters, user_id, deadline=deadline)
+        return results
+
+    def _dispatch_read_only_tools(self, tool_names: List[str], parameters: Dict[str, Any], user_id: str,
+                                  deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Plandaki salt-okunur araçları arka planda başlatır; {araç: (parametreler, future)} döndürür"""
+        dispatched = {}
+        for tool_name in self.tool_planner.plan(tool_names).tools:
+            if self._is_read_only(tool_name) and tool_name not in dispatched:
+                logger.info(f"Araç niyet analizi bitmeden başlatılıyor: {tool_name}")
+                call_key = tool_call_key(parameters, user_id)
+                future = self.tool_executor.submit(tool_name, call_key, user_id, deadline)
+                dispatched[tool_name] = (call_key, future)
+        return dispatched
 
     def _fallback_intent_analysis(self, user_message: str) -> Dict[str, Any]:
         """Basit anahtar kelime tabanlı analiz (fallback)"""
@@ -248,65 +688,215 @@ class CentralAgent:
                 "response_type": "immediate"
             }
 
-    def _execute_tool(self, tool_name: str, parameters: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-        logger.info(f"Araç çağrılıyor: {tool_name}, Parametreler: {parameters}")
+    def _prepare_tool_call(self, tool_name: str, parameters: Dict[str, Any], user_id: str):
+        """Parametreleri doğrular; (araç, filtrelenmiş parametreler) veya hata sonucu döndürür"""
         if tool_name not in self.tools:
-            return {"success": False, "error": f"İlgili işlem için gerekli araç sistemde tanımlı değil. Lütfen tekrar deneyin veya destek ekibiyle iletişime geçin.", "tool_used": tool_name}
+            return None, {"success": False, "error": f"İlgili işlem için gerekli araç sistemde tanımlı değil. Lütfen tekrar deneyin veya destek ekibiyle iletişime geçin.", "tool_used": tool_name}
+        tool = self.tools[tool_name]
+        if "user_id" not in parameters:
+            parameters["user_id"] = user_id
+        # Parametre validasyonu
+        for param, typ in tool.parameters.items():
+            if param not in parameters or parameters[param] in [None, ""]:
+                return None, {"success": False, "error": f"Gerekli parametre eksik: '{param}'. Lütfen doğru ve eksiksiz bilgi giriniz. Örnek: {param}={typ}", "tool_used": tool_name}
+            # Tip kontrolü (sadece temel tipler için)
+            if typ == "float":
+                try:
+                    float(parameters[param])
+                except Exception:
+                    return None, {"success": False, "error": f"Parametre tipi hatalı: '{param}' sayısal olmalı. Örnek: {param}=100.0", "tool_used": tool_name}
+            if typ == "string":
+                if not isinstance(parameters[param], str):
+                    return None, {"success": False, "error": f"Parametre tipi hatalı: '{param}' metin olmalı. Örnek: {param}='değer'", "tool_used": tool_name}
+        # Fazla parametreleri çıkar
+        return tool, {k: v for k, v in parameters.items() if k in tool.parameters}
+
+    def _tool_error(self, tool_name: str, error: Exception) -> Dict[str, Any]:
+        logger.error(f"Araç çalıştırma hatası {tool_name}: {error}")
+        user_friendly_error = (
+            "Üzgünüz, işleminiz sırasında bir hata oluştu. Lütfen bilgilerinizi kontrol ederek tekrar deneyin. "
+            "Sorun devam ederse, farklı bir işlem deneyebilir veya destek ekibimizle iletişime geçebilirsiniz."
+        )
+        return {"success": False, "error": user_friendly_error, "tool_used": tool_name}
+
+    @staticmethod
+    def _tool_fits(tool: Tool, deadline: Optional[Deadline]) -> bool:
+        """Araç, beklenen süresi kalan tur bütçesine sığıyorsa başlatılır"""
+        if deadline is None or deadline.has(tool.expected_latency):
+            return True
+        logger.warning(f"Tur bütçesi yetersiz ({deadline}), {tool.name} başlatılmıyor")
+        return False
+
+    def _execute_tool(self, tool_name: str, parameters: Dict[str, Any], user_id: str,
+                      deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        logger.info(f"Araç çağrılıyor: {tool_name}, Parametreler: {parameters}")
         try:
-            tool = self.tools[tool_name]
-            if "user_id" not in parameters:
-                parameters["user_id"] = user_id
-            # Parametre validasyonu
-            for param, typ in tool.parameters.items():
-                if param not in parameters or parameters[param] in [None, ""]:
-                    return {"success": False, "error": f"Gerekli parametre eksik: '{param}'. Lütfen doğru ve eksiksiz bilgi giriniz. Örnek: {param}={typ}", "tool_used": tool_name}
-                # Tip kontrolü (sadece temel tipler için)
-                if typ == "float":
-                    try:
-                        float(parameters[param])
-                    except Exception:
-                        return {"success": False, "error": f"Parametre tipi hatalı: '{param}' sayısal olmalı. Örnek: {param}=100.0", "tool_used": tool_name}
-                if typ == "string":
-                    if not isinstance(parameters[param], str):
-                        return {"success": False, "error": f"Parametre tipi hatalı: '{param}' metin olmalı. Örnek: {param}='değer'", "tool_used": tool_name}
-            # Fazla parametreleri çıkar
-            filtered_params = {k: v for k, v in parameters.items() if k in tool.parameters}
+            tool, filtered_params = self._prepare_tool_call(tool_name, parameters, user_id)
+            if tool is None:
+                return filtered_params
+            if not self._tool_fits(tool, deadline):
+                return deadline_result(tool_name)
             result = tool.function(**filtered_params)
             logger.info(f"Araç sonucu: {tool_name}, Sonuç: {result}")
-            return {"success": True, "result": result, "tool_used": tool_name}
+            # Yapılandırılmış veri (varsa) yanıt şablonlarında kullanılır
+            return {"success": True, "result": result, "tool_used": tool_name, "data": getattr(result, "data", None)}
         except Exception as e:
-            logger.error(f"Araç çalıştırma hatası {tool_name}: {e}")
-            user_friendly_error = (
-                "Üzgünüz, işleminiz sırasında bir hata oluştu. Lütfen bilgilerinizi kontrol ederek tekrar deneyin. "
-                "Sorun devam ederse, farklı bir işlem deneyebilir veya destek ekibimizle iletişime geçebilirsiniz."
-            )
-            return {"success": False, "error": user_friendly_error, "tool_used": tool_name}
+            return self._tool_error(tool_name, e)
+
+    async def _aexecute_tool(self, tool_name: str, parameters: Dict[str, Any], user_id: str,
+                             deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        logger.info(f"Araç çağrılıyor: {tool_name}, Parametreler: {parameters}")
+        try:
+            tool, filtered_params = self._prepare_tool_call(tool_name, parameters, user_id)
+            if tool is None:
+                return filtered_params
+            if not self._tool_fits(tool, deadline):
+                return deadline_result(tool_name)
+            if tool.async_function is not None:
+                result = await tool.async_function(**filtered_params)
+            else:
+                result = await asyncio.to_thread(tool.function, **filtered_params)
+            logger.info(f"Araç sonucu: {tool_name}, Sonuç: {result}")
+            # Yapılandırılmış veri (varsa) yanıt şablonlarında kullanılır
+            return {"success": True, "result": result, "tool_used": tool_name, "data": getattr(result, "data", None)}
+        except Exception as e:
+            return self._tool_error(tool_name, e)
+
+    def _llm_chat(self, prompt: str, call_site: str = None, deadline: Optional[Deadline] = None) -> str:
+        # Süre bütçesi sadece OllamaClient'a aktarılabilir; düz fonksiyonlar kendi timeout'unu kullanır
+        if self.llm_client:
+            return self.llm_client.chat(prompt, call_site=call_site, deadline=deadline)
+        return self.ollama_chat(prompt)
+
+    def _stream_llm(self, prompt: str, call_site: str = None, deadline: Optional[Deadline] = None):
+        """LLM yanıtını parça parça döndürür; akış desteklenmiyorsa tek parça döner"""
+        if self.llm_client:
+            yield from self.llm_client.chat_stream(prompt, call_site=call_site, deadline=deadline)
+        else:
+            yield self.ollama_chat(prompt)
+
+    async def _allm_chat(self, prompt: str, call_site: str = None, deadline: Optional[Deadline] = None) -> str:
+        if self.async_llm_client:
+            return await self.async_llm_client.chat(prompt, call_site=call_site, deadline=deadline)
+        # Senkron istemci event loop'u bloklamasın diye thread'de çalıştırılır
+        return await asyncio.to_thread(self._llm_chat, prompt, call_site, deadline)
+
+    async def _allm_chat_json(self, prompt: str, schema: Dict[str, Any], call_site: str = None,
+                              deadline: Optional[Deadline] = None) -> Optional[Dict[str, Any]]:
+        """Şemalı JSON çağrısı; istemci şemalı çıktıyı desteklemiyorsa None döner"""
+        if self.async_llm_client:
+            return await self.async_llm_client.chat_json(prompt, schema, call_site=call_site, deadline=deadline)
+        if self.llm_client:
+            return await asyncio.to_thread(self.llm_client.chat_json, prompt, schema, call_site, deadline)
+        return None
+
+    @staticmethod
+    def _strip_stream(chunks, strip_quotes: bool = False):
+        """Akış halindeki metnin baştaki ve sondaki boşluklarını (ve tırnaklarını) temizler"""
+        trailing = " \t\r\n" + ('"' if strip_quotes else "")
+        started = False
+        pending = ""
+        for chunk in chunks:
+            if not started:
+                chunk = chunk.lstrip()
+                if strip_quotes:
+                    chunk = chunk.lstrip('"')
+                if not chunk:
+                    continue
+                started = True
+            text = pending + chunk
+            body = text.rstrip(trailing)
+            # Sondaki boşluk/tırnak, arkasından metin gelirse sonraki parçayla birlikte gönderilir
+            pending = text[len(body):]
+            if body:
+                yield body
 
     def _generate_response_with_context(self, user_message: str, tool_results: List[Dict[str, Any]], 
                                     conversation_state: ConversationState, clarification: str = None) -> str:
+        return "".join(self._stream_response_with_context(user_message, tool_results, conversation_state, clarification))
+
+    def _stream_response_with_context(self, user_message: str, tool_results: List[Dict[str, Any]], 
+                                    conversation_state: ConversationState, clarification: str = None,
+                                    deadline: Optional[Deadline] = None):
+        plan = self._build_response_plan(user_message, tool_results, conversation_state, clarification)
+        if "text" in plan:
+            yield plan["text"]
+            return
+        if not self._has_budget(deadline, 1):
+            # Özet için süre kalmadı: ham araç metni
+            logger.warning(f"Tur bütçesi yetersiz ({deadline}), LLM yanıtı atlanıyor")
+            yield plan["fallback"]
+            return
+        yanit_basladi = False
+        try:
+            for parca in self._strip_stream(self._stream_llm(plan["prompt"], call_site=plan["call_site"], deadline=deadline),
+                                            strip_quotes=plan["strip_quotes"]):
+                yanit_basladi = True
+                yield parca
+        except Exception as e:
+            logger.error(f"Yanıt oluşturma hatası ({plan['call_site']}): {e}")
+        if not yanit_basladi:
+            # LLM hata verdi ya da boş/yalnız boşluk üretti: ham araç metni
+            yield plan["fallback"]
+            return
+        yield plan["suffix"]
+
+    async def _agenerate_response_with_context(self, user_message: str, tool_results: List[Dict[str, Any]],
+                                               conversation_state: ConversationState, clarification: str = None,
+                                               deadline: Optional[Deadline] = None) -> str:
+        plan = self._build_response_plan(user_message, tool_results, conversation_state, clarification)
+        if "text" in plan:
+            return plan["text"]
+        if not self._has_budget(deadline, 1):
+            logger.warning(f"Tur bütçesi yetersiz ({deadline}), LLM yanıtı atlanıyor")
+            return plan["fallback"]
+        try:
+            yanit = "".join(self._strip_stream([await self._allm_chat(plan["prompt"], call_site=plan["call_site"],
+                                                                      deadline=deadline)],
+                                               strip_quotes=plan["strip_quotes"]))
+        except Exception as e:
+            logger.error(f"Yanıt oluşturma hatası ({plan['call_site']}): {e}")
+            return plan["fallback"]
+        return yanit + plan["suffix"] if yanit else plan["fallback"]
+
+    def _build_response_plan(self, user_message: str, tool_results: List[Dict[str, Any]],
+                             conversation_state: ConversationState, clarification: str = None) -> Dict[str, Any]:
+        """Yanıtın nasıl üretileceğini belirler (senkron ve asenkron yol ortak kullanır).
+
+        Doğrudan metin için {"text"}, LLM gerekiyorsa {"prompt", "call_site",
+        "strip_quotes", "suffix", "fallback"} döner; fallback, LLM hiç çıktı
+        üretmeden hata verirse kullanılır.
+        """
         logger.info(f"Yanıt oluşturuluyor. Kullanıcı mesajı: {user_message}, Araç sonuçları: {tool_results}")
         # Şifre sıfırlama varsa sadece onun çıktısını kullan
         sifre_sonucu = None
         for result in tool_results:
             if result.get("success") and result.get("tool_used") == "sifre_sifirla":
-                sifre_sonucu = result["result"]
+                sifre_sonucu = self.response_renderer.render("sifre_sifirla", result.get("data")) or result["result"]
                 break
         if sifre_sonucu:
             # Sadece şifre sıfırlama mesajı dön
-            return sifre_sonucu + "\n\nBaşka bir isteğiniz var mı?"
+            return {"text": sifre_sonucu + "\n\nBaşka bir isteğiniz var mı?"}
         else:
             # Diğer öncelik sırasına göre devam et
-            oncelik = ["odeme_islem", "paket_degistir", "fatura_bilgi_al", "musteri_bilgi_al"]
+            oncelik = RESPONSE_PRIORITY
             secili_sonuc = None
             secili_tool = None
+            secili_veri = None
             for tool in oncelik:
                 for result in tool_results:
                     if result.get("success") and result.get("tool_used") == tool:
                         secili_sonuc = result["result"]
                         secili_tool = tool
+                        secili_veri = result.get("data")
                         break
                 if secili_sonuc:
                     break
+            if secili_sonuc and not self.config.llm_summarization:
+                # Yapılandırılmış veriden şablonla yanıt: LLM üretimi gerekmez
+                sablon_yanit = self.response_renderer.render(secili_tool, secili_veri)
+                if sablon_yanit:
+                    return {"text": sablon_yanit + "\n\nBaşka bir isteğiniz var mı?"}
             if secili_sonuc:
                 teknik_sonuc = secili_sonuc
                 tool_names = [secili_tool]
@@ -331,22 +921,20 @@ class CentralAgent:
                 "Resmi ama samimi bir ton kullan. "
                 f"Kullanıcıya iletilecek bilgi: {teknik_sonuc}"
             )
-            try:
-                yanit = self.ollama_chat(prompt)
-                otomatik_odeme_oner = False
-                if "fatura_bilgi_al" in tool_names and "Ödenmedi" in teknik_sonuc:
-                    if teknik_sonuc.count("Ödenmedi") >= 2:
-                        otomatik_odeme_oner = True
-                if otomatik_odeme_oner:
-                    yanit += "\n\nDilerseniz otomatik ödeme talimatı vermek ister misiniz?"
-                yanit = yanit.strip().strip('"')
-                return yanit + "\n\nBaşka bir isteğiniz var mı?"
-            except Exception as e:
-                logger.error(f"LLM özetleme hatası: {e}")
-                return teknik_sonuc + "\n\nBaşka bir isteğiniz var mı?"
+            otomatik_odeme_oner = False
+            if "fatura_bilgi_al" in tool_names and "Ödenmedi" in teknik_sonuc:
+                if teknik_sonuc.count("Ödenmedi") >= 2:
+                    otomatik_odeme_oner = True
+            suffix = "\n\nBaşka bir isteğiniz var mı?"
+            if otomatik_odeme_oner:
+                suffix = "\n\nDilerseniz otomatik ödeme talimatı vermek ister misiniz?" + suffix
+            return {
+                "prompt": prompt, "call_site": "summary", "strip_quotes": True, "suffix": suffix,
+                "fallback": teknik_sonuc + "\n\nBaşka bir isteğiniz var mı?"
+            }
         # Eksik parametre durumu için sade Türkçe örnekli cümle
         if clarification:
-            return f"Hangi ayın faturasını öğrenmek istiyorsunuz? Örnek: Temmuz\n\nBaşka bir isteğiniz var mı?"
+            return {"text": f"Hangi ayın faturasını öğrenmek istiyorsunuz? Örnek: Temmuz\n\nBaşka bir isteğiniz var mı?"}
         # Genel sorular ve insansı diyalog için LLM'e gönder
         context_info = ""
         for result in tool_results:
@@ -359,17 +947,43 @@ class CentralAgent:
             for msg in conversation_state.conversation_history[-3:]
         ])
         response_prompt = f"Sen profesyonel bir telekom operatörü müşteri temsilcisisin. Tüm cevaplarını sadece Türkçe ver. İngilizce veya başka bir dil kullanma! Aşağıdaki bilgileri kullanarak kullanıcıya yanıt ver: Kullanıcının Mesajı: {user_message} Son Konuşma Geçmişi: {conversation_history} Sistem Bilgileri: {context_info} Kullanıcının Mevcut Durumu: {conversation_state.context} Lütfen: 1. Tüm yanıtlarını Türkçe ver 2. Profesyonel ve samimi ol 3. Hata durumlarını kibar bir şekilde açıkla 4. Gerekirse ek bilgi iste 5. Çözüm önerileri sun 6. Resmi ama anlaşılır bir dil kullan Unutma: Tüm cevaplarını sadece Türkçe ver. İngilizce veya başka bir dil kullanma! Yanıtın:"
-        try:
-            response = self.ollama_chat(response_prompt)
-            logger.info(f"Oluşturulan yanıt: {response}")
-            return response.strip() + "\n\nBaşka bir isteğiniz var mı?"
-        except Exception as e:
-            logger.error(f"Yanıt oluşturma hatası: {e}")
-            return "Üzgünüm, şu anda size yardımcı olamıyorum. Lütfen daha sonra tekrar deneyin."
+        return {
+            "prompt": response_prompt, "call_site": "response", "strip_quotes": False,
+            "suffix": "\n\nBaşka bir isteğiniz var mı?",
+            "fallback": "Üzgünüm, şu anda size yardımcı olamıyorum. Lütfen daha sonra tekrar deneyin."
+        }
 
     def _analyze_sentiment(self, user_message: str) -> Dict[str, Any]:
         """Kullanıcı mesajından duygu analizi yapar"""
-        sentiment_prompt = f"""
+        sentiment_prompt = self._build_sentiment_prompt(user_message)
+        try:
+            if self.llm_client:
+                return self.llm_client.chat_json(sentiment_prompt, SENTIMENT_SCHEMA, call_site="sentiment")
+            response = self._llm_chat(sentiment_prompt, call_site="sentiment")
+            result = self._parse_llm_json(response)
+            if result is not None:
+                return result
+        except Exception as e:
+            logger.error(f"Duygu analizi hatası: {e}")
+        
+        return self._fallback_sentiment_analysis(user_message)
+
+    async def _aanalyze_sentiment(self, user_message: str) -> Dict[str, Any]:
+        sentiment_prompt = self._build_sentiment_prompt(user_message)
+        try:
+            result = await self._allm_chat_json(sentiment_prompt, SENTIMENT_SCHEMA, call_site="sentiment")
+            if result is None:
+                result = self._parse_llm_json(await self._allm_chat(sentiment_prompt, call_site="sentiment"))
+            if result is not None:
+                return result
+        except Exception as e:
+            logger.error(f"Duygu analizi hatası: {e}")
+
+        return self._fallback_sentiment_analysis(user_message)
+
+    @staticmethod
+    def _build_sentiment_prompt(user_message: str) -> str:
+        return f"""
         Aşağıdaki kullanıcı mesajının duygu durumunu analiz et:
         
         Mesaj: {user_message}
@@ -384,18 +998,9 @@ class CentralAgent:
         
         satisfaction_score: 1-10 arası, 10 en memnun
         """
-        
-        try:
-            response = self.ollama_chat(sentiment_prompt)
-            if "{" in response and "}" in response:
-                start = response.find("{")
-                end = response.rfind("}") + 1
-                json_str = response[start:end]
-                return json.loads(json_str)
-        except Exception as e:
-            logger.error(f"Duygu analizi hatası: {e}")
-        
-        # Fallback analiz
+
+    def _fallback_sentiment_analysis(self, user_message: str) -> Dict[str, Any]:
+        """Basit anahtar kelime tabanlı duygu analizi (fallback)"""
         message_lower = user_message.lower()
         positive_words = ["teşekkür", "güzel", "iyi", "memnun", "harika", "süper", "çok iyi"]
         negative_words = ["kötü", "berbat", "memnun değil", "sorun", "problem", "kızgın", "sinirli"]
@@ -410,6 +1015,56 @@ class CentralAgent:
         else:
             return {"sentiment": "neutral", "confidence": 0.6, "emotion": "neutral", "satisfaction_score": 5.0}
 
+    def _set_sentiment_result(self, user_id: str, result: Dict[str, Any], seq: Optional[int] = None):
+        """Duygu sonucunu yazar; seq verilirse sadece kullanıcının en güncel mesajına aitse yazılır"""
+        with self._sentiment_lock:
+            if seq is None:
+                state = self._get_conversation_state(user_id)
+                state.sentiment_seq += 1
+            else:
+                state = self.sessions.get(user_id)
+                if state is None or seq != state.sentiment_seq:
+                    # Sonraki bir mesajın sonucu (veya manuel puan) zaten yazıldı ya da oturum silindi
+                    return
+            state.sentiment_result = result
+            fields = state.sentiment_fields()
+        if seq is not None:
+            # Arka plan sonucu tur bittikten sonra gelir; sadece duygu alanı yazılır ki
+            # bu worker'ın eski kopyası başka bir worker'da işlenen turu geri almasın
+            self.sessions.update(user_id, fields)
+
+    def _next_sentiment_seq(self, user_id: str) -> int:
+        with self._sentiment_lock:
+            state = self._get_conversation_state(user_id)
+            state.sentiment_seq += 1
+            return state.sentiment_seq
+
+    def _schedule_sentiment(self, user_message: str, user_id: str):
+        """Duygu analizini arka plan havuzunda başlatır, sonucu hazır olunca yayınlar"""
+        seq = self._next_sentiment_seq(user_id)
+        future = self._background_pool.submit(self._analyze_sentiment, user_message)
+        future.add_done_callback(
+            lambda f: self._set_sentiment_result(user_id, f.result(), seq) if f.exception() is None else None
+        )
+        return future
+
+    def _aschedule_sentiment(self, user_message: str, user_id: str) -> asyncio.Task:
+        """_schedule_sentiment'in asenkron karşılığı: analiz aynı event loop'ta görev olarak çalışır"""
+        seq = self._next_sentiment_seq(user_id)
+        task = asyncio.ensure_future(self._aanalyze_sentiment(user_message))
+        self._background_tasks.add(task)
+
+        def _done(t: asyncio.Task):
+            self._background_tasks.discard(t)
+            if not t.cancelled() and t.exception() is None:
+                # Sonuç oturum arka ucuna yazılır; event loop'u bloklamasın diye thread'de
+                save = asyncio.ensure_future(asyncio.to_thread(self._set_sentiment_result, user_id, t.result(), seq))
+                self._background_tasks.add(save)
+                save.add_done_callback(self._background_tasks.discard)
+
+        task.add_done_callback(_done)
+        return task
+
     def _process_satisfaction_rating(self, user_message: str, user_id: str) -> str:
         """Memnuniyet puanını işler"""
         try:
@@ -420,7 +1075,7 @@ class CentralAgent:
                 rating = int(numbers[0])
                 if 1 <= rating <= 10:
                     # Puanı kaydet
-                    self.satisfaction_ratings[user_id] = rating
+                    self._get_conversation_state(user_id).satisfaction_rating = rating
                     
                     if rating >= 8:
                         return "Çok teşekkür ederiz! Memnuniyetiniz bizi mutlu ediyor. Size en iyi hizmeti sunmaya devam edeceğiz. İyi günler dileriz."
@@ -436,141 +1091,655 @@ class CentralAgent:
 
     def get_satisfaction_rating(self, user_id: str) -> Optional[int]:
         """Kullanıcının memnuniyet puanını döndürür"""
-        return self.satisfaction_ratings.get(user_id)
+        state = self.sessions.get(user_id, refresh=True)
+        return state.satisfaction_rating if state else None
     
     def get_sentiment_result(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Kullanıcının duygu analizi sonucunu döndürür"""
-        return self.sentiment_results.get(user_id)
+        state = self.sessions.get(user_id, refresh=True)
+        return state.sentiment_result if state else None
     
     def clear_satisfaction_data(self, user_id: str):
         """Kullanıcının memnuniyet verilerini temizler"""
-        self.satisfaction_ratings.pop(user_id, None)
-        self.sentiment_results.pop(user_id, None)
-        self.satisfaction_survey_shown.pop(user_id, None)
+        state = self.sessions.get(user_id, refresh=True)
+        if state is None:
+            return
+        with self._sentiment_lock:
+            # Sıra ilerletilince bekleyen arka plan sonuçları da yazılmaz
+            state.sentiment_seq += 1
+            state.sentiment_result = None
+        state.satisfaction_rating = None
+        state.survey_shown = False
+        self.sessions.save(user_id)
+
+    def start_session(self, user_id: str):
+        """Oturum başladığında çağrılır; ilk mesaj gelmeden müşteri ve fatura verisini ısıtır"""
+        # İlk tur niyet geçiş tablosuna yeni konuşmanın başı olarak yazılır
+        self.sessions.get_or_create(user_id, refresh=True).session_id = None
+        if self.config.session_prefetch:
+            logger.info(f"Oturum başlangıcı ön yüklemesi başlatıldı. Kullanıcı: {user_id}")
+            return prefetch_user_data(user_id, self._prefetch_pool)
+        return []
+
+    def get_session_stats(self) -> Dict[str, Any]:
+        """Oturum deposu metrikleri: oturum sayısı, bellekteki mesaj sayısı, LRU/TTL çıkarmaları"""
+        return self.sessions.stats()
+
+    def _fast_path_reply(self, user_message: str, user_id: str) -> Optional[str]:
+        """Hızlı yönlendiricinin yakaladığı mesajlara LLM'siz yanıt verir; değilse None"""
+        match = self.fast_path.match(user_message)
+        if match is None:
+            return None
+        logger.info(f"Hızlı yol: {match.route} ({match.phrase})")
+        if match.route == RATING_ROUTE:
+            yanit = self._process_satisfaction_rating(match.phrase, user_id)
+            # Puan girildiğinde de duygu sonucu güncellensin
+            self._set_sentiment_result(user_id, {"sentiment": "manual_rating", "satisfaction_score": int(match.phrase), "emotion": "-", "confidence": 1.0})
+            return yanit
+        # Bu mesajlar için LLM duygu analizi yapılmaz, anahtar kelime tahmini yeterli
+        self._set_sentiment_result(user_id, self._fallback_sentiment_analysis(user_message))
+        if match.route == CLOSING_ROUTE:
+            # Memnuniyet anketi kapanışta bir kez gösterilir
+            state = self._get_conversation_state(user_id)
+            if not state.survey_shown:
+                state.survey_shown = True
+                return ANKET_SORUSU
+            return random.choice(KAPANIS_YANITLARI)
+        if match.route == THANKS_ROUTE:
+            return random.choice(TESEKKUR_YANITLARI)
+        return random.choice(SELAMLASMA_YANITLARI)
+
+    def _start_sentiment(self, user_message: str, user_id: str, deadline: Deadline, schedule) -> bool:
+        """Duygu analizini mesaj başına bir kez ve yanıt yolunu bekletmeden başlatır.
+
+        Bütçe kısıtlı ilk aşamadır: niyet ve özetle birlikte üç LLM aşamasına
+        süre yoksa anahtar kelime tahmini kullanılır. Duygunun niyet çağrısıyla
+        birlikte istenip istenmeyeceğini (include_sentiment) döndürür.
+        """
+        if not self._has_budget(deadline, 3):
+            logger.warning(f"Tur bütçesi yetersiz ({deadline}), LLM duygu analizi atlanıyor")
+            self._set_sentiment_result(user_id, self._fallback_sentiment_analysis(user_message))
+            return False
+        if self.config.combined_analysis:
+            # Birleşik modda LLM duygu sonucu niyet analiziyle gelir; o ana kadar anahtar kelime tahmini
+            self._set_sentiment_result(user_id, self._fallback_sentiment_analysis(user_message))
+            return True
+        schedule(user_message, user_id)
+        return False
+
+    def _resume_slots(self, user_message: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """Cevabı beklenen slot varsa mesajı yerel ayrıştırır; niyet analizinin yerine geçen sonucu döndürür"""
+        state = self.sessions.get(user_id)
+        if state is None or not state.pending_actions:
+            return None
+        devam = self.slot_filler.resume(state.pending_actions, user_message)
+        if devam is None:
+            logger.info(f"Slot yanıtı ayrıştırılamadı, bekleyen işlem bırakıldı. Kullanıcı: {user_id}")
+            return None
+        logger.info(f"Slot dolduruldu: {devam['slot_filled']}, LLM niyet ve duygu analizi atlanıyor")
+        self._set_sentiment_result(user_id, self._fallback_sentiment_analysis(user_message))
+        return devam
+
+    def _slot_question(self, conversation_state: ConversationState, intent_str: str, required_tools: List[str],
+                       parameters: Dict[str, Any], clarification: Optional[str]) -> Optional[str]:
+        """Araçlardan birinin sorulabilir parametresi eksikse bekleyen işlemi kaydeder ve soruyu döndürür"""
+        return self.slot_filler.open(conversation_state.pending_actions, intent_str, required_tools,
+                                     parameters, clarification is not None)
+
+    def _decompose(self, user_message: str) -> List[str]:
+        if not self.config.multi_intent:
+            return [user_message]
+        parts = self.intent_decomposer.split(user_message)
+        if len(parts) > 1:
+            logger.info(f"Birleşik istek {len(parts)} alt isteğe bölündü: {parts}")
+        return parts
+
+    def _sub_intents(self, parts: List[str], analyses: List[Dict[str, Any]]):
+        """Alt analizleri niyete göre tekilleştirir; tek niyet kalırsa (None, birleşik analiz) döner"""
+        subs = distinct_intents(parts, analyses)
+        if len(subs) < 2:
+            return None, merge_analyses(analyses)
+        return subs, None
+
+    def _analyze_sub_intents(self, parts: List[str], conversation_history, include_sentiment: bool,
+                             deadline: Optional[Deadline]):
+        """Alt isteklerin niyetlerini eşzamanlı analiz eder; (alt niyetler, tek niyet analizi) döndürür"""
+        futures = [
+            self._subintent_pool.submit(self._analyze_intent_with_llm, part, conversation_history,
+                                        include_sentiment=include_sentiment and i == 0, deadline=deadline)
+            for i, part in enumerate(parts)
+        ]
+        return self._sub_intents(parts, [future.result() for future in futures])
+
+    async def _aanalyze_sub_intents(self, parts: List[str], conversation_history, include_sentiment: bool,
+                                    deadline: Optional[Deadline]):
+        analyses = await asyncio.gather(*[
+            self._aanalyze_intent_with_llm(part, conversation_history,
+                                           include_sentiment=include_sentiment and i == 0, deadline=deadline)
+            for i, part in enumerate(parts)
+        ])
+        return self._sub_intents(parts, list(analyses))
+
+    def _plan_compound(self, conversation_state: ConversationState, user_id: str, subs):
+        """Alt niyetleri duruma işler ve planlar.
+
+        (istekler, araçlar, parametreler, slot sorusu) döndürür. Sorulabilir
+        parametresi eksik ilk alt istek çalıştırılmaz, sorusu yanıtın sonuna
+        eklenir ve bekleyen işlem olarak kaydedilir.
+        """
+        istekler, soru = [], None
+        for part, analysis in subs:
+            intent_str, tools, clarification = self._apply_intent(conversation_state, analysis, user_id)
+            params = analysis.get("parameters") or {}
+            if soru is None:
+                soru = self._slot_question(conversation_state, intent_str, tools, params, clarification)
+                if soru is not None:
+                    continue
+            istekler.append({"part": part, "intent": intent_str, "tools": tools, "parameters": params,
+                             "clarification": clarification, "plan": self.tool_planner.plan(tools)})
+        araclar, parametreler = [], {}
+        for istek in istekler:
+            araclar += [t for t in istek["plan"].tools if t not in araclar]
+            for key, value in istek["parameters"].items():
+                parametreler.setdefault(key, value)
+        return istekler, araclar, parametreler, soru
+
+    @staticmethod
+    def _compound_fallbacks(istekler, results: List[Dict[str, Any]]) -> List[str]:
+        yedekler = []
+        calisan = {r.get("tool_used") for r in results}
+        for istek in istekler:
+            if istek["plan"].needs_fallback(results):
+                yedekler += [t for t in istek["plan"].fallbacks if t not in calisan and t not in yedekler]
+        return yedekler
+
+    def _compound_plans(self, istekler, results: List[Dict[str, Any]], conversation_state: ConversationState):
+        """Her alt istek için sadece kendi araç sonuçlarıyla yanıt planı çıkarır"""
+        planlar = []
+        for istek in istekler:
+            kendi = set(istek["plan"].tools) | set(istek["plan"].fallbacks)
+            sonuclar = [r for r in results if r.get("tool_used") in kendi]
+            yanit = self._off_topic_reply(istek["intent"], istek["tools"], sonuclar)
+            if yanit is not None:
+                planlar.append({"text": yanit})
+            else:
+                planlar.append(self._build_response_plan(istek["part"], sonuclar, conversation_state,
+                                                         istek["clarification"]))
+        return planlar
+
+    @staticmethod
+    def _join_compound(metinler: List[str], soru: Optional[str]) -> str:
+        """Alt yanıtları tek yanıtta birleştirir; kapanış sorusu bir kez, slot sorusu en sonda"""
+        parcalar = [m[:-len(DEVAM_SORUSU)] if m.endswith(DEVAM_SORUSU) else m for m in metinler]
+        if soru is not None:
+            return "\n\n".join(parcalar + [soru])
+        return "\n\n".join(parcalar) + DEVAM_SORUSU
+
+    def _compound_reply(self, conversation_state: ConversationState, user_id: str, subs,
+                        deadline: Optional[Deadline]) -> str:
+        """Birleşik isteği tek turda yanıtlar: araçlar tek plan halinde, özetler eşzamanlı"""
+        istekler, araclar, parametreler, soru = self._plan_compound(conversation_state, user_id, subs)
+        results = self.tool_executor.run(araclar, parametreler, user_id, deadline=deadline)
+        yedekler = self._compound_fallbacks(istekler, results)
+        if yedekler:
+            results += self.tool_executor.run(yedekler, parametreler, user_id, deadline=deadline)
+        yanit = self._critical_failure_reply(results)
+        if yanit is not None:
+            return yanit
+        planlar = self._compound_plans(istekler, results, conversation_state)
+        llm = self._has_budget(deadline, 1)
+        futures = [self._subintent_pool.submit(self._complete_llm_text, plan, deadline)
+                   if "text" not in plan and llm else None for plan in planlar]
+        return self._join_compound([self._compound_text(plan, future) for plan, future in zip(planlar, futures)], soru)
+
+    async def _acompound_reply(self, conversation_state: ConversationState, user_id: str, subs,
+                               deadline: Optional[Deadline]) -> str:
+        istekler, araclar, parametreler, soru = self._plan_compound(conversation_state, user_id, subs)
+        results = await self.tool_executor.arun(araclar, parametreler, user_id, deadline=deadline)
+        yedekler = self._compound_fallbacks(istekler, results)
+        if yedekler:
+            results += await self.tool_executor.arun(yedekler, parametreler, user_id, deadline=deadline)
+        yanit = self._critical_failure_reply(results)
+        if yanit is not None:
+            return yanit
+        planlar = self._compound_plans(istekler, results, conversation_state)
+        llm = self._has_budget(deadline, 1)
+
+        async def _complete(plan):
+            if "text" in plan or not llm:
+                return None
+            try:
+                return "".join(self._strip_stream([await self._allm_chat(plan["prompt"], call_site=plan["call_site"],
+                                                                         deadline=deadline)],
+                                                  strip_quotes=plan["strip_quotes"]))
+            except Exception as e:
+                logger.error(f"Yanıt oluşturma hatası ({plan['call_site']}): {e}")
+                return None
+
+        metinler = await asyncio.gather(*[_complete(plan) for plan in planlar])
+        return self._join_compound([plan["text"] if "text" in plan else
+                                    (metin + plan["suffix"] if metin else plan["fallback"])
+                                    for plan, metin in zip(planlar, metinler)], soru)
+
+    @staticmethod
+    def _compound_text(plan: Dict[str, Any], future) -> str:
+        if "text" in plan:
+            return plan["text"]
+        if future is None:
+            return plan["fallback"]
+        try:
+            metin = future.result()
+        except Exception as e:
+            logger.error(f"Yanıt oluşturma hatası ({plan['call_site']}): {e}")
+            return plan["fallback"]
+        return metin + plan["suffix"] if metin else plan["fallback"]
+
+    def _begin_turn(self, user_message: str, user_id: str) -> ConversationState:
+        conversation_state = self._get_conversation_state(user_id)
+        conversation_state.add_message("user", user_message)
+        return conversation_state
+
+    def _apply_intent(self, conversation_state: ConversationState, intent_analysis: Dict[str, Any], user_id: str):
+        """Niyet sonucunu konuşma durumuna işler; (niyet, araçlar, açıklama ihtiyacı) döndürür"""
+        if self.config.combined_analysis and intent_analysis.get("sentiment"):
+            self._set_sentiment_result(user_id, intent_analysis.pop("sentiment"))
+        # Enum'a güvenli atama
+        intent_str = intent_analysis.get("intent", "genel_soru")
+        if "slot_filled" not in intent_analysis:
+            # Slot yanıtı aynı isteğin devamıdır, geçiş sayılmaz
+            self._record_transition(conversation_state, intent_str, intent_analysis.get("required_tools", []))
+        try:
+            conversation_state.current_intent = IntentType(intent_str)
+        except ValueError:
+            conversation_state.current_intent = IntentType.GENERAL_QUESTION
+        conversation_state.context.update(intent_analysis.get("context_update", {}))
+        required_tools = intent_analysis.get("required_tools", [])
+        clarification = None
+        if intent_analysis.get("response_type") == "clarification":
+            clarification = "Daha fazla bilgiye ihtiyacım var: "
+            if intent_analysis.get("parameters"):
+                eksik = ", ".join([k for k, v in intent_analysis["parameters"].items() if not v])
+                if eksik:
+                    clarification += f"({eksik})"
+        return intent_str, required_tools, clarification
+
+    @staticmethod
+    def _critical_failure_reply(tool_results: List[Dict[str, Any]]) -> Optional[str]:
+        for result in tool_results:
+            if not result.get("success") and result.get("tool_used") in CRITICAL_TOOLS:
+                if result.get("deadline_exceeded"):
+                    return result["error"]
+                return (
+                    "Üzgünüz, müşteri bilgilerinize erişimde bir sorun yaşadık. Lütfen müşteri numaranızı kontrol ederek tekrar deneyin. "
+                    "Sorun devam ederse, destek ekibimizle iletişime geçebilirsiniz."
+                )
+        return None
+
+    @staticmethod
+    def _off_topic_reply(intent_str: str, required_tools: List[str], tool_results: List[Dict[str, Any]]) -> Optional[str]:
+        """Telekom dışı genel sorular için sabit uyarı; değilse None"""
+        if intent_str == "genel_soru" and required_tools == ["bilgi_tabanı_ara"]:
+            # Tool sonucu boşsa veya çok alakasızsa (ör. result yok veya result'ta telekom anahtar kelimesi yok)
+            if tool_results and (not tool_results[0].get("result") or not any(word in tool_results[0].get("result", "").lower() for word in ["fatura", "paket", "internet", "hat", "ödeme", "sözleşme", "müşteri", "teknik"])):
+                telekom_uyari_list = [
+                    "Ben bir telekom asistanıyım, sadece telekomünikasyon işlemleriyle ilgili yardımcı olabilirim. Fatura, paket, internet, ödeme gibi konularda sorularınızı beklerim.",
+                    "Size ancak telekom hizmetleriyle ilgili konularda yardımcı olabilirim. Fatura, paket, internet, ödeme veya sözleşme gibi sorularınız varsa memnuniyetle yanıtlarım.",
+                    "Yalnızca telekomünikasyon işlemleriyle ilgili destek verebiliyorum. Fatura, paket, internet, ödeme ve sözleşme konularında yardımcı olabilirim.",
+                    "Benim uzmanlık alanım telekom hizmetleri. Fatura, paket, internet, ödeme veya sözleşme hakkında sorularınızı yanıtlayabilirim.",
+                    "Telekomünikasyon dışında bir konuda yardımcı olamıyorum. Fatura, paket, internet, ödeme ve sözleşme gibi işlemler için buradayım."
+                ]
+                return random.choice(telekom_uyari_list)
+        return None
+
+    def _finish_turn(self, conversation_state: ConversationState, response: str):
+        conversation_state.add_message("bot", response)
+        logger.info(f"Yanıt üretildi ve konuşma geçmişine eklendi. Yanıt: {response}")
+        if self.config.speculative_prefetch:
+            self._speculative_prefetch(conversation_state)
+
+    def _transition_session(self, conversation_state: ConversationState) -> bool:
+        """Bu tur yeni bir konuşma başlatıyorsa oturum anahtarını yeniler ve True döndürür.
+
+        Anahtar yoksa (yeni oturum, start_session) ya da önceki mesajdan bu yana
+        session_idle_ttl'den uzun süre geçtiyse yeni konuşma başlar. Anahtar
+        oturumun ilk mesajının zamanıdır; birleşik isteğin alt niyetleri aynı
+        anahtarı hesaplayıp aynı konuşmada kalır.
+        """
+        history = conversation_state.conversation_history
+        now = history[-1]["timestamp"] if len(history) else time.time()
+        gap = self.config.session_idle_ttl or SESSION_GAP
+        idle = len(history) > 1 and now - history[-2]["timestamp"] > gap
+        if conversation_state.session_id is not None and not idle:
+            return False
+        session_id = f"{now:.6f}"
+        if session_id == conversation_state.session_id:
+            return False
+        conversation_state.session_id = session_id
+        return True
+
+    def _record_transition(self, conversation_state: ConversationState, intent_str: str, tools: List[str]):
+        previous = conversation_state.current_intent.value if conversation_state.current_intent else None
+        if self._transition_session(conversation_state):
+            previous = None
+        self.transitions.observe(previous, intent_str, tools)
+        if self.config.conversation_log_path:
+            # Dosya yazımı turu (asenkron yolda event loop'u) bekletmesin; from_log satırları oturuma göre gruplar
+            self._background_pool.submit(append_log, self.config.conversation_log_path, {
+                "user_id": conversation_state.user_id, "session": conversation_state.session_id,
+                "intent": intent_str, "tools": list(tools), "timestamp": time.time()
+            }, self._conversation_log_lock)
+
+    def _speculative_prefetch(self, conversation_state: ConversationState) -> list:
+        """Sonraki turda olası okuma araçlarının sonuçlarını maliyet sınırı içinde arka planda önbelleğe çeker.
+
+        Bekleyen slot varsa sonraki tur belli olduğundan onun araçları, yoksa
+        niyet geçiş tablosundaki olasılığı speculative_min_probability üstündeki
+        araçlar ısıtılır. Önbellekte taze olan ya da çekilmekte olan çağrılar
+        yeniden gönderilmez ve maliyete sayılmaz.
+        """
+        user_id = conversation_state.user_id
+        if conversation_state.pending_actions:
+            candidates = [(tool_name, 1.0) for tool_name in conversation_state.pending_actions[0]["tools"]]
+        else:
+            intent = conversation_state.current_intent.value if conversation_state.current_intent else None
+            candidates = self.transitions.next_tools(intent)
+        budget = self.config.speculative_cost_cap
+        calls = []
+        for tool_name, probability in candidates:
+            if probability < self.config.speculative_min_probability:
+                break
+            call = TOOL_PREFETCH_CALLS.get(tool_name)
+            if call is None or is_prefetched(user_id, call) or (user_id, call) in self._speculative_pending:
+                continue
+            cost = self.tools[tool_name].expected_latency
+            if cost > budget:
+                continue
+            budget -= cost
+            calls.append(call)
+        if not calls:
+            return []
+        logger.info(f"Tahmini ön yükleme: {[c[0] for c in calls]}. Kullanıcı: {user_id}")
+        with self._speculative_lock:
+            self._speculative_pending.update((user_id, call) for call in calls)
+        futures = prefetch_user_data(user_id, self._prefetch_pool, calls)
+        for call, future in zip(calls, futures):
+            future.add_done_callback(lambda _, key=(user_id, call): self._speculative_done(key))
+        return futures
+
+    def _speculative_done(self, key: Tuple):
+        with self._speculative_lock:
+            self._speculative_pending.discard(key)
 
     def generate_response(self, user_message: str, user_id: str) -> str:
+        return "".join(self.generate_response_stream(user_message, user_id))
+
+    def generate_response_stream(self, user_message: str, user_id: str):
+        """Yanıtı parça parça üretir; ilk parçalar LLM üretimi sürerken arayüze iletilebilir"""
         logger.info(f"Yanıt üretme süreci başladı. Kullanıcı: {user_id}, Mesaj: {user_message}")
+        deadline = Deadline(self.config.turn_budget_seconds)
+        # Başka bir worker'ın yazdığı güncel durumu al
+        self.sessions.get_or_create(user_id, refresh=True)
         try:
-            # Her mesajda duygu analizi yap ve kaydet
-            sentiment_result = self._analyze_sentiment(user_message)
-            self.sentiment_results[user_id] = sentiment_result
-            
-            # Memnuniyet puanı kontrolü
-            import re
-            if re.match(r'^\s*(?:10|[1-9])\s*$', user_message.strip()):
-                yanit = self._process_satisfaction_rating(user_message, user_id)
-                # Puan girildiğinde de sentiment_results güncellensin
-                self.sentiment_results[user_id] = {"sentiment": "manual_rating", "satisfaction_score": int(user_message.strip()), "emotion": "-", "confidence": 1.0}
-                return yanit
-            
-            # Duygu analizi yap
-            sentiment_result = self._analyze_sentiment(user_message)
-            self.sentiment_results[user_id] = sentiment_result
-            
-            # Kapanış ve teşekkür mesajı kontrolü
-            user_message_lower = user_message.lower()
-            tesekkur_list = [
-                "Rica ederim, size yardımcı olmaktan memnuniyet duydum.",
-                "Ne demek, her zaman hizmetinizdeyiz.",
-                "Yardımcı olabildiysem ne mutlu bana. Başka bir konuda destek gerekirse çekinmeden yazabilirsiniz.",
-                "Teşekkür ederim, size en iyi hizmeti sunmaya devam edeceğiz."
-            ]
-            kapanis_list = [
-                "Size yardımcı olmaktan memnuniyet duydum. İyi günler dilerim.",
-                "Görüşmek üzere, sağlıklı günler dilerim.",
-                "Size hizmet vermekten mutluluk duydum. Hoşça kalın.",
-                "İyi günler, tekrar görüşmek dileğiyle."
-            ]
-            # Kapanış ve teşekkür mesajı kontrolü
-            user_message_lower = user_message.lower()
-            kapanis_ifadeleri = [
-                "başka bir isteğim yok", "başka bir sorum yok", "yok teşekkürler", "hepsi bu", "bu kadar",
-                "hoşcakal", "hoşça kal", "görüşürüz", "bye", "güle güle", "elveda", "selametle", "kendine iyi bak",
-                "hayır teşekkürler", "hayır sağol", "hayır sağ olun"
-            ]
-            if any(x in user_message_lower for x in kapanis_ifadeleri):
-                # Memnuniyet anketi göster
-                if user_id not in self.satisfaction_survey_shown:
-                    self.satisfaction_survey_shown[user_id] = False
-                if not self.satisfaction_survey_shown[user_id]:
-                    self.satisfaction_survey_shown[user_id] = True
-                    return "Birkaç dakika ayırıp hizmetimizi 10 puan üzerinden değerlendirir misiniz? (1-10 arası bir sayı yazın)"
-                # Eğer anket zaten gösterildiyse ve kullanıcı tekrar kapanış yazdıysa, teşekkür veya kapanış mesajı gönder
-                return random.choice(kapanis_list)
-            # Teşekkür mesajı kontrolü (kapanıştan sonra gelmemesi için sona aldık)
-            if any(x in user_message_lower for x in ["teşekkür", "sağ ol", "eyvallah"]):
-                # Eğer kapanış cümlesi de içeriyorsa, sadece anket sorulsun, teşekkür mesajı gönderilmesin
-                if any(x in user_message_lower for x in kapanis_ifadeleri):
-                    if user_id not in self.satisfaction_survey_shown or not self.satisfaction_survey_shown[user_id]:
-                        self.satisfaction_survey_shown[user_id] = True
-                        return "Birkaç dakika ayırıp hizmetimizi 10 puan üzerinden değerlendirir misiniz? (1-10 arası bir sayı yazın)"
-                    return random.choice(kapanis_list)
-                return random.choice(tesekkur_list)
-            # Kapanış/teşekkür mesajı return ile fonksiyonu sonlandırdığı için, aşağıdaki telekom uyarısı asla tetiklenmez.
-            conversation_state = self._get_conversation_state(user_id)
-            conversation_state.conversation_history.append({
-                "role": "user",
-                "message": user_message,
-                "timestamp": time.time()
-            })
-            intent_analysis = self._analyze_intent_with_llm(user_message, conversation_state.conversation_history)
-            # Enum'a güvenli atama
-            intent_str = intent_analysis.get("intent", "genel_soru")
-            try:
-                conversation_state.current_intent = IntentType(intent_str)
-            except ValueError:
-                conversation_state.current_intent = IntentType.GENERAL_QUESTION
-            conversation_state.context.update(intent_analysis.get("context_update", {}))
-            tool_results = []
-            required_tools = intent_analysis.get("required_tools", [])
-            clarification = None
-            if intent_analysis.get("response_type") == "clarification":
-                clarification = "Daha fazla bilgiye ihtiyacım var: "
-                if intent_analysis.get("parameters"):
-                    eksik = ", ".join([k for k, v in intent_analysis["parameters"].items() if not v])
-                    if eksik:
-                        clarification += f"({eksik})"
-            for tool_name in required_tools:
-                parameters = intent_analysis.get("parameters", {})
-                result = self._execute_tool(tool_name, parameters, user_id)
-                tool_results.append(result)
-                if not result.get("success") and tool_name in ["musteri_bilgi_al"]:
-                    return (
-                        "Üzgünüz, müşteri bilgilerinize erişimde bir sorun yaşadık. Lütfen müşteri numaranızı kontrol ederek tekrar deneyin. "
-                        "Sorun devam ederse, destek ekibimizle iletişime geçebilirsiniz."
+            # Önceki turda sorulan slotun yanıtı: bekleyen araçlar doğrudan çalıştırılır
+            intent_analysis = self._resume_slots(user_message, user_id)
+            erken_araclar = {}
+            if intent_analysis is None:
+                # Puan, kapanış, teşekkür ve selamlaşma: LLM çağrısından önce
+                yanit = self._fast_path_reply(user_message, user_id)
+                if yanit is not None:
+                    yield yanit
+                    return
+
+                birlesik_analiz = self._start_sentiment(user_message, user_id, deadline, self._schedule_sentiment)
+                conversation_state = self._begin_turn(user_message, user_id)
+                alt_istekler = self._decompose(user_message)
+                if len(alt_istekler) > 1:
+                    alt_niyetler, intent_analysis = self._analyze_sub_intents(
+                        alt_istekler, conversation_state.conversation_history, birlesik_analiz, deadline)
+                    if alt_niyetler:
+                        # Her alt isteğe tek turda yanıt
+                        yanit = self._compound_reply(conversation_state, user_id, alt_niyetler, deadline)
+                        self._finish_turn(conversation_state, yanit)
+                        yield yanit
+                        return
+                else:
+                    intent_analysis = self._analyze_intent_with_llm(
+                        user_message, conversation_state.conversation_history,
+                        on_tools_ready=lambda tools, params: erken_araclar.update(
+                            self._dispatch_read_only_tools(tools, params, user_id, deadline)),
+                        include_sentiment=birlesik_analiz, deadline=deadline
                     )
+            else:
+                conversation_state = self._begin_turn(user_message, user_id)
+            intent_str, required_tools, clarification = self._apply_intent(conversation_state, intent_analysis, user_id)
+            yanit = self._slot_question(conversation_state, intent_str, required_tools,
+                                        intent_analysis.get("parameters") or {}, clarification)
+            if yanit is not None:
+                self._finish_turn(conversation_state, yanit)
+                yield yanit
+                return
+            tool_results = self._run_tools(
+                required_tools, intent_analysis.get("parameters") or {}, user_id, prefetched=erken_araclar,
+                deadline=deadline
+            )
+            yanit = self._critical_failure_reply(tool_results)
+            if yanit is not None:
+                yield yanit
+                return
             # Alakasız soru kontrolü
-            if intent_str == "genel_soru" and required_tools == ["bilgi_tabanı_ara"]:
-                # Tool sonucu boşsa veya çok alakasızsa (ör. result yok veya result'ta telekom anahtar kelimesi yok)
-                if tool_results and (not tool_results[0].get("result") or not any(word in tool_results[0].get("result", "").lower() for word in ["fatura", "paket", "internet", "hat", "ödeme", "sözleşme", "müşteri", "teknik"])):
-                    telekom_uyari_list = [
-                        "Ben bir telekom asistanıyım, sadece telekomünikasyon işlemleriyle ilgili yardımcı olabilirim. Fatura, paket, internet, ödeme gibi konularda sorularınızı beklerim.",
-                        "Size ancak telekom hizmetleriyle ilgili konularda yardımcı olabilirim. Fatura, paket, internet, ödeme veya sözleşme gibi sorularınız varsa memnuniyetle yanıtlarım.",
-                        "Yalnızca telekomünikasyon işlemleriyle ilgili destek verebiliyorum. Fatura, paket, internet, ödeme ve sözleşme konularında yardımcı olabilirim.",
-                        "Benim uzmanlık alanım telekom hizmetleri. Fatura, paket, internet, ödeme veya sözleşme hakkında sorularınızı yanıtlayabilirim.",
-                        "Telekomünikasyon dışında bir konuda yardımcı olamıyorum. Fatura, paket, internet, ödeme ve sözleşme gibi işlemler için buradayım."
-                    ]
-                    response = random.choice(telekom_uyari_list)
-                    conversation_state.conversation_history.append({
-                        "role": "bot",
-                        "message": response,
-                        "timestamp": time.time()
-                    })
-                    logger.info(f"Yanıt üretildi ve konuşma geçmişine eklendi. Yanıt: {response}")
-                    return response
-            response = self._generate_response_with_context(user_message, tool_results, conversation_state, clarification)
-            conversation_state.conversation_history.append({
-                "role": "bot",
-                "message": response,
-                "timestamp": time.time()
-            })
-            logger.info(f"Yanıt üretildi ve konuşma geçmişine eklendi. Yanıt: {response}")
-            return response
+            yanit = self._off_topic_reply(intent_str, required_tools, tool_results)
+            if yanit is not None:
+                self._finish_turn(conversation_state, yanit)
+                yield yanit
+                return
+            parcalar = []
+            for parca in self._stream_response_with_context(user_message, tool_results, conversation_state, clarification,
+                                                            deadline=deadline):
+                parcalar.append(parca)
+                yield parca
+            self._finish_turn(conversation_state, "".join(parcalar))
         except Exception as e:
             logger.error(f"Yanıt üretme hatası: {e}")
-            return (
-                "Sistemde geçici bir sorun oluştu. Lütfen daha sonra tekrar deneyin veya destek ekibimizle iletişime geçin."
+            yield GECICI_HATA_YANITI
+        finally:
+            self.sessions.save(user_id)
+
+    async def agenerate_response(self, user_message: str, user_id: str) -> str:
+        """generate_response'un asenkron karşılığı.
+
+        LLM, araç ve mock API beklemeleri event loop'u bloklamaz; tek bir loop
+        çok sayıda oturumu aynı anda yürütebilir. Aşamalar senkron yolla aynıdır.
+        """
+        logger.info(f"Yanıt üretme süreci başladı. Kullanıcı: {user_id}, Mesaj: {user_message}")
+        deadline = Deadline(self.config.turn_budget_seconds)
+        if self.sessions.backend is not None:
+            await asyncio.to_thread(self.sessions.get_or_create, user_id, True)
+        try:
+            intent_analysis = self._resume_slots(user_message, user_id)
+            if intent_analysis is None:
+                yanit = self._fast_path_reply(user_message, user_id)
+                if yanit is not None:
+                    return yanit
+                birlesik_analiz = self._start_sentiment(user_message, user_id, deadline, self._aschedule_sentiment)
+                conversation_state = self._begin_turn(user_message, user_id)
+                alt_istekler = self._decompose(user_message)
+                if len(alt_istekler) > 1:
+                    alt_niyetler, intent_analysis = await self._aanalyze_sub_intents(
+                        alt_istekler, conversation_state.conversation_history, birlesik_analiz, deadline)
+                    if alt_niyetler:
+                        yanit = await self._acompound_reply(conversation_state, user_id, alt_niyetler, deadline)
+                        self._finish_turn(conversation_state, yanit)
+                        return yanit
+                else:
+                    intent_analysis = await self._aanalyze_intent_with_llm(
+                        user_message, conversation_state.conversation_history, include_sentiment=birlesik_analiz,
+                        deadline=deadline
+                    )
+            else:
+                conversation_state = self._begin_turn(user_message, user_id)
+            intent_str, required_tools, clarification = self._apply_intent(conversation_state, intent_analysis, user_id)
+            yanit = self._slot_question(conversation_state, intent_str, required_tools,
+                                        intent_analysis.get("parameters") or {}, clarification)
+            if yanit is not None:
+                self._finish_turn(conversation_state, yanit)
+                return yanit
+            tool_results = await self._arun_tools(
+                required_tools, intent_analysis.get("parameters") or {}, user_id, deadline=deadline
             )
+            yanit = self._critical_failure_reply(tool_results)
+            if yanit is not None:
+                return yanit
+            yanit = self._off_topic_reply(intent_str, required_tools, tool_results)
+            if yanit is None:
+                yanit = await self._agenerate_response_with_context(user_message, tool_results, conversation_state,
+                                                                    clarification, deadline=deadline)
+            self._finish_turn(conversation_state, yanit)
+            return yanit
+        except Exception as e:
+            logger.error(f"Yanıt üretme hatası: {e}")
+            return GECICI_HATA_YANITI
+        finally:
+            if self.sessions.backend is not None:
+                await asyncio.to_thread(self.sessions.save, user_id)
+
+    def generate_responses(self, batch: Iterable[Tuple[str, str]]) -> Iterator[Tuple[int, str, str]]:
+        """(user_message, user_id) kuyruğunu toplu yanıtlar; (sıra, user_id, yanıt) üçlülerini akıtır.
+
+        Gece biriken e-posta/SMS mesajlarının yeniden oynatılması içindir. Oturum
+        okuma/yazma ve müşteri/fatura ön yüklemesi kullanıcı başına bir kez yapılır.
+        Mesajlar dalgalar halinde işlenir: k. dalga her kullanıcının k. mesajıdır,
+        böylece aynı kullanıcının mesajları sırasıyla yanıtlanır. Her dalgada
+        aşamalar (hızlı yol, niyet, araçlar, yanıt) tüm mesajlar için birlikte
+        çalışır ve aynı prompt'lar LLM'e bir kez gönderilir. Sonuçlar tamamlandıkça
+        döner; sıra alanı girişteki konumdur. Tur süre bütçesi uygulanmaz.
+        """
+        queues: "OrderedDict[str, List[Tuple[int, str]]]" = OrderedDict()
+        for index, (user_message, user_id) in enumerate(batch):
+            queues.setdefault(user_id, []).append((index, user_message))
+        if not queues:
+            return
+        logger.info(f"Toplu yanıt başladı. Mesaj: {sum(map(len, queues.values()))}, Kullanıcı: {len(queues)}")
+        with ThreadPoolExecutor(max_workers=self.config.batch_workers, thread_name_prefix="batch") as pool:
+            list(pool.map(self._open_batch_session, queues))
+            try:
+                for wave in range(max(map(len, queues.values()))):
+                    turns = [
+                        {"index": queue[wave][0], "user_id": user_id, "message": queue[wave][1],
+                         "last": wave == len(queue) - 1}
+                        for user_id, queue in queues.items() if wave < len(queue)
+                    ]
+                    yield from self._batch_wave(turns, pool)
+            finally:
+                list(pool.map(self.sessions.save, queues))
+
+    def _open_batch_session(self, user_id: str):
+        self.sessions.get_or_create(user_id, refresh=True)
+        if self.config.session_prefetch:
+            # Araç çağrıları sürmekte olan ön yüklemeyi single-flight ile bekler
+            prefetch_user_data(user_id, self._prefetch_pool)
+
+    def _batch_wave(self, turns: List[Dict[str, Any]], pool: ThreadPoolExecutor) -> Iterator[Tuple[int, str, str]]:
+        """Her kullanıcıdan en fazla bir mesaj içeren dalgayı aşama aşama işler"""
+        # 1. Slot yanıtı ve hızlı yol; LLM'e gidecek mesajlarda duygu analizi sadece kullanıcının son mesajı için
+        pending = []
+        for turn in turns:
+            try:
+                turn["resumed"] = self._resume_slots(turn["message"], turn["user_id"])
+                yanit = None if turn["resumed"] else self._fast_path_reply(turn["message"], turn["user_id"])
+            except Exception as e:
+                logger.error(f"Yanıt üretme hatası: {e}")
+                yanit = GECICI_HATA_YANITI
+            if yanit is not None:
+                yield turn["index"], turn["user_id"], yanit
+                continue
+            if turn["resumed"]:
+                turn["include_sentiment"] = False
+            elif turn["last"]:
+                turn["include_sentiment"] = self._start_sentiment(turn["message"], turn["user_id"], None,
+                                                                  self._schedule_sentiment)
+            else:
+                # Sonraki mesajın sonucu üzerine yazılacağından LLM duygu analizi yapılmaz
+                self._set_sentiment_result(turn["user_id"], self._fallback_sentiment_analysis(turn["message"]))
+                turn["include_sentiment"] = False
+            turn["state"] = self._begin_turn(turn["message"], turn["user_id"])
+            pending.append(turn)
+
+        # 2. Niyet: aynı prompt (mesaj + son geçmiş) bir kez analiz edilir
+        intents = {}
+        for turn in pending:
+            if turn["resumed"]:
+                continue
+            history = turn["state"].conversation_history
+            key = (self._build_intent_prompt(turn["message"], history, turn["include_sentiment"])[0],
+                   turn["include_sentiment"])
+            if key not in intents:
+                intents[key] = pool.submit(self._analyze_intent_with_llm, turn["message"], history,
+                                           include_sentiment=turn["include_sentiment"])
+            turn["intent_future"] = intents[key]
+        if len(intents) < sum(1 for turn in pending if not turn["resumed"]):
+            logger.info(f"Toplu niyet analizi: {len(pending)} mesaj, {len(intents)} LLM isteği")
+
+        # 3. Slot soruları ve araçlar (kullanıcılar arasında paralel)
+        for turn in pending:
+            # _apply_intent sonucu değiştirdiği için paylaşılan analizin kopyası kullanılır
+            intent_analysis = turn["resumed"] or copy.deepcopy(turn["intent_future"].result())
+            turn["intent"], turn["tools"], turn["clarification"] = self._apply_intent(
+                turn["state"], intent_analysis, turn["user_id"])
+            soru = self._slot_question(turn["state"], turn["intent"], turn["tools"],
+                                       intent_analysis.get("parameters") or {}, turn["clarification"])
+            if soru is not None:
+                self._finish_turn(turn["state"], soru)
+                yield turn["index"], turn["user_id"], soru
+                continue
+            turn["tools_future"] = pool.submit(self._run_tools, turn["tools"],
+                                               intent_analysis.get("parameters") or {}, turn["user_id"])
+
+        # 4. Yanıt: şablon/doğrudan metinler hemen, LLM özetleri tekrarsız ve tamamlandıkça
+        completions = {}
+        waiting = {}
+        for turn in pending:
+            if "tools_future" not in turn:
+                continue
+            try:
+                tool_results = turn["tools_future"].result()
+                yanit = self._critical_failure_reply(tool_results)
+                if yanit is not None:
+                    yield turn["index"], turn["user_id"], yanit
+                    continue
+                yanit = self._off_topic_reply(turn["intent"], turn["tools"], tool_results)
+                if yanit is None:
+                    plan = self._build_response_plan(turn["message"], tool_results, turn["state"], turn["clarification"])
+                    if "text" not in plan:
+                        key = (plan["call_site"], plan["prompt"])
+                        if key not in completions:
+                            completions[key] = pool.submit(self._complete_llm_text, plan)
+                        turn["plan"] = plan
+                        waiting.setdefault(completions[key], []).append(turn)
+                        continue
+                    yanit = plan["text"]
+            except Exception as e:
+                logger.error(f"Yanıt üretme hatası: {e}")
+                yield turn["index"], turn["user_id"], GECICI_HATA_YANITI
+                continue
+            self._finish_turn(turn["state"], yanit)
+            yield turn["index"], turn["user_id"], yanit
+        for future in as_completed(waiting):
+            try:
+                metin = future.result()
+            except Exception as e:
+                logger.error(f"Yanıt oluşturma hatası: {e}")
+                metin = None
+            for turn in waiting[future]:
+                plan = turn["plan"]
+                yanit = metin + plan["suffix"] if metin else plan["fallback"]
+                self._finish_turn(turn["state"], yanit)
+                yield turn["index"], turn["user_id"], yanit
+
+    def _complete_llm_text(self, plan: Dict[str, Any], deadline: Optional[Deadline] = None) -> str:
+        """Yanıt planının LLM metnini (sonek olmadan) üretir"""
+        return "".join(self._strip_stream([self._llm_chat(plan["prompt"], call_site=plan["call_site"],
+                                                          deadline=deadline)],
+                                          strip_quotes=plan["strip_quotes"]))
 
 # Harici servis örnekleri (gerçek sistem entegrasyonları için)
 class BillingService:
@@ -18,9 +18,10 @@ class ChatContext:
             prefix = "Kullanıcı:" if msg["role"] == "user" else "Bot:"
             context += f"{prefix} {msg['message']}\n"
         # Ek: önemli olaylar
-        from mock_apis import getBillingInfo, getUserInfo
+        # Araçlarla aynı önbellekten okunur; aynı turdaki musteri_bilgi_al/fatura_bilgi_al tekrar beklemez
+        from tools import call_api
         try:
-            billing = getBillingInfo(user_id, "current")
+            billing = call_api("getBillingInfo", user_id, "current")
             unpaid = 0
             last_due = "-"
             if billing.get("success"):
@@ -28,7 +29,7 @@ class ChatContext:
                 bills = billing["data"].get("bills", [])
                 if bills:
                     last_due = bills[-1]["month"]
-            customer = getUserInfo(user_id)
+            customer = call_api("getUserInfo", user_id)
             contract_end = customer["data"].get("contract_end_date", "-") if customer.get("success") else "-"
         except Exception:
             unpaid = 0
@@ -0,0 +1,83 @@
+import json
+from typing import Any, Dict
+
+
+class IncrementalJSONParser:
+    """Token akışından gelen JSON nesnesini parça parça ayrıştırır.
+
+    Her feed() çağrısı, o ana kadar değeri tamamlanan üst seviye anahtarları
+    döndürür; böylece nesnenin tamamı üretilmeden alanlar kullanılabilir.
+    Üst seviye nesne kapandığında done True olur. Nesneden önceki metin yok sayılır.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.values: Dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._expect_key = False
+        self._key = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        self.buffer += chunk
+        completed = {}
+        while self._pos < len(self.buffer) and not self.done:
+            i = self._pos
+            ch = self.buffer[i]
+            self._pos += 1
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = json.loads(self.buffer[self._string_start:i + 1])
+                        self._expect_key = False
+                    elif self._depth == 1:
+                        # Metin değeri kapanan tırnakla tamamlanır, virgülü beklemeye gerek yok
+                        self._complete_value(i + 1, completed)
+                continue
+            if self._depth == 0 and ch != "{":
+                continue
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                if self._depth == 1:
+                    self._complete_value(i, completed)
+                    self.done = True
+                elif self._depth == 2:
+                    # İç içe nesne/dizi değeri kapandı
+                    self._complete_value(i + 1, completed)
+                self._depth -= 1
+            elif self._depth == 1 and ch == ":":
+                self._value_start = i + 1
+            elif self._depth == 1 and ch == ",":
+                self._complete_value(i, completed)
+                self._expect_key = True
+        return completed
+
+    def _complete_value(self, end: int, completed: Dict[str, Any]):
+        if self._key is None or self._value_start is None:
+            return
+        raw = self.buffer[self._value_start:end].strip()
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = None
+        if value is not None or raw == "null":
+            self.values[self._key] = value
+            completed[self._key] = value
+        self._key = None
+        self._value_start = None
@@ -1,30 +1,422 @@
 import requests
+import asyncio
 import json
+import threading
+from typing import Any, Dict, Optional
+from requests.adapters import HTTPAdapter
+from chat.llm_cache import LLMResponseCache
+from chat.schemas import StructuredOutputError, validate_payload
+from chat.json_stream import IncrementalJSONParser
+from deadline import Deadline, DeadlineExceeded
+
+try:
+    import aiohttp
+except ImportError:  # Asenkron istemci isteğe bağlıdır
+    aiohttp = None
 
 OLLAMA_URL = "http://localhost:11434/api/generate"
+OLLAMA_MODEL = "llama3"
 
-def ollama_chat(prompt):
-    payload = {
-        "model": "llama3",
-        "prompt": prompt,
-        "stream": True
-    }
-    try:
-        response = requests.post(OLLAMA_URL, json=payload, timeout=120, stream=True)
-        response.raise_for_status()
-        full_response = ""
-        for line in response.iter_lines():
-            if line:
-                try:
-                    data = json.loads(line.decode("utf-8"))
-                    if "response" in data:
-                        full_response += data["response"]
-                    elif "message" in data:
-                        full_response += data["message"]
-                except Exception:
+# Bağlantı havuzu varsayılanları
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.05
+DEFAULT_READ_TIMEOUT = 120
+
+# Çağrı noktasına göre önbellek süreleri (saniye); 0 önbelleğe alma demektir
+CALL_SITE_TTLS = {
+    "sentiment": 24 * 3600,
+    "intent": 3600,
+    "summary": 600,
+    "response": 60,
+}
+
+
+class _OllamaClientBase:
+    """Senkron ve asenkron istemcilerin ortak ayarları, istek gövdesi ve önbellek anahtarları"""
+
+    def __init__(self, url: str = OLLAMA_URL, model: str = OLLAMA_MODEL,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 keep_alive: bool = True,
+                 options: Optional[Dict[str, Any]] = None,
+                 cache: Optional[LLMResponseCache] = None,
+                 cache_ttls: Optional[Dict[str, float]] = None):
+        self.url = url
+        self.model = model
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.keep_alive = keep_alive
+        self.options = options or {}
+        self.cache = cache
+        self.cache_ttls = dict(CALL_SITE_TTLS if cache_ttls is None else cache_ttls)
+
+    def _cache_key(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> str:
+        options = dict(self.options, format=schema) if schema is not None else self.options
+        return LLMResponseCache.make_key(self.model, prompt, options)
+
+    def _cache_ttl(self, call_site: Optional[str]) -> Optional[float]:
+        if call_site is None:
+            return None
+        return self.cache_ttls.get(call_site)
+
+    def _build_payload(self, prompt: str, schema: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": True
+        }
+        if self.options:
+            payload["options"] = self.options
+        if schema is not None:
+            # Ollama çıktıyı bu JSON şemasına göre kısıtlar
+            payload["format"] = schema
+        return payload
+
+    @staticmethod
+    def _parse_line(line: bytes):
+        """Akıştaki bir satırı (token, bitti_mi) olarak çözer; bozuk satırlarda None döner"""
+        try:
+            data = json.loads(line.decode("utf-8"))
+        except Exception:
+            return None
+        if "response" in data:
+            chunk = data["response"]
+        elif "message" in data:
+            chunk = data["message"]
+        else:
+            chunk = ""
+        return chunk, bool(data.get("done"))
+
+    @staticmethod
+    def _raise_if_expired(deadline: Optional[Deadline], error: Exception):
+        # Kalan süreyle kısaltılmış timeout bağlantı hatası değil bütçe aşımıdır
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded(str(error)) from error
+
+    def _parse_json(self, raw: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise StructuredOutputError(f"LLM geçerli JSON üretmedi: {e}")
+        validate_payload(payload, schema)
+        return payload
+
+
+class OllamaClient(_OllamaClientBase):
+    """Ollama için paylaşılan bağlantı havuzu üzerinden çalışan istemci.
+
+    Tek bir requests.Session kullanır; TCP bağlantıları keep-alive ile açık
+    tutulur ve her LLM çağrısında yeniden kurulmaz.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.session = self._create_session()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        # pool_block=True: havuz dolduğunda yeni soket açmak yerine boşalmasını bekle
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, pool_block=True)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        session.headers["Connection"] = "keep-alive" if self.keep_alive else "close"
+        return session
+
+    @property
+    def timeout(self):
+        return (self.connect_timeout, self.read_timeout)
+
+    def _iter_tokens(self, prompt: str, schema: Optional[Dict[str, Any]] = None,
+                     deadline: Optional[Deadline] = None):
+        """Ollama akışındaki token parçalarını geldikçe döndürür; hataları yükseltir.
+
+        deadline verilirse okuma zaman aşımı kalan süreyle sınırlanır ve süre
+        dolunca akış DeadlineExceeded ile kesilir.
+        """
+        payload = self._build_payload(prompt, schema)
+        timeout = self.timeout
+        if deadline is not None:
+            deadline.check()
+            timeout = (self.connect_timeout, deadline.timeout(self.read_timeout))
+        with self.session.post(self.url, json=payload, timeout=timeout, stream=True) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if deadline is not None:
+                    deadline.check()
+                parsed = self._parse_line(line) if line else None
+                if parsed is None:
                     continue
-        return full_response.strip() if full_response else "Ollama'dan yanıt alınamadı."
-    except requests.exceptions.RequestException as e:
-        return f"Ollama bağlantı hatası: {e}"
-    except Exception as e:
-        return f"Ollama yanıtı işlenemedi: {e}"
\ No newline at end of file
+                chunk, done = parsed
+                if chunk:
+                    yield chunk
+                if done:
+                    break
+
+    def chat_stream(self, prompt: str, call_site: Optional[str] = None, deadline: Optional[Deadline] = None):
+        """Yanıtı token token üreten generator (ilk token beklemeden arayüze iletilebilir)"""
+        key = self._cache_key(prompt) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        chunks = []
+        try:
+            for chunk in self._iter_tokens(prompt, deadline=deadline):
+                chunks.append(chunk)
+                yield chunk
+            if not chunks:
+                yield "Ollama'dan yanıt alınamadı."
+            elif key is not None:
+                # Sadece eksiksiz tamamlanan yanıtlar önbelleğe alınır
+                self.cache.set(key, "".join(chunks).strip(), ttl=self._cache_ttl(call_site))
+        except DeadlineExceeded:
+            raise
+        except requests.exceptions.RequestException as e:
+            self._raise_if_expired(deadline, e)
+            yield f"Ollama bağlantı hatası: {e}"
+        except Exception as e:
+            yield f"Ollama yanıtı işlenemedi: {e}"
+
+    def chat(self, prompt: str, call_site: Optional[str] = None, deadline: Optional[Deadline] = None) -> str:
+        key = self._cache_key(prompt) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            full_response = "".join(self._iter_tokens(prompt, deadline=deadline)).strip()
+            if not full_response:
+                return "Ollama'dan yanıt alınamadı."
+            if key is not None:
+                self.cache.set(key, full_response, ttl=self._cache_ttl(call_site))
+            return full_response
+        except DeadlineExceeded:
+            raise
+        except requests.exceptions.RequestException as e:
+            self._raise_if_expired(deadline, e)
+            return f"Ollama bağlantı hatası: {e}"
+        except Exception as e:
+            return f"Ollama yanıtı işlenemedi: {e}"
+
+    def chat_json(self, prompt: str, schema: Dict[str, Any], call_site: Optional[str] = None,
+                  deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Ollama'nın format parametresiyle şemaya uygun JSON üretir ve doğrular.
+
+        Bağlantı hatalarında requests istisnası, geçersiz çıktıda
+        StructuredOutputError, süre dolduğunda DeadlineExceeded yükseltir.
+        """
+        key = self._cache_key(prompt, schema) if self.cache is not None else None
+        raw = self.cache.get(key) if key is not None else None
+        from_cache = raw is not None
+        if raw is None:
+            raw = "".join(self._iter_tokens(prompt, schema=schema, deadline=deadline))
+        payload = self._parse_json(raw, schema)
+        if key is not None and not from_cache:
+            self.cache.set(key, raw, ttl=self._cache_ttl(call_site))
+        return payload
+
+    def chat_json_stream(self, prompt: str, schema: Dict[str, Any], call_site: Optional[str] = None,
+                         deadline: Optional[Deadline] = None):
+        """chat_json'un akışlı hali: üst seviye alanları tamamlandıkça (anahtar, değer) olarak verir.
+
+        Üst seviye nesne kapanınca HTTP akışı kapatılır (model kalan tokenları
+        üretmeye devam etmez). Tüm nesne sonunda şemaya göre doğrulanır.
+        """
+        key = self._cache_key(prompt, schema) if self.cache is not None else None
+        cached = self.cache.get(key) if key is not None else None
+        parser = IncrementalJSONParser()
+        tokens = iter([cached]) if cached is not None else self._iter_tokens(prompt, schema=schema, deadline=deadline)
+        try:
+            for chunk in tokens:
+                for field, value in parser.feed(chunk).items():
+                    yield field, value
+                if parser.done:
+                    break
+        finally:
+            # Generator kapatılınca alttaki HTTP yanıtı da kapanır
+            if hasattr(tokens, "close"):
+                tokens.close()
+        if not parser.done:
+            raise StructuredOutputError("LLM JSON nesnesini tamamlamadı")
+        validate_payload(parser.values, schema)
+        if key is not None and cached is None:
+            self.cache.set(key, json.dumps(parser.values, ensure_ascii=False), ttl=self._cache_ttl(call_site))
+
+    __call__ = chat
+
+    def close(self):
+        self.session.close()
+
+
+class AsyncOllamaClient(_OllamaClientBase):
+    """OllamaClient'ın asyncio karşılığı (aiohttp).
+
+    Oturum ilk istekte, çalışan event loop içinde oluşturulur; bağlantı
+    havuzu pool_size ile sınırlıdır. Loop değişirse (art arda asyncio.run)
+    eski oturum kapatılıp yenisi açılır; son oturum aclose() ile kapatılır.
+    Aynı LLMResponseCache senkron istemciyle paylaşılabilir.
+    """
+
+    def __init__(self, *args, **kwargs):
+        if aiohttp is None:
+            raise ImportError("AsyncOllamaClient için aiohttp paketi gerekli (pip install aiohttp)")
+        super().__init__(*args, **kwargs)
+        self.session = None
+        self._session_loop = None
+
+    async def _get_session(self):
+        loop = asyncio.get_running_loop()
+        # aiohttp oturumu oluşturulduğu loop'a bağlıdır (ör. art arda asyncio.run çağrıları)
+        if self.session is None or self.session.closed or self._session_loop is not loop:
+            if self.session is not None and not self.session.closed:
+                # Önceki loop kapanmış olabilir; aiohttp bu durumda sadece oturumu kapalı işaretler
+                await self.session.close()
+            self._session_loop = loop
+            connector = aiohttp.TCPConnector(limit=self.pool_size, force_close=not self.keep_alive)
+            timeout = aiohttp.ClientTimeout(sock_connect=self.connect_timeout, sock_read=self.read_timeout)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self.session
+
+    async def _iter_tokens(self, prompt: str, schema: Optional[Dict[str, Any]] = None,
+                           deadline: Optional[Deadline] = None):
+        """Ollama akışındaki token parçalarını geldikçe döndürür; hataları yükseltir"""
+        payload = self._build_payload(prompt, schema)
+        kwargs = {}
+        if deadline is not None:
+            deadline.check()
+            # Toplam istek süresi kalan bütçeyi aşamaz
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=deadline.remaining(), sock_connect=self.connect_timeout,
+                                                      sock_read=self.read_timeout)
+        session = await self._get_session()
+        async with session.post(self.url, json=payload, **kwargs) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if deadline is not None:
+                    deadline.check()
+                line = line.strip()
+                parsed = self._parse_line(line) if line else None
+                if parsed is None:
+                    continue
+                chunk, done = parsed
+                if chunk:
+                    yield chunk
+                if done:
+                    break
+
+    async def _collect(self, prompt: str, schema: Optional[Dict[str, Any]] = None,
+                       deadline: Optional[Deadline] = None) -> str:
+        tokens = self._iter_tokens(prompt, schema=schema, deadline=deadline)
+        try:
+            return "".join([chunk async for chunk in tokens])
+        finally:
+            await tokens.aclose()
+
+    async def chat_stream(self, prompt: str, call_site: Optional[str] = None, deadline: Optional[Deadline] = None):
+        """Yanıtı token token üreten asenkron generator"""
+        key = self._cache_key(prompt) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+        chunks = []
+        tokens = self._iter_tokens(prompt, deadline=deadline)
+        try:
+            async for chunk in tokens:
+                chunks.append(chunk)
+                yield chunk
+            if not chunks:
+                yield "Ollama'dan yanıt alınamadı."
+            elif key is not None:
+                self.cache.set(key, "".join(chunks).strip(), ttl=self._cache_ttl(call_site))
+        except DeadlineExceeded:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._raise_if_expired(deadline, e)
+            yield f"Ollama bağlantı hatası: {e}"
+        except Exception as e:
+            yield f"Ollama yanıtı işlenemedi: {e}"
+        finally:
+            await tokens.aclose()
+
+    async def chat(self, prompt: str, call_site: Optional[str] = None, deadline: Optional[Deadline] = None) -> str:
+        key = self._cache_key(prompt) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        try:
+            full_response = (await self._collect(prompt, deadline=deadline)).strip()
+            if not full_response:
+                return "Ollama'dan yanıt alınamadı."
+            if key is not None:
+                self.cache.set(key, full_response, ttl=self._cache_ttl(call_site))
+            return full_response
+        except DeadlineExceeded:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self._raise_if_expired(deadline, e)
+            return f"Ollama bağlantı hatası: {e}"
+        except Exception as e:
+            return f"Ollama yanıtı işlenemedi: {e}"
+
+    async def chat_json(self, prompt: str, schema: Dict[str, Any], call_site: Optional[str] = None,
+                        deadline: Optional[Deadline] = None) -> Dict[str, Any]:
+        """Şemaya uygun JSON üretir ve doğrular; bağlantı hatalarında aiohttp istisnası,
+        geçersiz çıktıda StructuredOutputError yükseltir."""
+        key = self._cache_key(prompt, schema) if self.cache is not None else None
+        raw = self.cache.get(key) if key is not None else None
+        from_cache = raw is not None
+        if raw is None:
+            raw = await self._collect(prompt, schema=schema, deadline=deadline)
+        payload = self._parse_json(raw, schema)
+        if key is not None and not from_cache:
+            self.cache.set(key, raw, ttl=self._cache_ttl(call_site))
+        return payload
+
+    __call__ = chat
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+        self.session = None
+        self._session_loop = None
+
+    aclose = close
+
+
+_default_client = None
+_default_async_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> OllamaClient:
+    """Süreç genelinde paylaşılan istemciyi döndürür (CentralAgent, TestRunner, app.py)"""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = OllamaClient(cache=LLMResponseCache())
+    return _default_client
+
+
+def get_default_async_client() -> AsyncOllamaClient:
+    """Senkron varsayılan istemciyle aynı yanıt önbelleğini paylaşan asenkron istemci"""
+    global _default_async_client
+    if _default_async_client is None:
+        cache = get_default_client().cache
+        with _default_client_lock:
+            if _default_async_client is None:
+                _default_async_client = AsyncOllamaClient(cache=cache)
+    return _default_async_client
+
+
+def ollama_chat(prompt):
+    return get_default_client().chat(prompt)
+
+
+def ollama_chat_stream(prompt):
+    return get_default_client().chat_stream(prompt)
@@ -0,0 +1,83 @@
+"""
+LLM'den yapılandırılmış (JSON şemalı) çıktı istenen çağrıların şemaları ve doğrulayıcısı
+"""
+from typing import Any, Dict
+
+INTENT_TYPES = [
+    "fatura_sorgula", "paket_degistir", "sifre_sifirla", "teknik_destek", "sikayet", "genel_soru",
+    "musteri_bilgi", "odeme", "sozlesme_yenile", "hizmet_aktifleştir", "sozlesme_bilgi_al"
+]
+
+TOOL_NAMES = [
+    "musteri_bilgi_al", "fatura_bilgi_al", "paket_listesi_al", "paket_degistir", "sifre_sifirla",
+    "ticket_olustur", "odeme_islem", "sozlesme_bilgi_al", "hizmet_aktifleştir", "bilgi_tabanı_ara"
+]
+
+# required_tools ve parameters bilerek öne alındı: model bu alanları önce üretir
+INTENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": INTENT_TYPES},
+        "required_tools": {"type": "array", "items": {"type": "string", "enum": TOOL_NAMES}},
+        "parameters": {"type": "object"},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "context_update": {"type": "object"},
+        "response_type": {"type": "string", "enum": ["immediate", "multi_step", "clarification"]}
+    },
+    "required": ["intent", "required_tools", "parameters", "response_type"]
+}
+
+SENTIMENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sentiment": {"type": "string", "enum": ["positive", "negative", "neutral"]},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "emotion": {"type": "string", "enum": ["satisfied", "frustrated", "happy", "angry", "neutral", "confused"]},
+        "satisfaction_score": {"type": "number", "minimum": 1, "maximum": 10}
+    },
+    "required": ["sentiment", "confidence", "emotion", "satisfaction_score"]
+}
+
+# Tek çağrıda niyet + duygu analizi; sentiment sona konur ki araçlar erkenden başlatılabilsin
+TURN_ANALYSIS_SCHEMA = {
+    "type": "object",
+    "properties": {**INTENT_SCHEMA["properties"], "sentiment": SENTIMENT_SCHEMA},
+    "required": INTENT_SCHEMA["required"] + ["sentiment"]
+}
+
+
+class StructuredOutputError(ValueError):
+    """LLM çıktısı beklenen JSON şemasına uymadığında yükseltilir"""
+
+
+_TYPE_CHECKS = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def validate_payload(payload: Any, schema: Dict[str, Any], path: str = "$"):
+    """JSON şemasının burada kullanılan alt kümesini (type, enum, required, min/max) doğrular"""
+    expected = schema.get("type")
+    if expected and not _TYPE_CHECKS[expected](payload):
+        raise StructuredOutputError(f"{path}: '{expected}' tipinde olmalı")
+    if "enum" in schema and payload not in schema["enum"]:
+        raise StructuredOutputError(f"{path}: geçersiz değer {payload!r}")
+    if "minimum" in schema and payload < schema["minimum"]:
+        raise StructuredOutputError(f"{path}: {schema['minimum']} değerinden küçük olamaz")
+    if "maximum" in schema and payload > schema["maximum"]:
+        raise StructuredOutputError(f"{path}: {schema['maximum']} değerinden büyük olamaz")
+    if expected == "object":
+        for key in schema.get("required", []):
+            if key not in payload:
+                raise StructuredOutputError(f"{path}: '{key}' alanı eksik")
+        for key, sub_schema in schema.get("properties", {}).items():
+            if key in payload:
+                validate_payload(payload[key], sub_schema, f"{path}.{key}")
+    if expected == "array" and "items" in schema:
+        for i, item in enumerate(payload):
+            validate_payload(item, schema["items"], f"{path}[{i}]")
@@ -0,0 +1,172 @@
+"""
+Oturum durumu için paylaşılan depolama arka uçları
+
+SessionStore her süreçte okuma önbelleği olarak çalışır; asıl kayıt burada
+tutulur. Böylece aynı kullanıcının ardışık mesajları farklı worker
+süreçlerine düşse de bağlam korunur.
+
+Kayıtlar sürüm numarasıyla saklanır. load(newer_than=v) yalnızca daha yeni
+sürüm varsa veriyi döndürür; yerel kopyası güncel olan worker veriyi tekrar
+çözmek zorunda kalmaz. save karşılaştır-ve-yaz (compare-and-set) yapar:
+okunan sürümden sonra başka bir yazma olduysa False döner ve SessionStore
+kaydı yeniden okuyup birleştirir; eski kopyası olan worker yeni turu geri
+alamaz. Arka plan duygu sonucu gibi tek alanlık değişiklikler
+update_fields ile kaydın tamamı yeniden yazılmadan eklenir.
+"""
+import json
+import logging
+import threading
+import zlib
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bu boyutun üzerindeki kayıtlar zlib ile sıkıştırılır
+COMPRESS_THRESHOLD = 512
+_RAW, _ZLIB = b"j", b"z"
+
+
+def encode_record(record: Dict[str, Any]) -> bytes:
+    """Oturum kaydını kısa JSON'a, büyükse zlib ile sıkıştırılmış baytlara çevirir"""
+    data = json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if len(data) > COMPRESS_THRESHOLD:
+        return _ZLIB + zlib.compress(data, 1)
+    return _RAW + data
+
+
+def decode_record(data: bytes) -> Dict[str, Any]:
+    data = bytes(data)
+    payload = zlib.decompress(data[1:]) if data[:1] == _ZLIB else data[1:]
+    return json.loads(payload.decode("utf-8"))
+
+
+class SessionBackend(ABC):
+    """Oturum arka uçlarının ortak arayüzü; eksik metodu olan arka uç oluşturulurken hata verir"""
+
+    @abstractmethod
+    def load(self, user_id: str, newer_than: int = 0) -> Optional[Tuple[int, Dict[str, Any]]]:
+        """Sürümü newer_than'dan büyük kayıt varsa (sürüm, kayıt), yoksa None döndürür"""
+
+    @abstractmethod
+    def save(self, user_id: str, expected_version: int, version: int, record: Dict[str, Any]) -> bool:
+        """Arka uçtaki sürüm hâlâ expected_version ise (0: kayıt yok) kaydı version olarak yazar.
+
+        Araya başka bir yazma girdiyse hiçbir şey yazmaz ve False döndürür.
+        """
+
+    @abstractmethod
+    def update_fields(self, user_id: str, fields: Dict[str, Any]) -> Optional[int]:
+        """Kaydın verilen üst düzey alanlarını değiştirir ve sürümü bir artırır.
+
+        Alanlar sonraki load'larda kayda uygulanır, tam yazma ile kayda katılır.
+        Yeni sürümü, kayıt yoksa None döndürür.
+        """
+
+    @abstractmethod
+    def delete(self, user_id: str):
+        """Kullanıcının kaydını siler"""
+
+
+class InMemorySessionBackend(SessionBackend):
+    """Süreç içi arka uç; tek worker ve testler için.
+
+    Kayıtlar paylaşılan arka uçlarla aynı şekilde kodlanmış bayt olarak
+    tutulur, böylece serileştirme hataları tek süreçte de görülür.
+    """
+
+    def __init__(self):
+        # user_id -> (sürüm, kodlanmış kayıt, update_fields ile gelen alanlar)
+        self._records: Dict[str, Tuple[int, bytes, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, user_id: str, newer_than: int = 0) -> Optional[Tuple[int, Dict[str, Any]]]:
+        with self._lock:
+            entry = self._records.get(user_id)
+        if entry is None or entry[0] <= newer_than:
+            return None
+        record = decode_record(entry[1])
+        record.update(json.loads(json.dumps(entry[2])))
+        return entry[0], record
+
+    def save(self, user_id: str, expected_version: int, version: int, record: Dict[str, Any]) -> bool:
+        data = encode_record(record)
+        with self._lock:
+            entry = self._records.get(user_id)
+            if (entry[0] if entry else 0) != expected_version:
+                return False
+            self._records[user_id] = (version, data, {})
+            return True
+
+    def update_fields(self, user_id: str, fields: Dict[str, Any]) -> Optional[int]:
+        with self._lock:
+            entry = self._records.get(user_id)
+            if entry is None:
+                return None
+            version = entry[0] + 1
+            self._records[user_id] = (version, entry[1], {**entry[2], **fields})
+            return version
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._records.pop(user_id, None)
+
+
+class MongoSessionBackend(SessionBackend):
+    """MongoDB'de kullanıcı başına tek doküman: {_id, v, data, f, updated_at}.
+
+    f, update_fields ile yazılan ve henüz tam kayda katılmamış alanlardır.
+
+    ttl_seconds verilirse updated_at üzerinde TTL index oluşturulur ve
+    boşta kalan oturumlar MongoDB tarafından silinir.
+    """
+
+    def __init__(self, uri: str = "mongodb://localhost:27017/", db_name: str = "callcenter",
+                 collection: str = "sessions", ttl_seconds: Optional[int] = None):
+        from pymongo import MongoClient, ReturnDocument
+        from pymongo.errors import DuplicateKeyError
+        from bson.binary import Binary
+        self._binary = Binary
+        self._return_after = ReturnDocument.AFTER
+        self._duplicate_key = DuplicateKeyError
+        self.client = MongoClient(uri)
+        self.collection = self.client[db_name][collection]
+        if ttl_seconds:
+            self.collection.create_index("updated_at", expireAfterSeconds=int(ttl_seconds))
+
+    def load(self, user_id: str, newer_than: int = 0) -> Optional[Tuple[int, Dict[str, Any]]]:
+        doc = self.collection.find_one({"_id": user_id, "v": {"$gt": newer_than}}, {"v": 1, "data": 1, "f": 1})
+        if doc is None:
+            return None
+        record = decode_record(doc["data"])
+        record.update(doc.get("f") or {})
+        return doc["v"], record
+
+    def save(self, user_id: str, expected_version: int, version: int, record: Dict[str, Any]) -> bool:
+        fields = {"v": version, "data": self._binary(encode_record(record)),
+                  "updated_at": datetime.now(timezone.utc)}
+        if expected_version == 0:
+            try:
+                self.collection.insert_one({"_id": user_id, **fields})
+                return True
+            except self._duplicate_key:
+                return False
+        result = self.collection.update_one(
+            {"_id": user_id, "v": expected_version},
+            {"$set": fields, "$unset": {"f": ""}}
+        )
+        return result.matched_count == 1
+
+    def update_fields(self, user_id: str, fields: Dict[str, Any]) -> Optional[int]:
+        doc = self.collection.find_one_and_update(
+            {"_id": user_id},
+            {"$set": {**{f"f.{key}": value for key, value in fields.items()},
+                      "updated_at": datetime.now(timezone.utc)},
+             "$inc": {"v": 1}},
+            projection={"v": 1}, return_document=self._return_after
+        )
+        return doc["v"] if doc else None
+
+    def delete(self, user_id: str):
+        self.collection.delete_one({"_id": user_id})
@@ -0,0 +1,50 @@
+"""
+Tur bazında süre bütçesi
+
+generate_response başında oluşturulur ve LLM istemcisine, araç yürütücüsüne
+aktarılır. Her aşama kalan süreye bakıp gerekirse daha ucuz yola düşer;
+ağ beklemeleri kalan süreyle sınırlandırılır.
+"""
+import time
+from typing import Callable, Optional
+
+
+class DeadlineExceeded(TimeoutError):
+    """Tur bütçesi bir bekleme sırasında doldu"""
+
+
+class Deadline:
+    """budget saniye sonra dolan süre sınırı; budget None ise sınırsızdır"""
+
+    __slots__ = ("budget", "clock", "expires_at")
+
+    def __init__(self, budget: Optional[float], clock: Callable[[], float] = time.monotonic):
+        self.budget = budget
+        self.clock = clock
+        self.expires_at = None if budget is None else clock() + budget
+
+    def remaining(self) -> float:
+        if self.expires_at is None:
+            return float("inf")
+        return max(0.0, self.expires_at - self.clock())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def has(self, seconds: float) -> bool:
+        """Kalan süre verilen aşama tahminini karşılıyor mu"""
+        return self.remaining() >= seconds
+
+    def timeout(self, default: Optional[float] = None) -> Optional[float]:
+        """Bekleme süresini kalan süreyle sınırlar (ör. HTTP read timeout)"""
+        if self.expires_at is None:
+            return default
+        remaining = self.remaining()
+        return remaining if default is None else min(default, remaining)
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded(f"Tur süre bütçesi ({self.budget} sn) doldu")
+
+    def __repr__(self) -> str:
+        return f"Deadline(budget={self.budget}, remaining={self.remaining():.2f})"
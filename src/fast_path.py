@@ -0,0 +1,89 @@
+"""
+LLM çağrısı gerektirmeyen mesajlar (puan, kapanış, teşekkür, selamlaşma) için hızlı yönlendirici
+"""
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+from text_features import fold_turkish
+
+# Öncelik sırasıyla; birden fazla rota eşleşirse listede önce gelen kazanır
+# (ör. "teşekkürler, görüşürüz" bir kapanıştır).
+RATING_ROUTE = "rating"
+CLOSING_ROUTE = "closing"
+THANKS_ROUTE = "thanks"
+GREETING_ROUTE = "greeting"
+
+CLOSING_PHRASES = (
+    "başka bir isteğim yok", "başka bir sorum yok", "yok teşekkürler", "hepsi bu kadar", "hepsi bu", "bu kadar",
+    "hoşcakal", "hoşça kal", "görüşürüz", "bye", "güle güle", "elveda", "selametle", "kendine iyi bak",
+    "hayır teşekkürler", "hayır sağol", "hayır sağ olun"
+)
+THANKS_PHRASES = ("teşekkür", "sağ ol", "sağol", "eyvallah")
+# Kapanış ve teşekkür ifadeleri mesajın tamamını (birbirleri ve bu dolgu kelimeleriyle) oluşturmalıdır:
+# "Faturam neden bu kadar yüksek?" kapanış, "Teşekkürler, faturamı öğrenmek istiyorum" teşekkür değildir.
+FILLER_WORDS = ("çok", "ederim", "ederiz", "ediyorum", "size", "tamam", "peki", "o zaman")
+# Selamlaşma sadece mesajın tamamıysa hızlı yoldan yanıtlanır ("merhaba faturam ne kadar" LLM'e gider).
+# "iyi günler" veda da olabildiği için burada yok.
+GREETING_PHRASES = ("merhaba", "merhabalar", "selam", "selamlar", "günaydın")
+
+
+@dataclass(frozen=True)
+class FastPathMatch:
+    route: str
+    phrase: str
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    # Uzun ifadeler önce denenir, katlanmış (ASCII) biçimleri tekilleştirilir
+    folded = sorted({fold_turkish(p) for p in phrases}, key=len, reverse=True)
+    return "|".join(re.escape(p) for p in folded)
+
+
+class FastPathRouter:
+    """Tüm ifade listelerini tek bir derlenmiş regex'te birleştirir.
+
+    Mesaj bir kez normalize edilip Türkçe harfleri katlanır (ş→s, ı→i ...) ve
+    tek geçişte taranır; böylece "tesekkurler" de "Teşekkürler!" de eşleşir.
+    İfadeler kelime başında eşleşir, sonu açıktır ("teşekkür" → "teşekkürler").
+    Kapanış ve teşekkür rotaları sadece kapanış/teşekkür ifadelerinden (ve
+    dolgu kelimelerinden) oluşan mesajlarda, selamlaşma sadece mesajın
+    tamamıysa eşleşir; istek içeren mesajlar LLM'e gider.
+    """
+
+    def __init__(self, closing_phrases: Iterable[str] = CLOSING_PHRASES,
+                 thanks_phrases: Iterable[str] = THANKS_PHRASES,
+                 greeting_phrases: Iterable[str] = GREETING_PHRASES,
+                 filler_words: Iterable[str] = FILLER_WORDS):
+        closing_phrases, thanks_phrases = list(closing_phrases), list(thanks_phrases)
+        # Mesajda yan yana gelebilen parçalar: kapanış/teşekkür ifadesi veya dolgu kelimesi
+        token = (rf"(?:(?:{_alternation([*closing_phrases, *thanks_phrases])})\w*"
+                 rf"|(?:{_alternation(filler_words)})\b)")
+
+        def whole_message(phrases: Iterable[str]) -> str:
+            # En az bir ifade phrases'ten, geri kalan her şey token
+            return rf"^(?:{token}\s+)*(?:{_alternation(phrases)})\w*(?:\s+{token})*$"
+
+        routes: Tuple[Tuple[str, str], ...] = (
+            (RATING_ROUTE, r"^(?:10|[1-9])$"),
+            (CLOSING_ROUTE, whole_message(closing_phrases)),
+            (THANKS_ROUTE, whole_message(thanks_phrases)),
+            (GREETING_ROUTE, rf"^(?:{_alternation(greeting_phrases)})$"),
+        )
+        self._priority: Dict[str, int] = {name: i for i, (name, _) in enumerate(routes)}
+        self._pattern = re.compile("|".join(f"(?P<{name}>{body})" for name, body in routes))
+
+    def match(self, text: str) -> Optional[FastPathMatch]:
+        folded = fold_turkish(text)
+        if not folded:
+            return None
+        best = None
+        for m in self._pattern.finditer(folded):
+            if best is None or self._priority[m.lastgroup] < self._priority[best.lastgroup]:
+                best = m
+        if best is None:
+            return None
+        return FastPathMatch(route=best.lastgroup, phrase=best.group())
+
+
+# Süreç başında bir kez derlenir
+DEFAULT_ROUTER = FastPathRouter()
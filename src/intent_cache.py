@@ -0,0 +1,83 @@
+"""
+Niyet analizi için anlamsal (en yakın komşu) önbellek
+"""
+import copy
+import logging
+import threading
+from typing import Any, Dict, Optional
+import numpy as np
+from text_features import HashedNgramVectorizer, normalize_turkish
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticIntentCache:
+    """Normalize edilmiş kullanıcı mesajları üzerinde kosinüs benzerliği ile çalışan önbellek.
+
+    Yeni mesaj, daha önce LLM ile analiz edilmiş bir mesaja eşik değerinden
+    daha benzerse o mesajın niyet JSON'u yeniden kullanılır. Kayıtlar sabit
+    boyutlu bir matriste tutulur; dolduğunda en eski kaydın üzerine yazılır.
+    """
+
+    def __init__(self, threshold: float = 0.9, max_entries: int = 512, min_words: int = 2,
+                 vectorizer: Optional[HashedNgramVectorizer] = None):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Tek kelimelik cevaplar ("Temmuz", "evet") bağlama bağlıdır, önbelleğe alınmaz
+        self.min_words = min_words
+        self.vectorizer = vectorizer or HashedNgramVectorizer()
+        self._vectors = np.zeros((max_entries, self.vectorizer.n_features), dtype=np.float32)
+        self._messages = [None] * max_entries
+        self._payloads = [None] * max_entries
+        self._size = 0
+        self._next = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "skipped": 0}
+
+    def _eligible(self, normalized: str) -> bool:
+        return len(normalized.split()) >= self.min_words
+
+    def lookup(self, user_message: str) -> Optional[Dict[str, Any]]:
+        normalized = normalize_turkish(user_message)
+        if not self._eligible(normalized):
+            self._stats["skipped"] += 1
+            return None
+        vector = self.vectorizer.transform_one(normalized, normalized=True)
+        with self._lock:
+            if self._size == 0:
+                self._stats["misses"] += 1
+                return None
+            similarities = self._vectors[:self._size] @ vector
+            best = int(np.argmax(similarities))
+            score = float(similarities[best])
+            if score < self.threshold:
+                self._stats["misses"] += 1
+                return None
+            self._stats["hits"] += 1
+            payload = copy.deepcopy(self._payloads[best])
+            matched = self._messages[best]
+        logger.info(f"Niyet önbellekten alındı. Benzerlik: {score:.3f}, Eşleşen mesaj: {matched}")
+        # Serbest metin parametresi mesajın kendisidir, eşleşen eski mesaj değil
+        if "query" in payload.get("parameters", {}):
+            payload["parameters"]["query"] = user_message
+        return payload
+
+    def add(self, user_message: str, intent_analysis: Dict[str, Any]):
+        normalized = normalize_turkish(user_message)
+        if not self._eligible(normalized) or not isinstance(intent_analysis, dict) or "intent" not in intent_analysis:
+            return
+        vector = self.vectorizer.transform_one(normalized, normalized=True)
+        with self._lock:
+            if normalized in self._messages:
+                slot = self._messages.index(normalized)
+            else:
+                slot = self._next
+                self._next = (self._next + 1) % self.max_entries
+                self._size = min(self._size + 1, self.max_entries)
+            self._vectors[slot] = vector
+            self._messages[slot] = normalized
+            self._payloads[slot] = copy.deepcopy(intent_analysis)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "size": self._size, "threshold": self.threshold}
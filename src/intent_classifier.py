@@ -0,0 +1,227 @@
+"""
+Yerel niyet sınıflandırıcı: TF-IDF karakter n-gramları + NumPy softmax regresyonu
+
+Eğitim verisi test_scenarios.py'deki etiketli mesajlar ve (varsa) üretimde
+LLM niyet analizlerinin yazıldığı JSONL kayıtlarıdır. Güveni kalibre
+edilmiş (sıcaklık ölçekleme) tahminler yeterince yüksekse CentralAgent
+LLM niyet çağrısını atlar.
+
+Eğitim ve dışa aktarma:
+    python intent_classifier.py --logs logs/intent_log.jsonl --out models/intent_classifier.npz
+"""
+import argparse
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+import numpy as np
+from text_features import HashedNgramVectorizer, normalize_turkish
+from slot_filling import parse_period
+from chat.schemas import INTENT_TYPES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "intent_classifier.npz")
+
+# Yerel tahminde kullanıcı mesajından doldurulabilen araç parametreleri: None mesajın
+# kendisi, fonksiyon mesajdan çıkarılan değerdir. Sadece okuma araçları buradadır; yazma
+# araçları (ticket_olustur, sifre_sifirla, odeme_islem...) ve burada olmayanlar için LLM'e gidilir.
+LOCAL_TOOL_PARAMETERS: Dict[str, Dict[str, Union[None, Callable[[str], Any]]]] = {
+    "musteri_bilgi_al": {},
+    # Dönem belirtilmemişse güncel fatura
+    "fatura_bilgi_al": {"period": lambda message: parse_period(message) or "current"},
+    "paket_listesi_al": {},
+    "sozlesme_bilgi_al": {},
+    "bilgi_tabanı_ara": {"query": None},
+}
+
+Example = Tuple[str, str, List[str]]
+
+
+def load_scenario_examples() -> List[Example]:
+    """test_scenarios.py'den (mesaj, niyet, araçlar) örnekleri.
+
+    Çok adımlı senaryolarda beklenen niyet son mesaja aittir; önceki
+    mesajlar bağlamdır ve etiketlenmez.
+    """
+    from test_scenarios import get_all_test_scenarios
+    return [(s.messages[-1], s.expected_intent, list(s.expected_tools)) for s in get_all_test_scenarios()]
+
+
+def load_log_examples(path: str) -> List[Example]:
+    """{"message", "intent", "required_tools"} satırlarından oluşan JSONL kayıtlarını okur"""
+    examples = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if row.get("message") and row.get("intent") in INTENT_TYPES:
+                examples.append((row["message"], row["intent"], list(row.get("required_tools") or [])))
+    return examples
+
+
+class LocalIntentClassifier:
+    """Hash'lenmiş karakter n-gramları üzerinde çok sınıflı lojistik regresyon.
+
+    predict() olasılıkları sıcaklık ölçekli softmax'tan gelir; sıcaklık
+    eğitimde ayrılan doğrulama kümesinde negatif log-olabilirliği en aza
+    indirecek şekilde seçilir, böylece güven değeri eşikle karşılaştırılabilir.
+    """
+
+    def __init__(self, vectorizer: Optional[HashedNgramVectorizer] = None, threshold: float = 0.85,
+                 min_words: int = 2):
+        self.vectorizer = vectorizer or HashedNgramVectorizer()
+        self.threshold = threshold
+        # Tek kelimelik mesajlar ("Temmuz", "evet") bağlama bağlıdır
+        self.min_words = min_words
+        self.classes: List[str] = []
+        self.idf = np.ones(self.vectorizer.n_features, dtype=np.float32)
+        self.weights = None
+        self.bias = None
+        self.temperature = 1.0
+        self.intent_tools: Dict[str, List[str]] = {}
+
+    # Özellikler
+    def _features(self, texts: Iterable[str]) -> np.ndarray:
+        counts = self.vectorizer.transform(texts) * self.idf
+        norms = np.linalg.norm(counts, axis=1, keepdims=True)
+        return counts / np.maximum(norms, 1e-12)
+
+    def _logits(self, X: np.ndarray) -> np.ndarray:
+        return X @ self.weights + self.bias
+
+    @staticmethod
+    def _softmax(logits: np.ndarray) -> np.ndarray:
+        logits = logits - logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    # Eğitim
+    def _fit_linear(self, X: np.ndarray, y: np.ndarray, epochs: int, lr: float, l2: float):
+        n, n_classes = X.shape[0], len(self.classes)
+        self.weights = np.zeros((X.shape[1], n_classes), dtype=np.float32)
+        self.bias = np.zeros(n_classes, dtype=np.float32)
+        targets = np.eye(n_classes, dtype=np.float32)[y]
+        for _ in range(epochs):
+            grad = (self._softmax(self._logits(X)) - targets) / n
+            self.weights -= lr * (X.T @ grad + l2 * self.weights)
+            self.bias -= lr * grad.sum(axis=0)
+
+    def _fit_temperature(self, X: np.ndarray, y: np.ndarray) -> float:
+        logits = self._logits(X)
+        best_t, best_nll = 1.0, np.inf
+        for t in np.logspace(-1.5, 1.0, 60):
+            probs = self._softmax(logits / t)
+            nll = -np.mean(np.log(probs[np.arange(len(y)), y] + 1e-12))
+            if nll < best_nll:
+                best_t, best_nll = float(t), nll
+        return best_t
+
+    def fit(self, examples: List[Example], epochs: int = 300, lr: float = 2.0, l2: float = 1e-4,
+            holdout: float = 0.2, seed: int = 0) -> Dict[str, Any]:
+        """Modeli eğitir; doğrulama doğruluğu ve sıcaklığı içeren özet döndürür"""
+        texts = [normalize_turkish(m) for m, _, _ in examples]
+        labels = [intent for _, intent, _ in examples]
+        self.classes = sorted(set(labels))
+        y = np.array([self.classes.index(label) for label in labels])
+
+        tools_by_intent: Dict[str, Counter] = {}
+        for _, intent, tools in examples:
+            tools_by_intent.setdefault(intent, Counter())[tuple(tools)] += 1
+        self.intent_tools = {intent: list(c.most_common(1)[0][0]) for intent, c in tools_by_intent.items()}
+
+        counts = self.vectorizer.transform(texts)
+        df = (counts > 0).sum(axis=0)
+        self.idf = (np.log((1 + len(texts)) / (1 + df)) + 1).astype(np.float32)
+        X = self._features(texts)
+
+        # Sıcaklık, eğitimde görülmeyen örnekler üzerinde kalibre edilir
+        rng = np.random.default_rng(seed)
+        order = rng.permutation(len(texts))
+        n_val = int(len(texts) * holdout)
+        val, train = order[:n_val], order[n_val:]
+        accuracy = None
+        if n_val:
+            self._fit_linear(X[train], y[train], epochs, lr, l2)
+            self.temperature = self._fit_temperature(X[val], y[val])
+            accuracy = float(np.mean(self._logits(X[val]).argmax(axis=1) == y[val]))
+        self._fit_linear(X, y, epochs, lr, l2)
+        return {"examples": len(texts), "classes": len(self.classes),
+                "holdout_accuracy": accuracy, "temperature": self.temperature}
+
+    # Tahmin
+    def predict(self, text: str) -> Tuple[str, float]:
+        X = self._features([normalize_turkish(text)])
+        probs = self._softmax(self._logits(X) / self.temperature)[0]
+        best = int(np.argmax(probs))
+        return self.classes[best], float(probs[best])
+
+    def analyze(self, user_message: str) -> Optional[Dict[str, Any]]:
+        """Güven eşiği aşılırsa LLM niyet JSON'u biçiminde sonuç, aşılmazsa None döndürür"""
+        if self.weights is None or len(normalize_turkish(user_message).split()) < self.min_words:
+            return None
+        intent, confidence = self.predict(user_message)
+        if confidence < self.threshold:
+            return None
+        tools = self.intent_tools.get(intent, [])
+        parameters = {}
+        for tool in tools:
+            if tool not in LOCAL_TOOL_PARAMETERS:
+                # Parametresi mesajdan çıkarılamayan araç: LLM'e bırak
+                return None
+            for param, extract in LOCAL_TOOL_PARAMETERS[tool].items():
+                parameters[param] = user_message if extract is None else extract(user_message)
+        logger.info(f"Niyet yerel sınıflandırıcıdan alındı: {intent} ({confidence:.2f})")
+        return {
+            "intent": intent,
+            "confidence": round(confidence, 3),
+            "required_tools": list(tools),
+            "parameters": parameters,
+            "context_update": {},
+            "response_type": "multi_step" if len(tools) > 1 else "immediate",
+        }
+
+    # Dışa aktarma
+    def save(self, path: str = DEFAULT_MODEL_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez_compressed(
+            path, weights=self.weights, bias=self.bias, idf=self.idf,
+            classes=np.array(self.classes), temperature=np.float32(self.temperature),
+            n_features=self.vectorizer.n_features, ngram_range=np.array(self.vectorizer.ngram_range),
+            intent_tools=json.dumps(self.intent_tools, ensure_ascii=False)
+        )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_MODEL_PATH, **kwargs) -> "LocalIntentClassifier":
+        with np.load(path, allow_pickle=False) as data:
+            vectorizer = HashedNgramVectorizer(int(data["n_features"]), tuple(int(n) for n in data["ngram_range"]))
+            model = cls(vectorizer=vectorizer, **kwargs)
+            model.weights = data["weights"]
+            model.bias = data["bias"]
+            model.idf = data["idf"]
+            model.classes = [str(c) for c in data["classes"]]
+            model.temperature = float(data["temperature"])
+            model.intent_tools = json.loads(str(data["intent_tools"]))
+        return model
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Yerel niyet sınıflandırıcıyı eğitir ve .npz olarak dışa aktarır")
+    parser.add_argument('--logs', nargs='*', default=[], help='LLM niyet kayıtları (JSONL)')
+    parser.add_argument('--out', type=str, default=DEFAULT_MODEL_PATH, help='Model dosyası')
+    parser.add_argument('--no-scenarios', action='store_true', help='test_scenarios.py örneklerini kullanma')
+    args = parser.parse_args()
+
+    examples = [] if args.no_scenarios else load_scenario_examples()
+    for log_path in args.logs:
+        examples.extend(load_log_examples(log_path))
+    classifier = LocalIntentClassifier()
+    summary = classifier.fit(examples)
+    classifier.save(args.out)
+    print(f"Örnek: {summary['examples']}, Sınıf: {summary['classes']}, "
+          f"Doğrulama doğruluğu: {summary['holdout_accuracy']}, Sıcaklık: {summary['temperature']:.3f}")
+    print(f"Model kaydedildi: {args.out}")
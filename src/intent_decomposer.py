@@ -0,0 +1,89 @@
+"""
+Birleşik istekleri ("paketimi değiştirmek istiyorum, faturamı da öğrenmek
+istiyorum") alt isteklere bölen yerel ayrıştırıcı
+
+Mesaj bağlaçlardan bölünür; bir konu ipucu içermeyen parça önceki parçaya
+eklenir. En az iki farklı konu grubu çıkmazsa mesaj bölünmez, böylece
+"fatura borcumu ödemek istiyorum" gibi tek isteklerde ek LLM çağrısı
+yapılmaz. Alt niyetler CentralAgent'ta eşzamanlı analiz edilir.
+"""
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from text_features import fold_turkish
+
+# Konu grubu → kelime başları (katlanmış); aynı gruptaki parçalar tek istek sayılır
+INTENT_CUES: Dict[str, Tuple[str, ...]] = {
+    "fatura": ("fatura", "borc", "bakiye"),
+    "odeme": ("ode",),
+    "paket": ("paket", "tarife"),
+    "sifre": ("sifre", "parola"),
+    "teknik": ("internet", "ariza", "yavas", "baglanti", "modem", "cekmiyor"),
+    "sozlesme": ("sozlesme", "taahhut"),
+    "hizmet": ("hizmet", "tv", "aktif"),
+}
+
+# Virgül sadece ardından boşluk gelirse böler ("150,50 TL" bölünmez)
+SPLIT_PATTERN = re.compile(
+    r"\s*(?:[;.!?]+\s+|,\s+|\b(?:ve|ayrıca|bir de|ardından|sonra da|aynı zamanda|hem de)\s+)",
+    re.IGNORECASE
+)
+
+
+class IntentDecomposer:
+    def __init__(self, cues: Optional[Dict[str, Iterable[str]]] = None, max_parts: int = 3):
+        cues = INTENT_CUES if cues is None else cues
+        self.max_parts = max_parts
+        self._cues = [(group, re.compile(rf"\b(?:{'|'.join(map(re.escape, stems))})"))
+                      for group, stems in cues.items()]
+
+    def groups(self, text: str) -> List[str]:
+        folded = fold_turkish(text)
+        return [group for group, pattern in self._cues if pattern.search(folded)]
+
+    def split(self, message: str) -> List[str]:
+        """Mesajı alt isteklere böler; birleşik değilse [message] döner"""
+        parts: List[Tuple[str, List[str]]] = []
+        for segment in SPLIT_PATTERN.split(message):
+            segment = segment.strip(" ,;")
+            if not segment:
+                continue
+            groups = self.groups(segment)
+            if parts and (not groups or not parts[-1][1]):
+                # İpucu olmayan parça (ör. "giriş yapamıyorum") önceki isteğin devamıdır
+                text, previous = parts[-1]
+                parts[-1] = (f"{text} {segment}", previous or groups)
+            elif parts and set(groups) <= set(parts[-1][1]):
+                # Aynı konunun devamı ("faturamı ve geçmiş faturalarımı")
+                parts[-1] = (f"{parts[-1][0]} {segment}", parts[-1][1])
+            else:
+                parts.append((segment, groups))
+        if len(parts) < 2 or len(parts) > self.max_parts:
+            return [message]
+        return [text for text, _ in parts]
+
+
+def merge_analyses(analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aynı niyete çıkan alt analizleri tek niyet analizinde birleştirir"""
+    merged = dict(analyses[0])
+    tools = list(merged.get("required_tools") or [])
+    parameters = dict(merged.get("parameters") or {})
+    for analysis in analyses[1:]:
+        tools += [t for t in analysis.get("required_tools") or [] if t not in tools]
+        for key, value in (analysis.get("parameters") or {}).items():
+            parameters.setdefault(key, value)
+        if analysis.get("response_type") == "clarification":
+            merged["response_type"] = "clarification"
+    merged["required_tools"] = tools
+    merged["parameters"] = parameters
+    return merged
+
+
+def distinct_intents(parts: List[str], analyses: List[Dict[str, Any]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Alt istekleri niyete göre tekilleştirir; aynı niyetli parçalar birleştirilir"""
+    by_intent: Dict[str, List[Tuple[str, Dict[str, Any]]]] = {}
+    for part, analysis in zip(parts, analyses):
+        by_intent.setdefault(analysis.get("intent", "genel_soru"), []).append((part, analysis))
+    return [
+        (" ".join(part for part, _ in items), merge_analyses([analysis for _, analysis in items]))
+        for items in by_intent.values()
+    ]
@@ -0,0 +1,114 @@
+"""
+Niyet geçiş istatistikleri ve tahmini sonraki araçlar
+
+Her tur için (önceki niyet → niyet) geçişi ve niyetin kullandığı araçlar
+sayılır. Tur bitince P(araç | şimdiki niyet) = Σ P(sonraki | şimdiki) ·
+P(araç | sonraki) hesaplanır; olasılığı yüksek okuma araçlarının sonuçları
+CentralAgent tarafından arka planda önbelleğe çekilir. Örneğin fatura
+sorgusundan sonra sık gelen paket sorusu ikinci turda sıcak veriye denk gelir.
+
+Tablo canlı turlardan öğrenilir; AgentConfig.conversation_log_path verilirse
+turlar JSONL'e yazılır ve ajan açılışında bu kayıtlardan yeniden kurulur.
+Kayıtta her satır oturum anahtarını taşır; aynı kullanıcının farklı
+oturumları (ve anahtarsız eski satırlarda SESSION_GAP'ten uzun aralıkla
+ayrılan turlar) ayrı konuşma sayılır, günler sonraki ilk tur START'tan gelir.
+"""
+import json
+import logging
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Konuşmanın ilk turu için önceki niyet
+START = "__baslangic__"
+# Bu kadar saniye sessizlikten sonraki tur yeni bir konuşmanın ilk turudur
+SESSION_GAP = 1800
+
+
+class IntentTransitionModel:
+    def __init__(self):
+        self._transitions: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._tool_usage: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._intent_counts: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, previous: Optional[str], intent: str, tools: Sequence[str] = ()):
+        with self._lock:
+            self._transitions[previous or START][intent] += 1
+            self._intent_counts[intent] += 1
+            for tool_name in set(tools):
+                self._tool_usage[intent][tool_name] += 1
+
+    def fit(self, conversations: Iterable[Sequence[Tuple[str, Sequence[str]]]]) -> "IntentTransitionModel":
+        """Her konuşma sıralı (niyet, araçlar) turlarından oluşur"""
+        for turns in conversations:
+            previous = None
+            for intent, tools in turns:
+                self.observe(previous, intent, tools)
+                previous = intent
+        return self
+
+    def next_intents(self, intent: Optional[str]) -> List[Tuple[str, float]]:
+        with self._lock:
+            counts = dict(self._transitions.get(intent or START, {}))
+        total = sum(counts.values())
+        if not total:
+            return []
+        return sorted(((nxt, n / total) for nxt, n in counts.items()), key=lambda x: x[1], reverse=True)
+
+    def next_tools(self, intent: Optional[str]) -> List[Tuple[str, float]]:
+        """Sonraki turda kullanılması beklenen araçlar, olasılığa göre azalan sırada"""
+        scores: Dict[str, float] = defaultdict(float)
+        for nxt, p_next in self.next_intents(intent):
+            with self._lock:
+                seen = self._intent_counts.get(nxt, 0)
+                usage = dict(self._tool_usage.get(nxt, {}))
+            for tool_name, n in usage.items():
+                scores[tool_name] += p_next * n / seen
+        return sorted(scores.items(), key=lambda x: x[1], reverse=True)
+
+    @classmethod
+    def from_log(cls, path: str, session_gap: float = SESSION_GAP) -> "IntentTransitionModel":
+        """append_log ile yazılan JSONL'den konuşmaları kurar.
+
+        Satırlar kullanıcı ve oturum anahtarına göre gruplanır; grup içinde
+        session_gap saniyeden uzun aralık da yeni konuşma başlatır.
+        """
+        groups: Dict[Tuple[str, Optional[str]], List[Tuple[float, str, List[str]]]] = defaultdict(list)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if row.get("user_id") and row.get("intent"):
+                    groups[(row["user_id"], row.get("session"))].append(
+                        (row.get("timestamp", 0), row["intent"], row.get("tools") or []))
+        model = cls()
+        for rows in groups.values():
+            rows.sort(key=lambda r: r[0])
+            model.fit(split_conversations(rows, session_gap))
+        logger.info(f"Niyet geçiş tablosu {sum(model._intent_counts.values())} turdan kuruldu: {path}")
+        return model
+
+
+def split_conversations(rows: Sequence[Tuple[float, str, List[str]]],
+                        session_gap: float = SESSION_GAP) -> List[List[Tuple[str, List[str]]]]:
+    """Zamana göre sıralı (zaman, niyet, araçlar) satırlarını aralığa göre konuşmalara böler"""
+    conversations: List[List[Tuple[str, List[str]]]] = []
+    last = None
+    for timestamp, intent, tools in rows:
+        if last is None or timestamp - last > session_gap:
+            conversations.append([])
+        conversations[-1].append((intent, tools))
+        last = timestamp
+    return conversations
+
+def append_log(path: str, row: Dict, lock: threading.Lock):
+    try:
+        with lock, open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(row, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logger.error(f"Konuşma kaydı yazılamadı: {e}")
@@ -0,0 +1,102 @@
+"""
+Oturum başına sabit kapasiteli, sıkıştırılmış konuşma geçmişi
+"""
+import sys
+import time
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+
+class MessageHistory:
+    """Son `capacity` mesajı tutan halka tampon.
+
+    Mesaj başına sözlük yerine paralel diziler kullanılır: roller intern
+    edilmiş tek string nesnesini paylaşır, zaman damgaları array('d') içinde
+    8 bayt yer kaplar. Okuma tarafı eski liste arayüzüyle uyumludur:
+    history[-5:] ve iterasyon {"role", "message", "timestamp"} sözlükleri döndürür.
+    """
+
+    __slots__ = ("capacity", "_roles", "_messages", "_timestamps", "_head")
+
+    def __init__(self, capacity: Optional[int] = 50, messages: Optional[Iterable[Dict]] = None):
+        # capacity None ise geçmiş sınırsızdır ve tampon hiç dönmez
+        self.capacity = capacity
+        self._roles: List[str] = []
+        self._messages: List[str] = []
+        self._timestamps = array("d")
+        # Tampon dolduktan sonra en eski kaydın indeksi
+        self._head = 0
+        for msg in messages or ():
+            self.append(msg["role"], msg["message"], msg.get("timestamp"))
+
+    def append(self, role: str, message: str, timestamp: Optional[float] = None):
+        role = sys.intern(role)
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.capacity is None or len(self._roles) < self.capacity:
+            self._roles.append(role)
+            self._messages.append(message)
+            self._timestamps.append(timestamp)
+            return
+        if not self.capacity:
+            return
+        # Dolu: en eski kaydın üzerine yaz
+        self._roles[self._head] = role
+        self._messages[self._head] = message
+        self._timestamps[self._head] = timestamp
+        self._head = (self._head + 1) % self.capacity
+
+    def _record(self, physical: int) -> Dict[str, Union[str, float]]:
+        return {
+            "role": self._roles[physical],
+            "message": self._messages[physical],
+            "timestamp": self._timestamps[physical],
+        }
+
+    def _physical(self, index: int) -> int:
+        return (self._head + index) % len(self._roles)
+
+    def __len__(self) -> int:
+        return len(self._roles)
+
+    def __bool__(self) -> bool:
+        return bool(self._roles)
+
+    def __iter__(self) -> Iterator[Dict[str, Union[str, float]]]:
+        for i in range(len(self._roles)):
+            yield self._record(self._physical(i))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._record(self._physical(i)) for i in range(*index.indices(len(self._roles)))]
+        n = len(self._roles)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("MessageHistory index out of range")
+        return self._record(self._physical(index))
+
+    def clear(self):
+        self._roles.clear()
+        self._messages.clear()
+        del self._timestamps[:]
+        self._head = 0
+
+    def columns(self) -> Tuple[List[str], List[str], List[float]]:
+        """Eskiden yeniye (roller, mesajlar, zaman damgaları); serileştirme için"""
+        order = [self._physical(i) for i in range(len(self._roles))]
+        return ([self._roles[i] for i in order], [self._messages[i] for i in order],
+                [self._timestamps[i] for i in order])
+
+    @classmethod
+    def from_columns(cls, capacity: Optional[int], roles: List[str], messages: List[str],
+                     timestamps: List[float]) -> "MessageHistory":
+        history = cls(capacity)
+        for role, message, timestamp in zip(roles, messages, timestamps):
+            history.append(role, message, timestamp)
+        return history
+
+    def to_list(self) -> List[Dict[str, Union[str, float]]]:
+        return list(self)
+
+    def __repr__(self) -> str:
+        return f"MessageHistory(capacity={self.capacity}, size={len(self)})"
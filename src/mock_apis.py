@@ -1,3 +1,4 @@
+import asyncio
 import json
 import time
 import random
@@ -7,6 +8,17 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Simüle edilmiş API gecikmeleri (saniye, min-maks)
+API_LATENCIES = {
+    "getUserInfo": (0.1, 0.5),
+    "getAvailablePackages": (0.2, 0.8),
+    "initiatePackageChange": (0.5, 1.5),
+    "getBillingInfo": (0.2, 0.6),
+    "processPayment": (1.0, 2.0),
+    "createSupportTicket": (0.3, 0.8),
+    "resetPassword": (0.5, 1.0),
+}
+
 class MockTelecomAPIs:
     """Telekom operatörü sistemleri için mock API'ler"""
     
@@ -160,10 +172,11 @@ class MockTelecomAPIs:
         Returns:
             Kullanıcı bilgileri sözlüğü veya hata mesajı
         """
+        self._simulate_latency("getUserInfo")
+        return self._getUserInfo(user_id)
+
+    def _getUserInfo(self, user_id: str) -> Dict[str, Any]:
         try:
-            # Simüle edilmiş API gecikmesi
-            time.sleep(random.uniform(0.1, 0.5))
-            
             if user_id == '00000000000':
                 return {"success": False, "error": "Müşteri bulunamadı. Lütfen geçerli bir müşteri numarası giriniz."}
 
@@ -211,9 +224,11 @@ class MockTelecomAPIs:
         Returns:
             Uygun paketler listesi
         """
+        self._simulate_latency("getAvailablePackages")
+        return self._getAvailablePackages(user_id)
+
+    def _getAvailablePackages(self, user_id: str) -> Dict[str, Any]:
         try:
-            time.sleep(random.uniform(0.2, 0.8))
-            
             if user_id not in self.customers:
                 return {
                     "success": False,
@@ -262,9 +277,11 @@ class MockTelecomAPIs:
         Returns:
             İşlem sonucu
         """
+        self._simulate_latency("initiatePackageChange")
+        return self._initiatePackageChange(user_id, package_id)
+
+    def _initiatePackageChange(self, user_id: str, package_id: str) -> Dict[str, Any]:
         try:
-            time.sleep(random.uniform(0.5, 1.5))
-            
             # Müşteri kontrolü
             if user_id not in self.customers:
                 return {
@@ -331,9 +348,11 @@ class MockTelecomAPIs:
         Returns:
             Fatura bilgileri
         """
+        self._simulate_latency("getBillingInfo")
+        return self._getBillingInfo(user_id, period)
+
+    def _getBillingInfo(self, user_id: str, period: str = "current") -> Dict[str, Any]:
         try:
-            time.sleep(random.uniform(0.2, 0.6))
-            
             if user_id not in self.bills:
                 return {
                     "success": False,
@@ -382,9 +401,11 @@ class MockTelecomAPIs:
         Returns:
             Ödeme sonucu
         """
+        self._simulate_latency("processPayment")
+        return self._processPayment(user_id, amount, payment_method)
+
+    def _processPayment(self, user_id: str, amount: float, payment_method: str) -> Dict[str, Any]:
         try:
-            time.sleep(random.uniform(1.0, 2.0))
-            
             if user_id not in self.customers:
                 return {
                     "success": False,
@@ -436,9 +457,11 @@ class MockTelecomAPIs:
         Returns:
             Talep sonucu
         """
+        self._simulate_latency("createSupportTicket")
+        return self._createSupportTicket(user_id, issue_type, description)
+
+    def _createSupportTicket(self, user_id: str, issue_type: str, description: str) -> Dict[str, Any]:
         try:
-            time.sleep(random.uniform(0.3, 0.8))
-            
             if user_id not in self.customers:
                 return {
                     "success": False,
@@ -484,9 +507,11 @@ class MockTelecomAPIs:
         Returns:
             İşlem sonucu
         """
+        self._simulate_latency("resetPassword")
+        return self._resetPassword(user_id)
+
+    def _resetPassword(self, user_id: str) -> Dict[str, Any]:
         try:
-            time.sleep(random.uniform(0.5, 1.0))
-            
             if user_id not in self.customers:
                 return {
                     "success": False,
@@ -515,7 +540,43 @@ class MockTelecomAPIs:
                 "error_code": "SYSTEM_ERROR"
             }
 
+    # Asenkron varyantlar: gecikme event loop'u bloklamadan beklenir
+    async def agetUserInfo(self, user_id: str) -> Dict[str, Any]:
+        await self._asimulate_latency("getUserInfo")
+        return self._getUserInfo(user_id)
+
+    async def agetAvailablePackages(self, user_id: str) -> Dict[str, Any]:
+        await self._asimulate_latency("getAvailablePackages")
+        return self._getAvailablePackages(user_id)
+
+    async def ainitiatePackageChange(self, user_id: str, package_id: str) -> Dict[str, Any]:
+        await self._asimulate_latency("initiatePackageChange")
+        return self._initiatePackageChange(user_id, package_id)
+
+    async def agetBillingInfo(self, user_id: str, period: str = "current") -> Dict[str, Any]:
+        await self._asimulate_latency("getBillingInfo")
+        return self._getBillingInfo(user_id, period)
+
+    async def aprocessPayment(self, user_id: str, amount: float, payment_method: str) -> Dict[str, Any]:
+        await self._asimulate_latency("processPayment")
+        return self._processPayment(user_id, amount, payment_method)
+
+    async def acreateSupportTicket(self, user_id: str, issue_type: str, description: str) -> Dict[str, Any]:
+        await self._asimulate_latency("createSupportTicket")
+        return self._createSupportTicket(user_id, issue_type, description)
+
+    async def aresetPassword(self, user_id: str) -> Dict[str, Any]:
+        await self._asimulate_latency("resetPassword")
+        return self._resetPassword(user_id)
+
     # Yardımcı fonksiyonlar
+    def _simulate_latency(self, api_name: str):
+        """Simüle edilmiş API gecikmesi"""
+        time.sleep(random.uniform(*API_LATENCIES[api_name]))
+
+    async def _asimulate_latency(self, api_name: str):
+        await asyncio.sleep(random.uniform(*API_LATENCIES[api_name]))
+
     def _get_region_from_address(self, address: str) -> str:
         """Adresten bölge bilgisini çıkarır"""
         if "İstanbul" in address:
@@ -624,4 +685,25 @@ def createSupportTicket(user_id: str, issue_type: str, description: str) -> Dict
     return mock_apis.createSupportTicket(user_id, issue_type, description)
 
 def resetPassword(user_id: str) -> Dict[str, Any]:
-    return mock_apis.resetPassword(user_id)
\ No newline at end of file
+    return mock_apis.resetPassword(user_id)
+
+async def agetUserInfo(user_id: str) -> Dict[str, Any]:
+    return await mock_apis.agetUserInfo(user_id)
+
+async def agetAvailablePackages(user_id: str) -> Dict[str, Any]:
+    return await mock_apis.agetAvailablePackages(user_id)
+
+async def ainitiatePackageChange(user_id: str, package_id: str) -> Dict[str, Any]:
+    return await mock_apis.ainitiatePackageChange(user_id, package_id)
+
+async def agetBillingInfo(user_id: str, period: str = "current") -> Dict[str, Any]:
+    return await mock_apis.agetBillingInfo(user_id, period)
+
+async def aprocessPayment(user_id: str, amount: float, payment_method: str) -> Dict[str, Any]:
+    return await mock_apis.aprocessPayment(user_id, amount, payment_method)
+
+async def acreateSupportTicket(user_id: str, issue_type: str, description: str) -> Dict[str, Any]:
+    return await mock_apis.acreateSupportTicket(user_id, issue_type, description)
+
+async def aresetPassword(user_id: str) -> Dict[str, Any]:
+    return await mock_apis.aresetPassword(user_id)
@@ -0,0 +1,215 @@
+"""
+Araç sonuçlarından LLM'siz Türkçe yanıt üreten şablon motoru
+
+Şablonlar Jinja benzeri küçük bir söz dizimi kullanır:
+    {{ degisken }}, {{ nesne.alan }}, {{ deger|filtre }}
+    {% if degisken %} ... {% else %} ... {% endif %}
+Tanımsız değişken hata verir; böylece eksik veride yanıt yanlış
+üretilmek yerine LLM özetine düşülür.
+"""
+import logging
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TemplateError(ValueError):
+    """Şablon derlenemediğinde veya veride beklenen alan olmadığında yükseltilir"""
+
+
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_TURKISH_UPPER = str.maketrans({"ı": "I", "i": "İ"})
+_AYLAR = ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+          "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
+
+
+def _tl(value: Any) -> str:
+    """1234.5 -> '1.234,50 TL', 250.0 -> '250 TL'"""
+    amount = float(value)
+    if amount == int(amount):
+        text = f"{int(amount):,}"
+    else:
+        text = f"{amount:,.2f}"
+    return text.replace(",", "_").replace(".", ",").replace("_", ".") + " TL"
+
+
+def _tarih(value: Any) -> str:
+    """ISO tarih -> '15 Aralık 2024'"""
+    date = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+    return f"{date.day} {_AYLAR[date.month - 1]} {date.year}"
+
+
+def _maske(value: Any) -> str:
+    """E-posta adresini maskeler: ahmet.yilmaz@email.com -> ah***@email.com"""
+    name, _, domain = str(value).partition("@")
+    return f"{name[:2]}***@{domain}" if domain else f"{name[:2]}***"
+
+
+FILTERS: Dict[str, Callable[[Any], str]] = {
+    "tl": _tl,
+    "tarih": _tarih,
+    "maske": _maske,
+    "lower": lambda v: str(v).translate(_TURKISH_LOWER).lower(),
+    "upper": lambda v: str(v).translate(_TURKISH_UPPER).upper(),
+}
+
+_TOKEN = re.compile(r"{{\s*(.+?)\s*}}|{%\s*(.+?)\s*%}")
+
+
+class Template:
+    """Bir kez derlenip her çağrıda sadece render edilen şablon"""
+
+    def __init__(self, source: str):
+        self.source = source
+        self._nodes, end, _ = self._parse(list(self._tokenize(source)), 0, ())
+        if end is not None:
+            raise TemplateError(f"Beklenmeyen etiket: {end}")
+
+    @staticmethod
+    def _tokenize(source: str):
+        pos = 0
+        for m in _TOKEN.finditer(source):
+            if m.start() > pos:
+                yield ("text", source[pos:m.start()])
+            if m.group(1) is not None:
+                expr, *filters = [part.strip() for part in m.group(1).split("|")]
+                for name in filters:
+                    if name not in FILTERS:
+                        raise TemplateError(f"Bilinmeyen filtre: {name}")
+                yield ("var", (expr, filters))
+            else:
+                yield ("tag", m.group(2))
+            pos = m.end()
+        if pos < len(source):
+            yield ("text", source[pos:])
+
+    def _parse(self, tokens: List[Tuple[str, Any]], index: int, stop: Tuple[str, ...]):
+        """stop etiketlerinden birine kadar düğümleri toplar; (düğümler, bitiren etiket, sonraki indeks)"""
+        nodes = []
+        while index < len(tokens):
+            kind, value = tokens[index]
+            index += 1
+            if kind != "tag":
+                nodes.append((kind, value))
+                continue
+            if value in stop:
+                return nodes, value, index
+            keyword, _, expr = value.partition(" ")
+            if keyword != "if":
+                raise TemplateError(f"Desteklenmeyen etiket: {value}")
+            body, end, index = self._parse(tokens, index, ("else", "endif"))
+            orelse = []
+            if end == "else":
+                orelse, end, index = self._parse(tokens, index, ("endif",))
+            if end != "endif":
+                raise TemplateError(f"Kapanmamış if: {expr}")
+            nodes.append(("if", (expr.strip(), body, orelse)))
+        return nodes, None, index
+
+    @staticmethod
+    def _lookup(expr: str, context: Dict[str, Any]) -> Any:
+        value: Any = context
+        for part in expr.split("."):
+            if isinstance(value, dict) and part in value:
+                value = value[part]
+            elif isinstance(value, list) and part.isdigit() and int(part) < len(value):
+                value = value[int(part)]
+            else:
+                raise TemplateError(f"Tanımsız değişken: {expr}")
+        return value
+
+    def _render(self, nodes, context: Dict[str, Any], out: List[str]):
+        for kind, value in nodes:
+            if kind == "text":
+                out.append(value)
+            elif kind == "var":
+                expr, filters = value
+                result = self._lookup(expr, context)
+                for name in filters:
+                    result = FILTERS[name](result)
+                out.append(str(result))
+            else:
+                expr, body, orelse = value
+                self._render(body if self._lookup(expr, context) else orelse, context, out)
+
+    def render(self, context: Dict[str, Any]) -> str:
+        out: List[str] = []
+        try:
+            self._render(self._nodes, context, out)
+        except TemplateError:
+            raise
+        except (TypeError, ValueError) as e:
+            raise TemplateError(f"Şablon işlenemedi: {e}")
+        return "".join(out)
+
+
+# Araç verisinden şablonda kullanılan türetilmiş alanlar
+def _billing_context(data: Dict[str, Any]) -> Dict[str, Any]:
+    bills = data["bills"]
+    unpaid = [bill for bill in bills if bill["status"] != "Ödendi"]
+    return {
+        **data,
+        "son_fatura": bills[0],
+        "coklu": len(bills) > 1,
+        # Birden fazla gecikmiş fatura varsa otomatik ödeme önerilir
+        "otomatik_odeme_oner": len(unpaid) >= 2,
+    }
+
+
+RESPONSE_TEMPLATES: Dict[str, str] = {
+    "fatura_bilgi_al": (
+        "{{ son_fatura.month }} faturanız {{ son_fatura.amount|tl }}"
+        "{% if son_fatura.paid_date %} ve {{ son_fatura.paid_date|tarih }} tarihinde ödenmiş."
+        "{% else %}, son ödeme tarihi {{ son_fatura.due_date|tarih }} ve henüz ödenmemiş.{% endif %}"
+        "{% if coklu %} Son {{ bill_count }} faturanızın toplamı {{ total_amount|tl }}.{% endif %}"
+        "{% if unpaid_amount %} Ödenmemiş toplam borcunuz {{ unpaid_amount|tl }}.{% else %} Şu an borcunuz bulunmuyor.{% endif %}"
+        "{% if otomatik_odeme_oner %}\n\nDilerseniz otomatik ödeme talimatı vermek ister misiniz?{% endif %}"
+    ),
+    "odeme_islem": (
+        "{{ amount|tl }} tutarındaki ödemeniz başarıyla alındı. "
+        "İşlem numaranız {{ payment_id }}, güncel bakiyeniz {{ new_balance|tl }}."
+    ),
+    "paket_degistir": (
+        "Paket değişikliği talebiniz alındı. Yeni paketiniz {{ new_package_details.name }} "
+        "({{ new_package_details.price|tl }}/ay) {{ activation_date|tarih }} tarihinde aktifleşecek. "
+        "Talep numaranız {{ change_id }}."
+    ),
+    "sifre_sifirla": (
+        "Şifre sıfırlama bağlantısı {{ email|maske }} adresinize gönderildi. "
+        "Bağlantı {{ expires_in }} boyunca geçerlidir."
+    ),
+    "musteri_bilgi_al": (
+        "Sayın {{ name }} {{ surname }}, {{ current_package }} paketini kullanıyorsunuz. "
+        "Bakiyeniz {{ balance|tl }}, ödeme durumunuz: {{ payment_status|lower }}."
+    ),
+}
+
+CONTEXT_BUILDERS: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    "fatura_bilgi_al": _billing_context,
+}
+
+
+class ResponseRenderer:
+    """Araç adına göre şablonu seçip yapılandırılmış araç verisiyle render eder"""
+
+    def __init__(self, templates: Optional[Dict[str, str]] = None,
+                 context_builders: Optional[Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]]] = None):
+        self.templates = {name: Template(source) for name, source in (templates or RESPONSE_TEMPLATES).items()}
+        self.context_builders = CONTEXT_BUILDERS if context_builders is None else context_builders
+
+    def supports(self, tool_name: str) -> bool:
+        return tool_name in self.templates
+
+    def render(self, tool_name: str, data: Optional[Dict[str, Any]]) -> Optional[str]:
+        """Şablon veya veri yoksa ya da veri şablona uymuyorsa None döndürür"""
+        template = self.templates.get(tool_name)
+        if template is None or not isinstance(data, dict):
+            return None
+        try:
+            builder = self.context_builders.get(tool_name)
+            return template.render(builder(data) if builder else data)
+        except (TemplateError, KeyError, IndexError) as e:
+            logger.warning(f"{tool_name} şablonu render edilemedi: {e}")
+            return None
@@ -0,0 +1,219 @@
+"""
+Kullanıcı oturumları (ConversationState) için sınırlı, LRU + boşta kalma süresiyle temizlenen depo
+
+backend verilirse depo paylaşılan arka ucun (db/session_backend.py) önünde
+okuma önbelleği olur: yerelde olmayan oturum arka uçtan okunur, save() ile
+geri yazılır. Yazma, okunan sürüme göre koşulludur; araya başka bir yazma
+girdiyse arka uçtaki kayıt okunup merge ile yerel oturuma katılır ve yazma
+tekrarlanır. LRU/TTL çıkarmaları sadece yerel kopyayı siler.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SessionStore:
+    """user_id -> oturum nesnesi eşlemesi; bellekte en fazla max_sessions oturum tutulur.
+
+    Oturumlar son erişim sırasına göre tutulur. idle_ttl saniyeden uzun süre
+    erişilmeyen oturumlar ve kapasite aşıldığında en eski oturum çıkarılır.
+    Süre dolumu ayrı bir thread yerine erişim sırasında kontrol edilir; en
+    eski kayıt başta olduğu için kontrol dolan kayıt sayısı kadar sürer.
+    """
+
+    def __init__(self, factory: Callable[[str], Any], max_sessions: int = 10000,
+                 idle_ttl: Optional[float] = 1800, clock: Callable[[], float] = time.monotonic,
+                 backend=None, dumps: Optional[Callable[[Any], Dict[str, Any]]] = None,
+                 loads: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 merge: Optional[Callable[[Any, Any], None]] = None, max_save_attempts: int = 3):
+        self.factory = factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.clock = clock
+        # Paylaşılan arka uç ve oturum <-> kayıt dönüşümleri
+        self.backend = backend
+        self.dumps = dumps
+        self.loads = loads
+        # Yazma çakışmasında merge(yerel, arka_uçtaki) yerel oturumu günceller; None ise yerel kazanır
+        self.merge = merge
+        self.max_save_attempts = max_save_attempts
+        self._sessions: "OrderedDict[str, Any]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        # Yerel kopyanın arka uçtaki sürümü
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._stats = {"created": 0, "hits": 0, "evicted_lru": 0, "evicted_ttl": 0,
+                       "backend_loads": 0, "backend_saves": 0, "backend_errors": 0, "backend_conflicts": 0}
+
+    def _evict_expired(self, now: float):
+        if self.idle_ttl is None:
+            return
+        while self._sessions:
+            user_id = next(iter(self._sessions))
+            if now - self._last_access[user_id] < self.idle_ttl:
+                break
+            self._remove(user_id)
+            self._stats["evicted_ttl"] += 1
+
+    def _remove(self, user_id: str):
+        self._sessions.pop(user_id, None)
+        self._last_access.pop(user_id, None)
+        self._versions.pop(user_id, None)
+
+    def _insert(self, user_id: str, session: Any, version: int, now: float):
+        self._sessions[user_id] = session
+        self._sessions.move_to_end(user_id)
+        self._versions[user_id] = version
+        self._last_access[user_id] = now
+        while len(self._sessions) > self.max_sessions:
+            oldest = next(iter(self._sessions))
+            self._remove(oldest)
+            self._stats["evicted_lru"] += 1
+            logger.info(f"Oturum kapasitesi doldu, en eski oturum çıkarıldı: {oldest}")
+
+    def _fetch(self, user_id: str, version: int):
+        """Arka uçta yerel kopyadan yeni kayıt varsa (sürüm, oturum) döndürür; ağ beklemesi kilit dışında yapılır"""
+        try:
+            loaded = self.backend.load(user_id, newer_than=version)
+            if loaded is None:
+                return None
+            return loaded[0], self.loads(loaded[1])
+        except Exception as e:
+            with self._lock:
+                self._stats["backend_errors"] += 1
+            logger.error(f"Oturum arka uçtan okunamadı ({user_id}): {e}")
+            return None
+
+    def _lookup(self, user_id: str, create: bool, refresh: bool) -> Optional[Any]:
+        with self._lock:
+            now = self.clock()
+            self._evict_expired(now)
+            session = self._sessions.get(user_id)
+            version = self._versions.get(user_id, 0)
+        fetched = None
+        if self.backend is not None and (session is None or refresh):
+            fetched = self._fetch(user_id, version)
+        with self._lock:
+            session = self._sessions.get(user_id)
+            if fetched is not None and fetched[0] > self._versions.get(user_id, 0):
+                self._stats["backend_loads"] += 1
+                session = fetched[1]
+                self._insert(user_id, session, fetched[0], now)
+            elif session is not None:
+                if create:
+                    self._stats["hits"] += 1
+                    self._sessions.move_to_end(user_id)
+                    self._last_access[user_id] = now
+            elif create:
+                session = self.factory(user_id)
+                self._stats["created"] += 1
+                self._insert(user_id, session, 0, now)
+            return session
+
+    def get_or_create(self, user_id: str, refresh: bool = False) -> Any:
+        """Oturumu döndürür (yoksa arka uçtan okur veya oluşturur) ve en yeni olarak işaretler.
+
+        refresh=True ise yerel kopya varken de arka uçta daha yeni sürüm aranır
+        (başka bir worker'ın yazdığı tur); tur başında bir kez kullanılır.
+        """
+        return self._lookup(user_id, create=True, refresh=refresh)
+
+    def get(self, user_id: str, refresh: bool = False) -> Optional[Any]:
+        """Oturumu oluşturmadan ve erişim zamanını değiştirmeden döndürür (okuma amaçlı)"""
+        return self._lookup(user_id, create=False, refresh=refresh)
+
+    def save(self, user_id: str):
+        """Yerel oturumu yeni sürüm olarak arka uca yazar; arka uç yoksa bir şey yapmaz"""
+        if self.backend is None:
+            return
+        for _ in range(self.max_save_attempts):
+            with self._lock:
+                session = self._sessions.get(user_id)
+                if session is None:
+                    return
+                expected = self._versions.get(user_id, 0)
+                record = self.dumps(session)
+            try:
+                saved = self.backend.save(user_id, expected, expected + 1, record)
+            except Exception as e:
+                with self._lock:
+                    self._stats["backend_errors"] += 1
+                logger.error(f"Oturum arka uca yazılamadı ({user_id}): {e}")
+                return
+            if saved:
+                with self._lock:
+                    self._stats["backend_saves"] += 1
+                    if self._sessions.get(user_id) is session:
+                        self._versions[user_id] = expected + 1
+                return
+            # Okunan sürümden sonra başka bir yazma oldu: güncel kaydı al, birleştir, tekrar dene
+            with self._lock:
+                self._stats["backend_conflicts"] += 1
+            fetched = self._fetch(user_id, 0)
+            with self._lock:
+                if self._sessions.get(user_id) is not session:
+                    return
+                if fetched is None:
+                    # Kayıt silinmiş (ör. TTL): yeni kayıt olarak yazılır
+                    self._versions[user_id] = 0
+                else:
+                    if self.merge is not None:
+                        self.merge(session, fetched[1])
+                    self._versions[user_id] = fetched[0]
+        logger.error(f"Oturum yazma çakışması çözülemedi ({user_id}), {self.max_save_attempts} deneme")
+
+    def update(self, user_id: str, fields: Dict[str, Any]):
+        """Arka uçtaki kaydın sadece verilen alanlarını yazar (ör. arka plan duygu sonucu).
+
+        Kaydın tamamı yeniden yazılmadığı için eski yerel kopya başka bir
+        worker'ın turunu ezemez. Değişiklik yerel oturuma çağıran tarafından uygulanır.
+        """
+        if self.backend is None:
+            return
+        try:
+            version = self.backend.update_fields(user_id, fields)
+        except Exception as e:
+            with self._lock:
+                self._stats["backend_errors"] += 1
+            logger.error(f"Oturum alanları arka uca yazılamadı ({user_id}): {e}")
+            return
+        if version is None:
+            # Arka uçta henüz kayıt yok; değişiklik sonraki tam yazmayla gider
+            return
+        with self._lock:
+            self._stats["backend_saves"] += 1
+            if self._versions.get(user_id) == version - 1:
+                # Arada başka yazma yok: yerel kopya arka uçla aynı
+                self._versions[user_id] = version
+
+    def discard(self, user_id: str):
+        with self._lock:
+            self._remove(user_id)
+
+    def evict_expired(self) -> int:
+        """Süresi dolan oturumları hemen temizler; çıkarılan oturum sayısını döndürür"""
+        with self._lock:
+            before = len(self._sessions)
+            self._evict_expired(self.clock())
+            return before - len(self._sessions)
+
+    def __contains__(self, user_id: str) -> bool:
+        with self._lock:
+            return user_id in self._sessions
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            messages = sum(len(getattr(s, "conversation_history", ())) for s in self._sessions.values())
+            return {
+                **self._stats,
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "resident_messages": messages,
+            }
@@ -0,0 +1,102 @@
+"""
+Eşzamanlı aynı çağrıları tek backend isteğinde birleştiren single-flight katmanı
+
+Aynı anahtarla gelen çağrılardan ilki (lider) isteği yapar; lider bitene kadar
+gelen diğerleri yeni istek açmadan onun sonucunu (veya hatasını) paylaşır.
+Lider bittikten sonra gelen çağrı yeni bir istektir; sonuçları saklamak
+önbelleğin (tool_cache.py) işidir.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Thread'ler arası single-flight"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Bu anahtarla süren bir istek var mı (istatistikleri etkilemez)"""
+        with self._lock:
+            return key in self._calls
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.stats["calls"] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.event.set()
+
+
+class AsyncSingleFlight:
+    """Event loop içi single-flight; anahtarlar loop başına ayrı tutulur"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"calls": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        # Future'lar oluşturuldukları loop'a bağlıdır
+        key = (id(loop), key)
+        with self._lock:
+            self.stats["calls"] += 1
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = loop.create_future()
+            else:
+                self.stats["coalesced"] += 1
+        if not leader:
+            # Bekleyenlerden birinin iptali liderin isteğini iptal etmemeli
+            return await asyncio.shield(future)
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            # Lider iptal edildi (ör. tur bütçesi doldu); bekleyenler kendi turlarında
+            # iptal değil sıradan bir hata görmeli
+            future.set_exception(RuntimeError("Paylaşılan istek iptal edildi"))
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Bekleyen yoksa "exception was never retrieved" uyarısı verilmesin
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
@@ -0,0 +1,218 @@
+"""
+Eksik parametreli araç çağrıları için slot doldurma durum makinesi
+
+Ajan bir parametreyi sorduğunda (ör. "Hangi ayın faturasını öğrenmek
+istiyorsunuz?") niyet, araç listesi ve toplanan parametreler oturumun
+pending_actions alanına yazılır. Kullanıcının sonraki kısa yanıtı burada
+yerel olarak ayrıştırılır ve bekleyen araçlar LLM niyet/duygu analizi
+yapılmadan çalıştırılır. Yanıt ayrıştırılamazsa veya olumsuzsa ("hayır,
+ödemeyeceğim") bekleyen işlem düşürülür ve mesaj yeni bir istek olarak normal
+yoldan işlenir.
+
+Durumlar: boşta (pending_actions boş) → slot bekleniyor (tek kayıt) →
+slot dolunca başka eksik varsa yine slot bekleniyor, yoksa boşta. Bekleyen
+araçlardan biri yazma aracıysa son slottan sonra işlem özetlenip onay
+istenir (confirmed slotu); araçlar ancak "evet" yanıtıyla çalışır.
+Kayıtlar JSON'a yazılabilir sözlüklerdir; oturum arka ucuyla taşınır.
+"""
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from text_features import fold_turkish
+
+SLOT_QUESTIONS: Dict[str, str] = {
+    "period": "Hangi ayın faturasını öğrenmek istiyorsunuz? Örnek: Temmuz",
+    "amount": "Ne kadar ödeme yapmak istiyorsunuz? Örnek: 250",
+    "payment_method": "Hangi yöntemle ödemek istiyorsunuz? Örnek: kredi kartı veya havale",
+    "new_package_id": "Hangi pakete geçmek istiyorsunuz? Örnek: Premium 5G",
+}
+
+MONTHS = ("ocak", "subat", "mart", "nisan", "mayis", "haziran",
+          "temmuz", "agustos", "eylul", "ekim", "kasim", "aralik")
+
+PAYMENT_METHODS: Tuple[Tuple[str, str], ...] = (
+    ("kredi karti", "credit_card"), ("kart", "credit_card"),
+    ("havale", "bank_transfer"), ("eft", "bank_transfer"), ("banka", "bank_transfer"),
+)
+
+# Paket adı ve kısaltmaları (katlanmış) → paket kimliği; mock_apis.py'deki paketlerle aynı
+PACKAGE_IDS: Dict[str, str] = {
+    "sinirsiz": "PN1", "4g": "PN1", "premium": "PN2", "5g": "PN2",
+    "ekonomik": "PN3", "aile": "PN4", "ogrenci": "PN5",
+}
+
+# Tutar sadece tek başına ("250", "250,50 TL") ya da TL/lira ile birlikte yazılmışsa kabul edilir
+_AMOUNT_ONLY = re.compile(r"^\s*(\d+(?:[.,]\d{1,2})?)\s*(?:tl|lira)?\s*[.!]?\s*$")
+_AMOUNT_WITH_CURRENCY = re.compile(r"(\d+(?:[.,]\d{1,2})?)\s*(?:tl|lira)\b")
+# Katlanmış metinde ret ve olumsuz fiil ekleri ("odemeyecegim", "istemiyorum")
+_NEGATION = re.compile(r"\b(?:hayir|yok|vazgec|iptal|degil)|m[ae]y[ae]c[ae][kg]|m[iu]yor")
+_CONFIRMATION = re.compile(r"\b(?:evet|onay|tamam|olur|kabul|eminim)")
+_PACKAGE_ID = re.compile(r"\bpn\s?(\d)\b")
+_LAST_MONTHS = re.compile(r"\b(\d+)\s+ay")
+
+
+def parse_period(text: str, month: Optional[int] = None) -> Optional[str]:
+    """Ay adı veya "son 3 ay" gibi ifadeyi getBillingInfo dönemine çevirir.
+
+    API sadece güncel, son 3 ve son 6 ay dönemlerini bilir; ay adları
+    bulunduğu en dar döneme, 6 aydan eskiler son 6 aya düşer.
+    """
+    folded = fold_turkish(text)
+    last = _LAST_MONTHS.search(folded)
+    if last:
+        return "last_3_months" if int(last.group(1)) <= 3 else "last_6_months"
+    if re.search(r"\b(?:bu ay|guncel|son fatura|simdiki)", folded):
+        return "current"
+    for i, name in enumerate(MONTHS):
+        if re.search(rf"\b{name}", folded):
+            current = month or time.localtime().tm_mon
+            back = (current - 1 - i) % 12
+            if back == 0:
+                return "current"
+            return "last_3_months" if back < 3 else "last_6_months"
+    if re.search(r"\bgecen ay", folded):
+        return "last_3_months"
+    return None
+
+
+def is_negative(text: str) -> bool:
+    return bool(_NEGATION.search(fold_turkish(text)))
+
+
+def parse_amount(text: str) -> Optional[float]:
+    """Açık tutar: sadece sayı ya da "250 TL" gibi birimli sayı; "2 faturayı" tutar değildir"""
+    if is_negative(text):
+        return None
+    lowered = text.lower()
+    match = _AMOUNT_ONLY.match(lowered) or _AMOUNT_WITH_CURRENCY.search(lowered)
+    if not match:
+        return None
+    amount = float(match.group(1).replace(",", "."))
+    return amount if amount > 0 else None
+
+
+def parse_confirmation(text: str) -> Optional[bool]:
+    """Sadece açık onay True döner; ret veya başka bir şey None"""
+    if is_negative(text):
+        return None
+    return True if _CONFIRMATION.search(fold_turkish(text)) else None
+
+
+def parse_payment_method(text: str) -> Optional[str]:
+    if is_negative(text):
+        return None
+    folded = fold_turkish(text)
+    for phrase, method in PAYMENT_METHODS:
+        if re.search(rf"\b{phrase}", folded):
+            return method
+    return None
+
+
+def parse_package_id(text: str) -> Optional[str]:
+    if is_negative(text):
+        return None
+    folded = fold_turkish(text)
+    match = _PACKAGE_ID.search(folded)
+    if match:
+        return f"PN{match.group(1)}"
+    for name, package_id in PACKAGE_IDS.items():
+        if re.search(rf"\b{name}", folded):
+            return package_id
+    return None
+
+
+SLOT_PARSERS: Dict[str, Callable[[str], Any]] = {
+    "period": parse_period,
+    "amount": parse_amount,
+    "payment_method": parse_payment_method,
+    "new_package_id": parse_package_id,
+}
+
+# Yazma araçları slot yanıtlarıyla tamamlandıktan sonra sorulan onay
+CONFIRMATION_SLOT = "confirmed"
+
+
+class SlotFiller:
+    """Araç metaverisine (parameters, read_only) göre eksik slotları sorar ve doldurur.
+
+    Okuma araçlarının eksik parametresi sadece LLM açıklama istediğinde
+    (response_type == "clarification") sorulur; yazma araçlarınınki her zaman,
+    çünkü eksik parametreyle çalıştırılamazlar. Slot yanıtlarıyla tamamlanan
+    yazma araçları için parametrelerde confirmed=False bulunur ve open
+    çalıştırmadan önce onay sorar.
+    """
+
+    def __init__(self, tools: Dict[str, Any], parsers: Optional[Dict[str, Callable[[str], Any]]] = None,
+                 questions: Optional[Dict[str, str]] = None):
+        self.tools = tools
+        self.parsers = SLOT_PARSERS if parsers is None else parsers
+        self.questions = SLOT_QUESTIONS if questions is None else questions
+
+    def missing_slot(self, tool_names: List[str], parameters: Dict[str, Any],
+                     clarification: bool = False) -> Optional[Tuple[str, str]]:
+        """Sorulabilecek ilk eksik (araç, parametre) çifti"""
+        for tool_name in tool_names:
+            tool = self.tools.get(tool_name)
+            if tool is None or (tool.read_only and not clarification):
+                continue
+            for param in tool.parameters:
+                if param in self.parsers and parameters.get(param) in (None, ""):
+                    return tool_name, param
+        if parameters.get(CONFIRMATION_SLOT) is False:
+            for tool_name in tool_names:
+                tool = self.tools.get(tool_name)
+                if tool is not None and not tool.read_only:
+                    return tool_name, CONFIRMATION_SLOT
+        return None
+
+    def _confirmation_question(self, tool_name: str, parameters: Dict[str, Any]) -> str:
+        tool = self.tools[tool_name]
+        summary = ", ".join(f"{param}: {parameters[param]}" for param in tool.parameters
+                            if param != "user_id" and parameters.get(param) not in (None, ""))
+        return f"Şu işlem yapılacak: {tool.name} ({summary}). Onaylıyor musunuz? (evet / hayır)"
+
+    def open(self, pending: List[Dict[str, Any]], intent: str, tool_names: List[str],
+             parameters: Dict[str, Any], clarification: bool = False) -> Optional[str]:
+        """Eksik slot varsa bekleyen işlemi kaydeder ve sorulacak soruyu döndürür"""
+        missing = self.missing_slot(tool_names, parameters, clarification)
+        if missing is None:
+            return None
+        tool_name, slot = missing
+        pending[:] = [{
+            "intent": intent, "tools": list(tool_names), "tool": tool_name, "slot": slot,
+            "parameters": {k: v for k, v in parameters.items() if k != "user_id"},
+            "clarification": clarification,
+        }]
+        if slot == CONFIRMATION_SLOT:
+            return self._confirmation_question(tool_name, parameters)
+        return self.questions[slot]
+
+    def resume(self, pending: List[Dict[str, Any]], message: str) -> Optional[Dict[str, Any]]:
+        """Bekleyen slotu mesajdan doldurur ve niyet analizi yerine geçen sonucu döndürür.
+
+        Mesaj slot yanıtı değilse bekleyen işlem silinir ve None döner.
+        """
+        if not pending:
+            return None
+        action = pending.pop(0)
+        pending.clear()
+        slot = action["slot"]
+        value = parse_confirmation(message) if slot == CONFIRMATION_SLOT else self.parsers[slot](message)
+        if value is None:
+            return None
+        parameters = dict(action["parameters"])
+        parameters[slot] = value
+        if slot != CONFIRMATION_SLOT and any(
+                name in self.tools and not self.tools[name].read_only for name in action["tools"]):
+            # Yazma aracı mesajdan çıkarılan değerle onaysız çalışmaz
+            parameters[CONFIRMATION_SLOT] = False
+        return {
+            "intent": action["intent"],
+            "confidence": 1.0,
+            "required_tools": action["tools"],
+            "parameters": parameters,
+            "context_update": {},
+            # Başka eksik slot kalırsa open aynı kurala göre onu da sorar
+            "response_type": "clarification" if action.get("clarification") else "immediate",
+            "slot_filled": action["slot"],
+        }
@@ -10,7 +10,7 @@ from typing import Dict, List, Any
 from datetime import datetime
 from test_scenarios import get_all_test_scenarios, get_scenario_statistics
 from central_agent import CentralAgent
-from chat.ollama_client import ollama_chat
+from chat.ollama_client import get_default_client
 from performance_metrics import PerformanceTracker
 from mock_apis import MockTelecomAPIs
 import argparse
@@ -24,7 +24,7 @@ class TestRunner:
     """100 test senaryosunu çalıştırır ve performans ölçümleri yapar"""
     
     def __init__(self):
-        self.agent = CentralAgent(ollama_chat_func=ollama_chat)
+        self.agent = CentralAgent(ollama_chat_func=get_default_client())
         self.metrics = PerformanceTracker()
         self.test_results = []
         self.scenarios = get_all_test_scenarios()
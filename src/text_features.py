@@ -0,0 +1,62 @@
+"""
+Türkçe metin normalizasyonu ve hash'lenmiş karakter n-gram vektörleştirici
+"""
+import re
+import zlib
+from typing import Iterable, List, Tuple
+import numpy as np
+
+# str.lower() Türkçe I/İ harflerini yanlış küçültür
+_TURKISH_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+_NON_WORD = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACES = re.compile(r"\s+")
+# Türkçe karakterler olmadan yazılan mesajlar için ("tesekkurler")
+_ASCII_FOLD = str.maketrans("çğıöşü", "cgiosu")
+
+
+def normalize_turkish(text: str) -> str:
+    """Metni Türkçe kurallarına göre küçültür, noktalama işaretlerini ve fazla boşlukları atar"""
+    text = text.translate(_TURKISH_LOWER).lower()
+    text = _NON_WORD.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def fold_turkish(text: str) -> str:
+    """normalize_turkish çıktısındaki Türkçe harfleri ASCII karşılıklarına indirger"""
+    return normalize_turkish(text).translate(_ASCII_FOLD)
+
+
+class HashedNgramVectorizer:
+    """Karakter n-gramlarını sabit boyutlu vektöre hash'ler (sözlük tutmaz).
+
+    Hash olarak crc32 kullanılır; Python'un hash() fonksiyonu süreçten sürece
+    değiştiği için dışa aktarılan modellerle uyumlu olmazdı.
+    """
+
+    def __init__(self, n_features: int = 4096, ngram_range: Tuple[int, int] = (2, 4)):
+        self.n_features = n_features
+        self.ngram_range = ngram_range
+
+    def _ngrams(self, text: str) -> List[str]:
+        grams = []
+        for word in text.split():
+            padded = f" {word} "
+            for n in range(self.ngram_range[0], self.ngram_range[1] + 1):
+                for i in range(len(padded) - n + 1):
+                    grams.append(padded[i:i + n])
+        return grams
+
+    def transform_one(self, text: str, normalized: bool = False) -> np.ndarray:
+        """Tek bir metni L2 normlu vektöre dönüştürür"""
+        if not normalized:
+            text = normalize_turkish(text)
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        for gram in self._ngrams(text):
+            vector[zlib.crc32(gram.encode("utf-8")) % self.n_features] += 1.0
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector
+
+    def transform(self, texts: Iterable[str]) -> np.ndarray:
+        return np.vstack([self.transform_one(text) for text in texts])
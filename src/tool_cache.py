@@ -0,0 +1,149 @@
+"""
+Kullanıcı başına mock/backend API sonuç önbelleği
+
+Anahtar (api, user_id, parametreler) üçlüsüdür. Okuma API'leri kendi TTL'leri
+boyunca önbellekten döner; aynı kullanıcı için bir yazma API'si başarılı
+olduğunda o kullanıcının etkilenen kayıtları silinir. Böylece ChatContext
+ile aynı turdaki musteri_bilgi_al / fatura_bilgi_al araçları backend
+gecikmesini bir kez öder, ödeme veya paket değişikliğinden sonra ise
+güncel veri okunur.
+
+Yazmadan önce başlayıp sonra biten bir okuma eski veriyi önbelleğe
+koymasın diye her kullanıcının bir nesil sayacı vardır: invalidate sayacı
+artırır, okuma başlarken aldığı nesil değişmişse sonucu saklanmaz.
+
+Önbellek süreç içidir. Birden fazla worker paylaşılan oturum arka ucuyla
+çalışırken başka bir worker'daki yazma bu önbelleği geçersiz kılmaz; o
+kullanıcının okumaları TTL dolana kadar eski kalabilir (bkz. README).
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Önbelleğe alınan okuma API'leri ve saniye cinsinden TTL'leri
+API_CACHE_TTLS: Dict[str, float] = {
+    "getUserInfo": 120,
+    "getBillingInfo": 120,
+    "getAvailablePackages": 600,
+}
+
+# Başarılı olduğunda kullanıcının hangi okuma kayıtlarını geçersiz kıldığı.
+# None: kullanıcının tüm kayıtları (etkisi bilinmeyen yazmalar için güvenli varsayılan).
+API_INVALIDATES: Dict[str, Optional[Tuple[str, ...]]] = {
+    "initiatePackageChange": ("getUserInfo", "getAvailablePackages", "getBillingInfo"),
+    "processPayment": ("getUserInfo", "getBillingInfo"),
+    "createSupportTicket": None,
+    "resetPassword": None,
+}
+
+
+class ToolResultCache:
+    """Kullanıcı bazında gruplanmış TTL önbelleği.
+
+    Kayıtlar user_id altında tutulur; bir kullanıcının geçersiz kılınması
+    sadece o kullanıcının kayıtlarını dolaşır. En fazla max_users kullanıcı
+    tutulur, en uzun süre kullanılmayan kullanıcı çıkarılır. Dönen sonuçlar
+    çağıranlar arasında paylaşılır, değiştirilmemelidir.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None,
+                 invalidates: Optional[Dict[str, Optional[Tuple[str, ...]]]] = None,
+                 max_users: int = 10000, clock: Callable[[], float] = time.monotonic):
+        self.ttls = API_CACHE_TTLS if ttls is None else ttls
+        self.invalidates = API_INVALIDATES if invalidates is None else invalidates
+        self.max_users = max_users
+        self.clock = clock
+        self._entries: "OrderedDict[str, Dict[Tuple, Tuple[float, Dict[str, Any]]]]" = OrderedDict()
+        # Kullanıcı başına geçersiz kılma sayacı; çıkarılan kullanıcının nesli 0'a döner ve
+        # o sırada süren okumalar sadece saklanmaz (güvenli taraf)
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "stale_drops": 0}
+
+    def cacheable(self, api_name: str) -> bool:
+        return api_name in self.ttls
+
+    def get(self, api_name: str, user_id: str, params: Tuple = ()) -> Optional[Dict[str, Any]]:
+        if api_name not in self.ttls:
+            return None
+        with self._lock:
+            entries = self._entries.get(user_id)
+            entry = entries.get((api_name, params)) if entries else None
+            if entry is None or entry[0] <= self.clock():
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def contains(self, api_name: str, user_id: str, params: Tuple = ()) -> bool:
+        """Kayıt var ve süresi dolmamış mı; get'ten farklı olarak istatistik ve LRU sırası değişmez"""
+        with self._lock:
+            entries = self._entries.get(user_id)
+            entry = entries.get((api_name, params)) if entries else None
+            return entry is not None and entry[0] > self.clock()
+
+    def generation(self, user_id: str) -> int:
+        """Okuma başlamadan alınır ve put'a verilir"""
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, api_name: str, user_id: str, params: Tuple, result: Dict[str, Any],
+            generation: Optional[int] = None):
+        """Sonucu saklar; generation verilmiş ve okuma sürerken kullanıcı geçersiz kılınmışsa atar"""
+        ttl = self.ttls.get(api_name)
+        if not ttl or not result.get("success"):
+            return
+        with self._lock:
+            if generation is not None and generation != self._generations.get(user_id, 0):
+                self.stats["stale_drops"] += 1
+                return
+            entries = self._entries.setdefault(user_id, {})
+            self._entries.move_to_end(user_id)
+            entries[(api_name, params)] = (self.clock() + ttl, result)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str, api_names: Optional[Tuple[str, ...]] = None):
+        """Kullanıcının kayıtlarını siler; api_names verilirse sadece o API'lerinkini"""
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self._generations.move_to_end(user_id)
+            while len(self._generations) > self.max_users:
+                self._generations.popitem(last=False)
+            entries = self._entries.get(user_id)
+            if not entries:
+                return
+            self.stats["invalidations"] += 1
+            if api_names is None:
+                del self._entries[user_id]
+                return
+            for key in [key for key in entries if key[0] in api_names]:
+                del entries[key]
+
+    def record(self, api_name: str, args: Tuple, result: Dict[str, Any], generation: Optional[int] = None):
+        """API çağrısının sonucunu işler: okumaları saklar, başarılı yazmalarda kullanıcıyı geçersiz kılar.
+
+        generation, çağrı başlamadan generation() ile alınan değerdir.
+        """
+        if not args:
+            return
+        user_id, params = args[0], tuple(args[1:])
+        if api_name in self.ttls:
+            self.put(api_name, user_id, params, result, generation)
+        elif api_name in self.invalidates and result.get("success"):
+            logger.info(f"{api_name} başarılı, {user_id} için önbellekteki araç sonuçları geçersiz kılındı")
+            self.invalidate(user_id, self.invalidates[api_name])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._generations.clear()
+
+
+# Süreç genelinde paylaşılan önbellek (tools.call_api kullanır)
+DEFAULT_TOOL_CACHE = ToolResultCache()
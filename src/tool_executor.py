@@ -0,0 +1,137 @@
+"""
+required_tools listesini bağımlılıklarına göre paralel çalıştıran araç yürütücüsü
+"""
+import asyncio
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from deadline import Deadline
+
+logger = logging.getLogger(__name__)
+
+# Başarısız olursa sonraki yazma araçlarının çalıştırılmayacağı araçlar (müşteri doğrulaması)
+CRITICAL_TOOLS = ("musteri_bilgi_al",)
+
+
+def deadline_result(tool_name: str) -> Dict[str, Any]:
+    """Tur bütçesi dolduğu için sonucu beklenmeyen (veya başlatılmayan) aracın sonucu"""
+    return {
+        "success": False, "tool_used": tool_name, "deadline_exceeded": True,
+        "error": "İşleminiz beklenenden uzun sürdü. Lütfen birazdan tekrar deneyin.",
+    }
+
+
+def tool_call_key(parameters: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    """Aynı araç çağrısını tanımak için kullanılan parametre kopyası"""
+    key = dict(parameters)
+    key.setdefault("user_id", user_id)
+    return key
+
+
+class ToolExecutor:
+    """Araçları sınırlı bir thread havuzunda çalıştırır.
+
+    Salt-okunur araçlar birbirinden bağımsızdır ve aynı anda başlatılır.
+    Yazma araçları kritik araçların (müşteri doğrulaması) başarısını bekler ve
+    verildikleri sırayla tek tek çalışır. Böylece tur süresi araç sürelerinin
+    toplamı yerine en yavaş okuma aracı kadar olur.
+    """
+
+    def __init__(self, execute: Callable[..., Dict[str, Any]],
+                 is_read_only: Callable[[str], bool], max_workers: int = 4,
+                 critical_tools: Iterable[str] = CRITICAL_TOOLS,
+                 aexecute: Optional[Callable[..., Awaitable[Dict[str, Any]]]] = None):
+        self.execute = execute
+        self.aexecute = aexecute
+        self.is_read_only = is_read_only
+        self.critical_tools = set(critical_tools)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def submit(self, tool_name: str, parameters: Dict[str, Any], user_id: str,
+               deadline: Optional[Deadline] = None) -> Future:
+        return self.pool.submit(self.execute, tool_name, dict(parameters), user_id, deadline)
+
+    @staticmethod
+    def _result(tool_name: str, future: Future, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        """Okuma aracının sonucunu en fazla kalan tur süresi kadar bekler"""
+        try:
+            return future.result(timeout=deadline.timeout() if deadline is not None else None)
+        except FutureTimeoutError:
+            logger.warning(f"Tur bütçesi doldu, {tool_name} sonucu beklenmiyor")
+            return deadline_result(tool_name)
+
+    def run(self, tool_names: List[str], parameters: Dict[str, Any], user_id: str,
+            prefetched: Optional[Dict[str, Tuple[Dict[str, Any], Future]]] = None,
+            deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """Araçları çalıştırır ve sonuçları verilen sırayla döndürür.
+
+        prefetched: daha önce başlatılmış {araç: (parametreler, future)} çağrıları;
+        parametreler aynıysa araç yeniden çalıştırılmaz. Kritik bir araç başarısız
+        olursa yazma araçları atlanır ve sonuç listesinde yer almaz. deadline
+        verilirse okumalar en fazla kalan süre kadar beklenir; başlamış yazma
+        işlemleri yan etkileri nedeniyle sonuna kadar beklenir.
+        """
+        prefetched = prefetched or {}
+        call_key = tool_call_key(parameters, user_id)
+        futures: Dict[int, Future] = {}
+        writes = []
+        for index, tool_name in enumerate(tool_names):
+            if self.is_read_only(tool_name):
+                onceki = prefetched.get(tool_name)
+                if onceki and onceki[0] == call_key:
+                    futures[index] = onceki[1]
+                else:
+                    futures[index] = self.submit(tool_name, call_key, user_id, deadline)
+            else:
+                writes.append(index)
+
+        results: Dict[int, Dict[str, Any]] = {}
+        # Yazma işlemlerinden önce kritik okumaların sonucunu bekle
+        for index, future in futures.items():
+            if tool_names[index] in self.critical_tools:
+                results[index] = self._result(tool_names[index], future, deadline)
+        critical_failed = any(not r.get("success") for r in results.values())
+        if critical_failed:
+            logger.info(f"Kritik araç başarısız, yazma araçları atlanıyor: {[tool_names[i] for i in writes]}")
+        else:
+            for index in writes:
+                results[index] = self.execute(tool_names[index], dict(call_key), user_id, deadline)
+        for index, future in futures.items():
+            if index not in results:
+                results[index] = self._result(tool_names[index], future, deadline)
+        return [results[index] for index in sorted(results)]
+
+    @staticmethod
+    async def _aresult(tool_name: str, task: asyncio.Task, deadline: Optional[Deadline]) -> Dict[str, Any]:
+        try:
+            return await asyncio.wait_for(task, timeout=deadline.timeout() if deadline is not None else None)
+        except asyncio.TimeoutError:
+            logger.warning(f"Tur bütçesi doldu, {tool_name} sonucu beklenmiyor")
+            return deadline_result(tool_name)
+
+    async def arun(self, tool_names: List[str], parameters: Dict[str, Any], user_id: str,
+                   deadline: Optional[Deadline] = None) -> List[Dict[str, Any]]:
+        """run() ile aynı sıralama kuralları; okumalar asyncio görevleri olarak eşzamanlı çalışır"""
+        call_key = tool_call_key(parameters, user_id)
+        tasks: Dict[int, asyncio.Task] = {}
+        writes = []
+        for index, tool_name in enumerate(tool_names):
+            if self.is_read_only(tool_name):
+                tasks[index] = asyncio.ensure_future(self.aexecute(tool_name, dict(call_key), user_id, deadline))
+            else:
+                writes.append(index)
+
+        results: Dict[int, Dict[str, Any]] = {}
+        for index, task in tasks.items():
+            if tool_names[index] in self.critical_tools:
+                results[index] = await self._aresult(tool_names[index], task, deadline)
+        critical_failed = any(not r.get("success") for r in results.values())
+        if critical_failed:
+            logger.info(f"Kritik araç başarısız, yazma araçları atlanıyor: {[tool_names[i] for i in writes]}")
+        else:
+            for index in writes:
+                results[index] = await self.aexecute(tool_names[index], dict(call_key), user_id, deadline)
+        for index, task in tasks.items():
+            if index not in results:
+                results[index] = await self._aresult(tool_names[index], task, deadline)
+        return [results[index] for index in sorted(results)]
@@ -0,0 +1,109 @@
+"""
+LLM'in required_tools listesini çalıştırmadan önce sadeleştiren planlayıcı
+
+Yanıt üretimi (CentralAgent._build_response_plan) araç sonuçlarından sadece
+birini kullanır: şifre sıfırlama varsa onu, yoksa RESPONSE_PRIORITY'deki ilk
+başarılı aracı. Planlayıcı aynı kuralı önceden uygular; çıktısı kullanılmayacak
+okuma araçlarını çalıştırmaz, sadece seçilen araç başarısız olursa yedek olarak
+çalıştırır. Yazma araçları yan etkileri nedeniyle hiçbir zaman elenmez.
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Yanıtta tek başına kullanılan araç (diğer sonuçlar gösterilmez)
+EXCLUSIVE_TOOLS = ("sifre_sifirla",)
+# Yanıtta kullanılacak aracın seçim sırası
+RESPONSE_PRIORITY = ("odeme_islem", "paket_degistir", "fatura_bilgi_al", "musteri_bilgi_al")
+
+
+@dataclass
+class ToolPlan:
+    tools: List[str]
+    # Sadece primary başarısız olursa çalıştırılacak okuma araçları
+    fallbacks: List[str] = field(default_factory=list)
+    # Yanıtta kullanılacak araç; None ise tüm başarılı sonuçlar kullanılır
+    primary: Optional[str] = None
+    # Tekrarlanan araç adları (bilgi amaçlı)
+    duplicates: List[str] = field(default_factory=list)
+
+    def needs_fallback(self, results: List[Dict[str, Any]]) -> bool:
+        if not self.fallbacks or self.primary is None:
+            return False
+        return not any(r.get("success") and r.get("tool_used") == self.primary for r in results)
+
+
+class ToolPlanner:
+    """Tool metaverisine (read_only, expected_latency, depends_on) göre plan çıkarır"""
+
+    def __init__(self, tools: Dict[str, Any], critical_tools: Iterable[str] = (),
+                 exclusive_tools: Iterable[str] = EXCLUSIVE_TOOLS,
+                 response_priority: Iterable[str] = RESPONSE_PRIORITY):
+        self.tools = tools
+        self.critical_tools = set(critical_tools)
+        self.exclusive_tools = tuple(exclusive_tools)
+        self.response_priority = tuple(response_priority)
+
+    def _read_only(self, tool_name: str) -> bool:
+        tool = self.tools.get(tool_name)
+        return bool(tool and tool.read_only)
+
+    def _latency(self, tool_name: str) -> float:
+        tool = self.tools.get(tool_name)
+        return tool.expected_latency if tool else 0.0
+
+    def _primary(self, tool_names: List[str]) -> Optional[str]:
+        for tool_name in self.exclusive_tools + self.response_priority:
+            if tool_name in tool_names:
+                return tool_name
+        return None
+
+    def _order(self, tool_names: List[str]) -> List[str]:
+        """Okumalar önce ve en yavaşı ilk başlayacak şekilde; yazmalar verilen sırada.
+
+        depends_on'daki araç plandaysa bağımlı araçtan önce gelir.
+        """
+        reads = sorted((t for t in tool_names if self._read_only(t)), key=self._latency, reverse=True)
+        ordered = reads + [t for t in tool_names if not self._read_only(t)]
+        result: List[str] = []
+
+        def _add(tool_name: str, visiting: tuple):
+            if tool_name in result or tool_name in visiting:
+                return
+            tool = self.tools.get(tool_name)
+            for dependency in (tool.depends_on if tool else ()):
+                if dependency in ordered:
+                    _add(dependency, visiting + (tool_name,))
+            result.append(tool_name)
+
+        for tool_name in ordered:
+            _add(tool_name, ())
+        return result
+
+    def plan(self, tool_names: List[str]) -> ToolPlan:
+        unique: List[str] = []
+        duplicates: List[str] = []
+        for tool_name in tool_names:
+            (duplicates if tool_name in unique else unique).append(tool_name)
+
+        primary = self._primary(unique)
+        if primary is None:
+            # Tüm başarılı sonuçlar yanıta girer: sadece tekrarlar atılır
+            return ToolPlan(tools=self._order(unique), duplicates=duplicates)
+
+        has_writes = any(not self._read_only(t) for t in unique)
+        keep, fallbacks = [], []
+        for tool_name in unique:
+            if tool_name == primary or not self._read_only(tool_name):
+                keep.append(tool_name)
+            elif has_writes and tool_name in self.critical_tools:
+                # Müşteri doğrulaması yazma araçlarını korur
+                keep.append(tool_name)
+            else:
+                fallbacks.append(tool_name)
+        if fallbacks or duplicates:
+            logger.info(f"Araç planı: {keep} (yedek: {fallbacks}, tekrar: {duplicates})")
+        return ToolPlan(tools=self._order(keep), fallbacks=self._order(fallbacks),
+                        primary=primary, duplicates=duplicates)
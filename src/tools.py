@@ -1,17 +1,156 @@
 import logging
+from typing import Any, Dict, Optional, Tuple
+from tool_cache import DEFAULT_TOOL_CACHE
+from single_flight import AsyncSingleFlight, SingleFlight
+
+# Eşzamanlı aynı okuma çağrıları tek backend isteğini paylaşır. Yazma API'leri
+# birleştirilmez: aynı anda gelen iki ödeme isteği bilinçli de olabilir.
+SINGLE_FLIGHT_APIS = frozenset({"getUserInfo", "getBillingInfo", "getAvailablePackages"})
+_SINGLE_FLIGHT = SingleFlight()
+_ASYNC_SINGLE_FLIGHT = AsyncSingleFlight()
+
+
+class ToolResult(str):
+    """Aracın kullanıcıya gösterilebilir metni; yapılandırılmış API verisi .data'da taşınır.
+
+    str alt sınıfı olduğu için metin bekleyen çağıranlar etkilenmez; yanıt
+    şablonları (response_templates.py) .data üzerinden çalışır.
+    """
+
+    def __new__(cls, text: str, data: Optional[Dict[str, Any]] = None):
+        obj = super().__new__(cls, text)
+        obj.data = data
+        return obj
+
+
+def call_api(api_name: str, *args) -> Dict[str, Any]:
+    """Mock API fonksiyonunu adıyla çağırır; okuma sonuçları kullanıcı bazında önbelleğe alınır"""
+    import mock_apis
+    cached = DEFAULT_TOOL_CACHE.get(api_name, args[0], tuple(args[1:])) if args else None
+    if cached is not None:
+        return cached
+    # Okuma sürerken aynı kullanıcı için yazma olursa sonuç önbelleğe konmaz
+    generation = DEFAULT_TOOL_CACHE.generation(args[0]) if args else None
+
+    def _fetch():
+        result = getattr(mock_apis, api_name)(*args)
+        DEFAULT_TOOL_CACHE.record(api_name, args, result, generation)
+        return result
+
+    if api_name in SINGLE_FLIGHT_APIS:
+        return _SINGLE_FLIGHT.do((api_name, args), _fetch)
+    return _fetch()
+
+
+async def acall_api(api_name: str, *args) -> Dict[str, Any]:
+    """Mock API'nin asenkron varyantını (a<adı>) çağırır; önbellek senkron yolla ortaktır"""
+    import mock_apis
+    cached = DEFAULT_TOOL_CACHE.get(api_name, args[0], tuple(args[1:])) if args else None
+    if cached is not None:
+        return cached
+    # Okuma sürerken aynı kullanıcı için yazma olursa sonuç önbelleğe konmaz
+    generation = DEFAULT_TOOL_CACHE.generation(args[0]) if args else None
+
+    async def _fetch():
+        result = await getattr(mock_apis, "a" + api_name)(*args)
+        DEFAULT_TOOL_CACHE.record(api_name, args, result, generation)
+        return result
+
+    if api_name in SINGLE_FLIGHT_APIS:
+        return await _ASYNC_SINGLE_FLIGHT.do((api_name, args), _fetch)
+    return await _fetch()
+
+
+# Oturum başında arka planda ısıtılan çağrılar: neredeyse her konuşma bunlarla başlar
+SESSION_PREFETCH_CALLS = (("getUserInfo",), ("getBillingInfo", "current"))
+
+# Tahmini ön yüklemede (intent_transitions.py) araç sonucunu ısıtan API çağrısı
+TOOL_PREFETCH_CALLS = {
+    "musteri_bilgi_al": ("getUserInfo",),
+    "fatura_bilgi_al": ("getBillingInfo", "current"),
+    "paket_listesi_al": ("getAvailablePackages",),
+}
+
+
+def is_prefetched(user_id: str, call: Tuple) -> bool:
+    """Çağrının sonucu önbellekte taze mi ya da şu an çekiliyor mu (istatistikleri etkilemez)"""
+    api_name, *args = call
+    return (DEFAULT_TOOL_CACHE.contains(api_name, user_id, tuple(args))
+            or _SINGLE_FLIGHT.in_flight((api_name, (user_id, *args))))
+
+
+def prefetch_user_data(user_id: str, executor, calls=SESSION_PREFETCH_CALLS) -> list:
+    """Müşteri ve fatura özetini (veya verilen çağrıları) executor'da önbelleğe çeker; Future listesi döndürür.
+
+    Kullanıcının ilk mesajı prefetch sürerken gelirse aynı çağrı single-flight
+    ile beklenir, ikinci bir backend isteği açılmaz.
+    """
+    logger = logging.getLogger(__name__)
+
+    def _warm(api_name, *args):
+        try:
+            call_api(api_name, user_id, *args)
+        except Exception as e:
+            logger.warning(f"Ön yükleme başarısız. API: {api_name}, Kullanıcı: {user_id}, Hata: {e}")
+
+    return [executor.submit(_warm, api_name, *args) for api_name, *args in calls]
+
+
+def single_flight_stats() -> Dict[str, int]:
+    """Senkron ve asenkron yolda toplam çağrı ve birleştirilen (backend'e gitmeyen) çağrı sayısı"""
+    return {key: _SINGLE_FLIGHT.stats[key] + _ASYNC_SINGLE_FLIGHT.stats[key] for key in ("calls", "coalesced")}
+
+
+def _check_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    if not result.get("success"):
+        raise Exception(result.get("error", "Bilinmeyen hata"))
+    return result
+
+
+# Yanıt biçimlendiriciler: senkron ve asenkron araçlar aynı metni üretir
+def _format_customer_info(result: Dict[str, Any]) -> str:
+    customer = _check_result(result)["data"]
+    return ToolResult(
+        f"Müşteri: {customer['name']} {customer['surname']}, Paket: {customer['current_package']}, Bakiye: {customer['balance']} TL, Durum: {customer['payment_status']}",
+        customer
+    )
+
+def _format_billing_info(result: Dict[str, Any]) -> str:
+    billing_data = _check_result(result)["data"]
+    bills_text = ", ".join([f"{bill['month']}: {bill['amount']} TL ({bill['status']})" for bill in billing_data["bills"]])
+    return ToolResult(
+        f"Fatura bilgileri: {bills_text}. Toplam: {billing_data['total_amount']} TL, Ödenmemiş: {billing_data['unpaid_amount']} TL",
+        billing_data
+    )
+
+def _format_packages(result: Dict[str, Any]) -> str:
+    packages = _check_result(result)["data"]
+    packages_text = ", ".join([f"{pkg['name']} ({pkg['price']} TL)" for pkg in packages])
+    recommendations = result.get("recommendations", [])
+    response = f"Mevcut paketler: {packages_text}"
+    if recommendations:
+        rec_text = ", ".join([f"{rec['package']['name']} ({rec['reason']})" for rec in recommendations[:2]])
+        response += f". Öneriler: {rec_text}"
+    return response
+
+def _format_message(result: Dict[str, Any], **request) -> str:
+    """İşlem API'lerinin mesajı; veri olarak yanıt ve istek parametreleri (ör. tutar) saklanır"""
+    _check_result(result)
+    return ToolResult(result["message"], {**request, **result})
+
+def _format_contract_info(result: Dict[str, Any]) -> str:
+    customer = _check_result(result)["data"]
+    return f"Sözleşme bitiş tarihi: {customer['contract_end_date']}, Müşteri olma tarihi: {customer['customer_since']}"
+
 
 def get_customer_info(user_id: str) -> str:
     """Müşteri bilgilerini getirir (Mock API)"""
     logger = logging.getLogger(__name__)
     logger.info(f"Müşteri bilgileri alınıyor. Kullanıcı: {user_id}")
     try:
-        from mock_apis import getUserInfo
-        result = getUserInfo(user_id)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
-        customer = result["data"]
+        response = _format_customer_info(call_api("getUserInfo", user_id))
         logger.info(f"Müşteri bilgileri başarıyla alındı. Kullanıcı: {user_id}")
-        return f"Müşteri: {customer['name']} {customer['surname']}, Paket: {customer['current_package']}, Bakiye: {customer['balance']} TL, Durum: {customer['payment_status']}"
+        return response
     except Exception as e:
         logger.error(f"Müşteri bilgileri alınamadı. Kullanıcı: {user_id}, Hata: {e}")
         raise Exception(f"Müşteri bilgileri alınamadı: {e}")
@@ -21,14 +160,9 @@ def get_billing_info(user_id: str, period: str = "current") -> str:
     logger = logging.getLogger(__name__)
     logger.info(f"Fatura bilgileri alınıyor. Kullanıcı: {user_id}, Dönem: {period}")
     try:
-        from mock_apis import getBillingInfo
-        result = getBillingInfo(user_id, period)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
-        billing_data = result["data"]
-        bills_text = ", ".join([f"{bill['month']}: {bill['amount']} TL ({bill['status']})" for bill in billing_data["bills"]])
+        response = _format_billing_info(call_api("getBillingInfo", user_id, period))
         logger.info(f"Fatura bilgileri başarıyla alındı. Kullanıcı: {user_id}")
-        return f"Fatura bilgileri: {bills_text}. Toplam: {billing_data['total_amount']} TL, Ödenmemiş: {billing_data['unpaid_amount']} TL"
+        return response
     except Exception as e:
         logger.error(f"Fatura bilgileri alınamadı. Kullanıcı: {user_id}, Hata: {e}")
         raise Exception(f"Fatura bilgileri alınamadı: {e}")
@@ -38,17 +172,7 @@ def get_packages(user_id: str) -> str:
     logger = logging.getLogger(__name__)
     logger.info(f"Paket bilgileri alınıyor. Kullanıcı: {user_id}")
     try:
-        from mock_apis import getAvailablePackages
-        result = getAvailablePackages(user_id)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
-        packages = result["data"]
-        packages_text = ", ".join([f"{pkg['name']} ({pkg['price']} TL)" for pkg in packages])
-        recommendations = result.get("recommendations", [])
-        response = f"Mevcut paketler: {packages_text}"
-        if recommendations:
-            rec_text = ", ".join([f"{rec['package']['name']} ({rec['reason']})" for rec in recommendations[:2]])
-            response += f". Öneriler: {rec_text}"
+        response = _format_packages(call_api("getAvailablePackages", user_id))
         logger.info(f"Paket bilgileri başarıyla alındı. Kullanıcı: {user_id}")
         return response
     except Exception as e:
@@ -60,12 +184,9 @@ def change_package(user_id: str, new_package_id: str) -> str:
     logger = logging.getLogger(__name__)
     logger.info(f"Paket değişikliği başlatılıyor. Kullanıcı: {user_id}, Yeni Paket: {new_package_id}")
     try:
-        from mock_apis import initiatePackageChange
-        result = initiatePackageChange(user_id, new_package_id)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
+        response = _format_message(call_api("initiatePackageChange", user_id, new_package_id))
         logger.info(f"Paket değişikliği başarıyla tamamlandı. Kullanıcı: {user_id}")
-        return result["message"]
+        return response
     except Exception as e:
         logger.error(f"Paket değişikliği yapılamadı. Kullanıcı: {user_id}, Hata: {e}")
         raise Exception(f"Paket değişikliği yapılamadı: {e}")
@@ -75,12 +196,9 @@ def reset_password(user_id: str) -> str:
     logger = logging.getLogger(__name__)
     logger.info(f"Şifre sıfırlama işlemi başlatılıyor. Kullanıcı: {user_id}")
     try:
-        from mock_apis import resetPassword
-        result = resetPassword(user_id)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
+        response = _format_message(call_api("resetPassword", user_id))
         logger.info(f"Şifre sıfırlama işlemi başarıyla tamamlandı. Kullanıcı: {user_id}")
-        return result["message"]
+        return response
     except Exception as e:
         logger.error(f"Şifre sıfırlama işlemi başarısız. Kullanıcı: {user_id}, Hata: {e}")
         raise Exception(f"Şifre sıfırlama işlemi başarısız: {e}")
@@ -90,12 +208,9 @@ def create_ticket(user_id: str, issue_type: str, description: str) -> str:
     logger = logging.getLogger(__name__)
     logger.info(f"Destek talebi oluşturuluyor. Kullanıcı: {user_id}, Sorun Tipi: {issue_type}, Açıklama: {description}")
     try:
-        from mock_apis import createSupportTicket
-        result = createSupportTicket(user_id, issue_type, description)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
+        response = _format_message(call_api("createSupportTicket", user_id, issue_type, description))
         logger.info(f"Destek talebi başarıyla oluşturuldu. Kullanıcı: {user_id}")
-        return result["message"]
+        return response
     except Exception as e:
         logger.error(f"Destek talebi oluşturulamadı. Kullanıcı: {user_id}, Hata: {e}")
         raise Exception(f"Destek talebi oluşturulamadı: {e}")
@@ -105,12 +220,10 @@ def process_payment(user_id: str, amount: float, payment_method: str) -> str:
     logger = logging.getLogger(__name__)
     logger.info(f"Ödeme işlemi başlatılıyor. Kullanıcı: {user_id}, Tutar: {amount}, Ödeme Yöntemi: {payment_method}")
     try:
-        from mock_apis import processPayment
-        result = processPayment(user_id, amount, payment_method)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
+        response = _format_message(call_api("processPayment", user_id, amount, payment_method),
+                                   amount=amount, payment_method=payment_method)
         logger.info(f"Ödeme işlemi başarıyla tamamlandı. Kullanıcı: {user_id}")
-        return result["message"]
+        return response
     except Exception as e:
         logger.error(f"Ödeme işlemi başarısız. Kullanıcı: {user_id}, Hata: {e}")
         raise Exception(f"Ödeme işlemi başarısız: {e}")
@@ -120,13 +233,9 @@ def get_contract_info(user_id: str) -> str:
     logger = logging.getLogger(__name__)
     logger.info(f"Sözleşme bilgileri alınıyor. Kullanıcı: {user_id}")
     try:
-        from mock_apis import getUserInfo
-        result = getUserInfo(user_id)
-        if not result.get("success"):
-            raise Exception(result.get("error", "Bilinmeyen hata"))
-        customer = result["data"]
+        response = _format_contract_info(call_api("getUserInfo", user_id))
         logger.info(f"Sözleşme bilgileri başarıyla alındı. Kullanıcı: {user_id}")
-        return f"Sözleşme bitiş tarihi: {customer['contract_end_date']}, Müşteri olma tarihi: {customer['customer_since']}"
+        return response
     except Exception as e:
         logger.error(f"Sözleşme bilgileri alınamadı. Kullanıcı: {user_id}, Hata: {e}")
         raise Exception(f"Sözleşme bilgileri alınamadı: {e}")
@@ -165,4 +274,112 @@ def search_knowledge_base(query: str) -> str:
         return f"'{query}' ile ilgili bilgi bulundu: Bu konuda size yardımcı olabilirim."
     except Exception as e:
         logger.error(f"Bilgi tabanı araması başarısız: {e}")
-        raise Exception(f"Bilgi tabanı araması başarısız: {e}") 
\ No newline at end of file
+        raise Exception(f"Bilgi tabanı araması başarısız: {e}")
+
+
+# Asenkron araçlar: mock API gecikmesini event loop'u bloklamadan bekler
+async def aget_customer_info(user_id: str) -> str:
+    """Müşteri bilgilerini getirir (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Müşteri bilgileri alınıyor. Kullanıcı: {user_id}")
+    try:
+        response = _format_customer_info(await acall_api("getUserInfo", user_id))
+        logger.info(f"Müşteri bilgileri başarıyla alındı. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Müşteri bilgileri alınamadı. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Müşteri bilgileri alınamadı: {e}")
+
+async def aget_billing_info(user_id: str, period: str = "current") -> str:
+    """Fatura bilgilerini getirir (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Fatura bilgileri alınıyor. Kullanıcı: {user_id}, Dönem: {period}")
+    try:
+        response = _format_billing_info(await acall_api("getBillingInfo", user_id, period))
+        logger.info(f"Fatura bilgileri başarıyla alındı. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Fatura bilgileri alınamadı. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Fatura bilgileri alınamadı: {e}")
+
+async def aget_packages(user_id: str) -> str:
+    """Mevcut paketleri listeler (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Paket bilgileri alınıyor. Kullanıcı: {user_id}")
+    try:
+        response = _format_packages(await acall_api("getAvailablePackages", user_id))
+        logger.info(f"Paket bilgileri başarıyla alındı. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Paket bilgileri alınamadı. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Paket bilgileri alınamadı: {e}")
+
+async def achange_package(user_id: str, new_package_id: str) -> str:
+    """Paket değiştirir (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Paket değişikliği başlatılıyor. Kullanıcı: {user_id}, Yeni Paket: {new_package_id}")
+    try:
+        response = _format_message(await acall_api("initiatePackageChange", user_id, new_package_id))
+        logger.info(f"Paket değişikliği başarıyla tamamlandı. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Paket değişikliği yapılamadı. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Paket değişikliği yapılamadı: {e}")
+
+async def areset_password(user_id: str) -> str:
+    """Şifre sıfırlar (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Şifre sıfırlama işlemi başlatılıyor. Kullanıcı: {user_id}")
+    try:
+        response = _format_message(await acall_api("resetPassword", user_id))
+        logger.info(f"Şifre sıfırlama işlemi başarıyla tamamlandı. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Şifre sıfırlama işlemi başarısız. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Şifre sıfırlama işlemi başarısız: {e}")
+
+async def acreate_ticket(user_id: str, issue_type: str, description: str) -> str:
+    """Destek talebi oluşturur (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Destek talebi oluşturuluyor. Kullanıcı: {user_id}, Sorun Tipi: {issue_type}, Açıklama: {description}")
+    try:
+        response = _format_message(await acall_api("createSupportTicket", user_id, issue_type, description))
+        logger.info(f"Destek talebi başarıyla oluşturuldu. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Destek talebi oluşturulamadı. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Destek talebi oluşturulamadı: {e}")
+
+async def aprocess_payment(user_id: str, amount: float, payment_method: str) -> str:
+    """Ödeme işlemi yapar (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Ödeme işlemi başlatılıyor. Kullanıcı: {user_id}, Tutar: {amount}, Ödeme Yöntemi: {payment_method}")
+    try:
+        response = _format_message(await acall_api("processPayment", user_id, amount, payment_method),
+                                   amount=amount, payment_method=payment_method)
+        logger.info(f"Ödeme işlemi başarıyla tamamlandı. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Ödeme işlemi başarısız. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Ödeme işlemi başarısız: {e}")
+
+async def aget_contract_info(user_id: str) -> str:
+    """Sözleşme bilgilerini getirir (Mock API, asenkron)"""
+    logger = logging.getLogger(__name__)
+    logger.info(f"Sözleşme bilgileri alınıyor. Kullanıcı: {user_id}")
+    try:
+        response = _format_contract_info(await acall_api("getUserInfo", user_id))
+        logger.info(f"Sözleşme bilgileri başarıyla alındı. Kullanıcı: {user_id}")
+        return response
+    except Exception as e:
+        logger.error(f"Sözleşme bilgileri alınamadı. Kullanıcı: {user_id}, Hata: {e}")
+        raise Exception(f"Sözleşme bilgileri alınamadı: {e}")
+
+async def aactivate_service(user_id: str, service_type: str) -> str:
+    """Hizmet aktifleştirir (Mock API, asenkron)"""
+    # G/Ç yapılmadığı için senkron sürüm doğrudan kullanılır
+    return activate_service(user_id, service_type)
+
+async def asearch_knowledge_base(query: str) -> str:
+    """Bilgi tabanında arama yapar (Mock API, asenkron)"""
+    return search_knowledge_base(query)
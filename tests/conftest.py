@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# Modüller src/ altında mutlak içe aktarmalarla çalışır (ör. "from text_features import ...")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+
+class FakeClock:
+    """Elle ilerletilen saat; clock parametresine ya da time.time yerine verilir"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
@@ -0,0 +1,48 @@
+import asyncio
+import json
+import threading
+
+from central_agent import AgentConfig, CentralAgent
+from db.session_backend import InMemorySessionBackend
+
+
+def test_background_sentiment_is_written_off_the_event_loop():
+    agent = CentralAgent(lambda *args, **kwargs: "", session_backend=InMemorySessionBackend(),
+                         config=AgentConfig(intent_classifier_path=None))
+    writer_threads = []
+    update = agent.sessions.update
+
+    def recording_update(user_id, fields):
+        writer_threads.append(threading.get_ident())
+        update(user_id, fields)
+
+    async def sentiment(message):
+        return {"sentiment": "positive"}
+
+    agent.sessions.update = recording_update
+    agent._aanalyze_sentiment = sentiment
+
+    async def main():
+        loop_thread = threading.get_ident()
+        agent.sessions.get_or_create("u")
+        agent.sessions.save("u")
+        agent._aschedule_sentiment("harika", "u")
+        while agent._background_tasks:
+            await asyncio.sleep(0.01)
+        return loop_thread
+
+    loop_thread = asyncio.run(main())
+    assert writer_threads and loop_thread not in writer_threads
+    assert agent.sessions.get("u").sentiment_result == {"sentiment": "positive"}
+
+
+def test_transition_log_is_appended_in_background(tmp_path):
+    path = tmp_path / "konusmalar.jsonl"
+    agent = CentralAgent(lambda *args, **kwargs: "",
+                         config=AgentConfig(intent_classifier_path=None, conversation_log_path=str(path)))
+    state = agent.sessions.get_or_create("u")
+    agent._record_transition(state, "fatura_sorgulama", ["fatura_bilgi_al"])
+    agent._background_pool.shutdown(wait=True)
+    row = json.loads(path.read_text(encoding="utf-8"))
+    assert row["intent"] == "fatura_sorgulama" and row["tools"] == ["fatura_bilgi_al"]
+    assert row["session"] is not None and row["session"] == state.session_id
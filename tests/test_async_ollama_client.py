@@ -0,0 +1,52 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from chat import ollama_client
+from chat.ollama_client import AsyncOllamaClient
+
+
+class FakeSession:
+    """Oluşturulduğu loop'u ve kapatılıp kapatılmadığını kaydeden aiohttp.ClientSession yerine geçen sınıf"""
+
+    created = []
+
+    def __init__(self, connector=None, timeout=None):
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+        FakeSession.created.append(self)
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def client(monkeypatch):
+    FakeSession.created = []
+    fake_aiohttp = SimpleNamespace(ClientSession=FakeSession, TCPConnector=lambda **kwargs: None,
+                                   ClientTimeout=lambda **kwargs: None)
+    monkeypatch.setattr(ollama_client, "aiohttp", fake_aiohttp)
+    return AsyncOllamaClient()
+
+
+def test_session_reused_within_one_loop(client):
+    async def main():
+        return await client._get_session(), await client._get_session()
+
+    first, second = asyncio.run(main())
+    assert first is second
+    assert len(FakeSession.created) == 1
+
+
+def test_consecutive_asyncio_runs_close_previous_session(client):
+    asyncio.run(client._get_session())
+    asyncio.run(client._get_session())
+    first, second = FakeSession.created
+    assert first.closed
+    assert not second.closed
+    assert first.loop is not second.loop
+
+    asyncio.run(client.aclose())
+    assert second.closed
+    assert client.session is None
@@ -0,0 +1,102 @@
+import json
+import re
+import threading
+
+import pytest
+
+from central_agent import AgentConfig, CentralAgent
+
+ANALIZLER = {
+    "paket": {"intent": "paket_degistir", "required_tools": ["paket_degistir"], "parameters": {}},
+    "fatura": {"intent": "fatura_sorgula", "required_tools": ["fatura_bilgi_al"],
+               "parameters": {"period": "current"}},
+}
+ARAC_SONUCU = {"success": True, "result": "Fatura tutarı: 250 TL, Durum: Ödendi", "tool_used": "fatura_bilgi_al",
+               "data": None}
+
+
+class CountingLLM:
+    """Niyet ve özet çağrılarını sayan, thread'ler arası paylaşılan sahte LLM"""
+
+    def __init__(self):
+        self.intent_messages = []
+        self.summaries = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, *args, **kwargs):
+        match = re.search(r"Kullanıcının Son Mesajı: (.*)", prompt)
+        with self._lock:
+            if match is None:
+                self.summaries += 1
+                return "Bu ayki faturanız 250 TL."
+            message = match.group(1).strip()
+            self.intent_messages.append(message)
+        anahtar = "paket" if "paket" in message.lower() else "fatura"
+        return json.dumps({"confidence": 0.95, "context_update": {}, "response_type": "immediate",
+                           **ANALIZLER[anahtar]})
+
+
+@pytest.fixture
+def llm():
+    return CountingLLM()
+
+
+@pytest.fixture
+def agent(llm):
+    agent = CentralAgent(llm, config=AgentConfig(
+        intent_classifier_path=None, llm_summarization=True, session_prefetch=False, speculative_prefetch=False))
+    agent.tool_runs = []
+
+    def run_tools(tools, parameters, user_id, prefetched=None, deadline=None):
+        agent.tool_runs.append((user_id, list(tools), dict(parameters)))
+        return [ARAC_SONUCU]
+
+    agent._run_tools = run_tools
+    agent._schedule_sentiment = lambda message, user_id: None
+    return agent
+
+
+def by_index(results):
+    return {index: (user_id, yanit) for index, user_id, yanit in results}
+
+
+def test_messages_of_one_user_run_in_order_across_waves(agent, llm):
+    batch = [("Paketimi değiştirmek istiyorum", "a"), ("Faturamı öğrenmek istiyorum", "b"),
+             ("Premium 5G", "a"), ("evet", "a")]
+    results = list(agent.generate_responses(batch))
+    assert [index for index, user_id, _ in results if user_id == "a"] == [0, 2, 3]
+
+    yanitlar = by_index(results)
+    assert yanitlar[0][1].startswith("Hangi pakete geçmek istiyorsunuz?")
+    assert "Onaylıyor musunuz?" in yanitlar[2][1]
+    # Önceki dalgada açılan slot ve onay sonraki dalgaya taşınır
+    assert agent.tool_runs[-1] == ("a", ["paket_degistir"], {"new_package_id": "PN2", "confirmed": True})
+    mesajlar = [m["message"] for m in agent.sessions.get("a").conversation_history if m["role"] == "user"]
+    assert mesajlar == ["Paketimi değiştirmek istiyorum", "Premium 5G", "evet"]
+
+
+def test_identical_prompts_in_one_wave_make_one_llm_call(agent, llm):
+    batch = [("Faturamı öğrenmek istiyorum", user_id) for user_id in ("a", "b", "c")]
+    results = list(agent.generate_responses(batch))
+    assert llm.intent_messages == ["Faturamı öğrenmek istiyorum"]
+    assert llm.summaries == 1
+    assert len(agent.tool_runs) == 3
+    assert {yanit for _, _, yanit in results} == {"Bu ayki faturanız 250 TL.\n\nBaşka bir isteğiniz var mı?"}
+
+
+def test_fast_path_and_resumed_slot_turns_skip_llm(agent, llm):
+    list(agent.generate_responses([("Paketimi değiştirmek istiyorum", "a")]))
+    assert llm.intent_messages == ["Paketimi değiştirmek istiyorum"]
+
+    results = list(agent.generate_responses([("Premium 5G", "a"), ("Merhaba", "b"), ("Teşekkürler", "c")]))
+    assert len(results) == 3
+    assert llm.intent_messages == ["Paketimi değiştirmek istiyorum"]
+    assert llm.summaries == 0
+
+
+def test_results_keep_input_index_and_user_id(agent):
+    batch = [("Faturamı öğrenmek istiyorum", "a"), ("Merhaba", "b"), ("Paketimi değiştirmek istiyorum", "c"),
+             ("Teşekkürler", "a"), ("Faturamı öğrenmek istiyorum", "b")]
+    results = list(agent.generate_responses(batch))
+    assert sorted(index for index, _, _ in results) == list(range(len(batch)))
+    assert {index: user_id for index, user_id, _ in results} == {i: user_id for i, (_, user_id) in enumerate(batch)}
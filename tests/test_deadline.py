@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+import central_agent
+from central_agent import AgentConfig, CentralAgent
+from deadline import Deadline, DeadlineExceeded
+
+FATURA_ANALIZI = {"intent": "fatura_sorgula", "confidence": 0.95, "required_tools": ["fatura_bilgi_al"],
+                  "parameters": {"period": "current"}, "context_update": {}, "response_type": "immediate"}
+FATURA_SONUCU = {"success": True, "result": "Fatura tutarı: 250 TL, Durum: Ödendi", "tool_used": "fatura_bilgi_al",
+                 "data": None}
+
+
+def test_remaining_counts_down_with_clock(clock):
+    deadline = Deadline(10, clock=clock)
+    assert deadline.remaining() == 10
+    clock.now += 4
+    assert deadline.remaining() == 6
+    assert deadline.has(6) and not deadline.has(6.5)
+    assert deadline.timeout(2) == 2 and deadline.timeout(30) == 6
+    clock.now += 20
+    assert deadline.remaining() == 0
+
+
+def test_check_raises_only_after_expiry(clock):
+    deadline = Deadline(1, clock=clock)
+    deadline.check()
+    assert not deadline.expired()
+    clock.now += 1
+    assert deadline.expired()
+    with pytest.raises(DeadlineExceeded):
+        deadline.check()
+
+
+def test_unlimited_budget_never_expires(clock):
+    deadline = Deadline(None, clock=clock)
+    assert deadline.remaining() == float("inf")
+    assert not deadline.expired()
+    assert deadline.timeout() is None and deadline.timeout(5) == 5
+    deadline.check()
+
+
+class FakeLLM:
+    """Niyet promptuna şemalı JSON, diğerlerine özet döndüren ve çağrıları kaydeden LLM"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, prompt, *args, **kwargs):
+        if "Kullanıcının Son Mesajı" in prompt:
+            self.calls.append("intent")
+            return json.dumps(FATURA_ANALIZI)
+        self.calls.append("summary")
+        return "Bu ayki faturanız 250 TL ve ödenmiş."
+
+
+@pytest.fixture
+def turn(monkeypatch, clock):
+    """Verilen bütçeyle, zamanı durmuş bir saatle tek tur çalıştırır"""
+
+    def run(budget):
+        monkeypatch.setattr(central_agent, "Deadline", lambda seconds: Deadline(seconds, clock=clock))
+        llm = FakeLLM()
+        agent = CentralAgent(llm, config=AgentConfig(
+            intent_classifier_path=None, turn_budget_seconds=budget, llm_stage_seconds=5.0,
+            llm_summarization=True, speculative_prefetch=False))
+        scheduled = []
+        agent._schedule_sentiment = lambda message, user_id: scheduled.append(message)
+        agent._run_tools = lambda *args, **kwargs: [FATURA_SONUCU]
+        reply = agent.generate_response("Bu ayki faturamı öğrenmek istiyorum", "u")
+        return reply, llm.calls, scheduled, agent.sessions.get("u")
+
+    return run
+
+
+def test_full_budget_uses_llm_for_every_stage(turn):
+    reply, calls, scheduled, state = turn(30)
+    assert calls == ["intent", "summary"]
+    assert scheduled == ["Bu ayki faturamı öğrenmek istiyorum"]
+    assert reply.startswith("Bu ayki faturanız 250 TL")
+
+
+def test_sentiment_falls_back_to_keywords_first(turn):
+    reply, calls, scheduled, state = turn(12)
+    assert scheduled == []
+    assert state.sentiment_result is not None
+    assert calls == ["intent", "summary"]
+
+
+def test_intent_falls_back_to_keywords_next(turn):
+    reply, calls, scheduled, state = turn(8)
+    assert calls == ["summary"]
+    assert state.current_intent.value == "fatura_sorgula"
+    assert reply.startswith("Bu ayki faturanız 250 TL")
+
+
+def test_raw_tool_text_when_no_stage_fits(turn):
+    reply, calls, scheduled, state = turn(3)
+    assert calls == []
+    assert reply == "Fatura tutarı: 250 TL, Durum: Ödendi\n\nBaşka bir isteğiniz var mı?"
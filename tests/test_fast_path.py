@@ -0,0 +1,36 @@
+import pytest
+
+from fast_path import CLOSING_ROUTE, GREETING_ROUTE, RATING_ROUTE, THANKS_ROUTE, FastPathRouter
+
+
+@pytest.mark.parametrize("message, route", [
+    ("8", RATING_ROUTE),
+    ("10", RATING_ROUTE),
+    ("Görüşürüz!", CLOSING_ROUTE),
+    ("Teşekkürler, görüşürüz", CLOSING_ROUTE),
+    ("Hayır teşekkürler", CLOSING_ROUTE),
+    ("Bu kadar, teşekkürler", CLOSING_ROUTE),
+    ("hepsi bu kadar", CLOSING_ROUTE),
+    ("Hoşçakalın", CLOSING_ROUTE),
+    ("tesekkurler", THANKS_ROUTE),
+    ("Çok teşekkür ederim", THANKS_ROUTE),
+    ("Tamam, sağ olun", THANKS_ROUTE),
+    ("Merhaba", GREETING_ROUTE),
+])
+def test_routes(message, route):
+    assert FastPathRouter().match(message).route == route
+
+
+@pytest.mark.parametrize("message", [
+    "Faturam neden bu kadar yüksek?",
+    "Bu kadar yavaş internet olmaz",
+    "Merhaba faturam ne kadar?",
+    "Görüşürüz demeden önce paketimi değiştirmek istiyorum",
+    "Teşekkürler, faturamı öğrenmek istiyorum",
+    "sağol ama paketimi değiştirmek istiyorum",
+    "tamam",
+    "11",
+    "",
+])
+def test_requests_do_not_match(message):
+    assert FastPathRouter().match(message) is None
@@ -0,0 +1,41 @@
+import pytest
+
+from central_agent import AgentConfig, CentralAgent
+from intent_cache import SemanticIntentCache
+
+
+@pytest.fixture
+def agent():
+    return CentralAgent(lambda *args, **kwargs: "", intent_cache=SemanticIntentCache(),
+                        config=AgentConfig(intent_classifier_path=None))
+
+
+def test_similar_message_reuses_analysis_with_fresh_query():
+    cache = SemanticIntentCache()
+    cache.add("roaming nasıl açılır", {"intent": "genel_soru", "required_tools": ["bilgi_tabanı_ara"],
+                                       "parameters": {"query": "roaming nasıl açılır"}})
+    analysis = cache.lookup("roaming nasıl açılır?")
+    assert analysis["intent"] == "genel_soru"
+    assert analysis["parameters"]["query"] == "roaming nasıl açılır?"
+
+
+def test_intent_cache_skips_write_tools_and_extracted_parameters(agent):
+    agent._remember_intent("PN2 paketine geçmek istiyorum", {
+        "intent": "paket_degistirme", "required_tools": ["paket_degistir"],
+        "parameters": {"new_package_id": "PN2"}})
+    agent._remember_intent("geçen ayın faturasını görmek istiyorum lütfen", {
+        "intent": "fatura_sorgulama", "required_tools": ["fatura_bilgi_al"],
+        "parameters": {"period": "last_3_months"}})
+    assert agent.intent_cache.lookup("PN2 paketine geçmek istiyorum") is None
+    assert agent.intent_cache.lookup("geçen ayın faturasını görmek istiyorum lütfen") is None
+
+
+def test_intent_cache_not_used_after_first_turn(agent):
+    analysis = {"intent": "genel_soru", "required_tools": ["bilgi_tabanı_ara"],
+                "parameters": {"query": "roaming nasıl açılır"}}
+    history = [{"role": "user", "message": "merhaba"}, {"role": "user", "message": "roaming nasıl açılır"}]
+    agent._remember_intent("roaming nasıl açılır", analysis, history)
+    assert agent.intent_cache.lookup("roaming nasıl açılır") is None
+    agent._remember_intent("roaming nasıl açılır", analysis, history[-1:])
+    assert agent.intent_cache.lookup("roaming nasıl açılır")["intent"] == "genel_soru"
+    assert agent._local_intent_analysis("roaming nasıl açılır", history) is None
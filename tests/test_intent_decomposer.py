@@ -0,0 +1,48 @@
+import pytest
+
+from intent_decomposer import IntentDecomposer, distinct_intents, merge_analyses
+
+
+@pytest.mark.parametrize("message, parts", [
+    ("Paketimi değiştirmek istiyorum, faturamı da öğrenmek istiyorum",
+     ["Paketimi değiştirmek istiyorum", "faturamı da öğrenmek istiyorum"]),
+    ("Faturamı öğrenmek istiyorum ve internetim çok yavaş",
+     ["Faturamı öğrenmek istiyorum", "internetim çok yavaş"]),
+    ("Şifremi unuttum, giriş yapamıyorum. Bir de sözleşmem ne zaman bitiyor?",
+     ["Şifremi unuttum giriş yapamıyorum", "sözleşmem ne zaman bitiyor?"]),
+])
+def test_split_compound_requests(message, parts):
+    assert IntentDecomposer().split(message) == parts
+
+
+@pytest.mark.parametrize("message", [
+    "Fatura borcumu ödemek istiyorum",
+    "Faturamı ve geçmiş faturalarımı görmek istiyorum",
+    "150,50 TL faturamı ödemek istiyorum",
+    "Merhaba, nasılsınız?",
+])
+def test_single_requests_are_not_split(message):
+    assert IntentDecomposer().split(message) == [message]
+
+
+def test_too_many_parts_are_not_split():
+    message = "Faturam, paketim, şifrem ve sözleşmem"
+    assert IntentDecomposer(max_parts=3).split(message) == [message]
+    assert len(IntentDecomposer(max_parts=4).split(message)) == 4
+
+
+def test_same_intent_parts_are_merged():
+    analyses = [
+        {"intent": "fatura_sorgulama", "required_tools": ["fatura_bilgi_al"], "parameters": {"period": "current"},
+         "response_type": "immediate"},
+        {"intent": "paket_degistirme", "required_tools": ["paket_listesi_al"], "parameters": {}},
+        {"intent": "fatura_sorgulama", "required_tools": ["musteri_bilgi_al", "fatura_bilgi_al"],
+         "parameters": {"period": "last_3_months"}, "response_type": "clarification"},
+    ]
+    subs = distinct_intents(["a", "b", "c"], analyses)
+    assert [part for part, _ in subs] == ["a c", "b"]
+    merged = subs[0][1]
+    assert merged["required_tools"] == ["fatura_bilgi_al", "musteri_bilgi_al"]
+    assert merged["parameters"] == {"period": "current"}
+    assert merged["response_type"] == "clarification"
+    assert merge_analyses([analyses[1]])["required_tools"] == ["paket_listesi_al"]
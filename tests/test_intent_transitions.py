@@ -0,0 +1,149 @@
+import json
+import threading
+from concurrent.futures import Future
+
+import pytest
+
+import central_agent
+import tools
+from central_agent import AgentConfig, CentralAgent, IntentType
+from intent_transitions import START, IntentTransitionModel
+from tool_cache import DEFAULT_TOOL_CACHE
+
+FATURA = ("fatura_sorgula", ["fatura_bilgi_al"])
+PAKET = ("paket_degistir", ["paket_listesi_al", "musteri_bilgi_al"])
+TEKNIK = ("teknik_destek", ["ticket_olustur"])
+
+
+def write_log(path, rows):
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def test_next_intents_and_tools_probabilities():
+    model = IntentTransitionModel().fit([[FATURA, PAKET], [FATURA, PAKET], [FATURA, TEKNIK], [PAKET]])
+    assert model.next_intents("fatura_sorgula") == [("paket_degistir", pytest.approx(2 / 3)),
+                                                    ("teknik_destek", pytest.approx(1 / 3))]
+    # P(araç | fatura) = Σ P(sonraki | fatura) · P(araç | sonraki); paket niyeti hep iki okumayı kullanır
+    assert dict(model.next_tools("fatura_sorgula")) == {
+        "paket_listesi_al": pytest.approx(2 / 3), "musteri_bilgi_al": pytest.approx(2 / 3),
+        "ticket_olustur": pytest.approx(1 / 3)}
+    assert model.next_intents(None) == [("fatura_sorgula", pytest.approx(3 / 4)),
+                                        ("paket_degistir", pytest.approx(1 / 4))]
+    assert model.next_tools("teknik_destek") == []
+
+
+def test_from_log_splits_conversations_by_session(tmp_path):
+    path = tmp_path / "konusmalar.jsonl"
+    write_log(path, [
+        {"user_id": "u", "session": "1", "intent": "fatura_sorgula", "tools": ["fatura_bilgi_al"], "timestamp": 1},
+        {"user_id": "u", "session": "1", "intent": "paket_degistir", "tools": [], "timestamp": 2},
+        {"user_id": "u", "session": "3", "intent": "teknik_destek", "tools": [], "timestamp": 3},
+    ])
+    model = IntentTransitionModel.from_log(str(path))
+    assert dict(model.next_intents(None)) == {"fatura_sorgula": 0.5, "teknik_destek": 0.5}
+    assert model.next_intents("paket_degistir") == []
+
+
+def test_from_log_splits_rows_without_session_on_idle_gap(tmp_path):
+    path = tmp_path / "konusmalar.jsonl"
+    write_log(path, [
+        {"user_id": "u", "intent": "fatura_sorgula", "tools": [], "timestamp": 0},
+        {"user_id": "u", "intent": "paket_degistir", "tools": [], "timestamp": 60},
+        {"user_id": "u", "intent": "teknik_destek", "tools": [], "timestamp": 60 + 86400},
+    ])
+    model = IntentTransitionModel.from_log(str(path), session_gap=1800)
+    assert dict(model.next_intents(START)) == {"fatura_sorgula": 0.5, "teknik_destek": 0.5}
+    assert model.next_intents("fatura_sorgula") == [("paket_degistir", 1.0)]
+
+
+@pytest.fixture
+def agent():
+    return CentralAgent(lambda *args, **kwargs: "", config=AgentConfig(intent_classifier_path=None))
+
+
+def test_idle_gap_starts_new_conversation_in_live_table(agent):
+    state = agent.sessions.get_or_create("u")
+    state.conversation_history.append("user", "faturam", 1000.0)
+    agent._record_transition(state, "fatura_sorgula", ["fatura_bilgi_al"])
+    state.current_intent = IntentType.BILLING_INQUIRY
+    # Birleşik isteğin ikinci alt niyeti aynı konuşmada kalır
+    agent._record_transition(state, "fatura_sorgula", [])
+    assert state.session_id == "1000.000000"
+    state.conversation_history.append("user", "paketim", 1000.0 + 2 * 3600)
+    agent._record_transition(state, "paket_degistir", [])
+    assert state.session_id == "8200.000000"
+    assert agent.transitions.next_intents("fatura_sorgula") == [("fatura_sorgula", 1.0)]
+    assert dict(agent.transitions.next_intents(None)) == {"fatura_sorgula": 0.5, "paket_degistir": 0.5}
+
+
+@pytest.fixture
+def prefetched(monkeypatch):
+    """prefetch_user_data yerine gönderilen çağrıları kaydeden ve bitirilmemiş Future döndüren sahte"""
+    sent = []
+
+    def fake_prefetch(user_id, executor, calls):
+        sent.append([call[0] for call in calls])
+        return [Future() for _ in calls]
+
+    monkeypatch.setattr(central_agent, "prefetch_user_data", fake_prefetch)
+    return sent
+
+
+def billing_state(agent, user_id, transitions):
+    agent.transitions = IntentTransitionModel().fit(transitions)
+    state = agent.sessions.get_or_create(user_id)
+    state.current_intent = IntentType.BILLING_INQUIRY
+    return state
+
+
+def test_speculative_prefetch_respects_probability_threshold(agent, prefetched):
+    # paket_listesi_al 2/3, musteri_bilgi_al 1/3, ticket_olustur 1/3 < eşik 0.5
+    state = billing_state(agent, "spek-esik", [[FATURA, PAKET], [FATURA, ("paket_degistir", ["paket_listesi_al"])],
+                                             [FATURA, TEKNIK]])
+    agent.config.speculative_min_probability = 0.5
+    agent._speculative_prefetch(state)
+    assert prefetched == [["getAvailablePackages"]]
+
+
+def test_speculative_prefetch_respects_cost_cap(agent, prefetched):
+    # Paket listesi (0.5 sn) sığmaz, sonraki daha ucuz müşteri bilgisi (0.3 sn) sığar
+    state = billing_state(agent, "spek-maliyet", [[FATURA, PAKET]])
+    agent.config.speculative_cost_cap = 0.4
+    agent._speculative_prefetch(state)
+    assert prefetched == [["getUserInfo"]]
+
+
+def test_speculative_prefetch_skips_cached_and_in_flight_calls(agent, prefetched):
+    user_id = "spek-tekrar"
+    state = billing_state(agent, user_id, [[FATURA, PAKET]])
+    DEFAULT_TOOL_CACHE.put("getUserInfo", user_id, (), {"success": True, "data": {}})
+    try:
+        futures = agent._speculative_prefetch(state)
+        assert prefetched == [["getAvailablePackages"]]
+
+        # Kuyruktaki/süren ön yükleme bitmeden gelen tur aynı çağrıyı yeniden göndermez
+        assert agent._speculative_prefetch(state) == []
+        futures[0].set_result(None)
+        agent._speculative_prefetch(state)
+        assert prefetched == [["getAvailablePackages"], ["getAvailablePackages"]]
+    finally:
+        DEFAULT_TOOL_CACHE.invalidate(user_id)
+
+
+def test_call_running_in_single_flight_counts_as_prefetched():
+    user_id = "spek-ucusta"
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+
+    worker = threading.Thread(target=tools._SINGLE_FLIGHT.do, args=(("getAvailablePackages", (user_id,)), slow))
+    worker.start()
+    started.wait(5)
+    try:
+        assert tools.is_prefetched(user_id, ("getAvailablePackages",))
+    finally:
+        release.set()
+        worker.join()
+    assert not tools.is_prefetched(user_id, ("getAvailablePackages",))
@@ -0,0 +1,57 @@
+from chat.json_stream import IncrementalJSONParser
+
+
+def feed_all(parser, chunks):
+    completed = []
+    for chunk in chunks:
+        completed.append(parser.feed(chunk))
+    return completed
+
+
+def test_values_complete_as_soon_as_they_close():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"intent": "fatura_sorgulama", "conf') == {"intent": "fatura_sorgulama"}
+    assert parser.feed('idence": 0.9') == {}
+    assert parser.feed(', "x": 1}') == {"confidence": 0.9, "x": 1}
+    assert parser.done
+
+
+def test_escape_split_across_chunks():
+    parser = IncrementalJSONParser()
+    feed_all(parser, ['{"a": "tırnak \\', '" içinde', ' \\\\', '", "b": 2}'])
+    assert parser.values == {"a": 'tırnak " içinde \\', "b": 2}
+    assert parser.done
+
+
+def test_nested_objects_and_arrays_are_single_values():
+    parser = IncrementalJSONParser()
+    completed = feed_all(parser, [
+        '{"required_tools": ["fatura_bilgi_al", "musteri',
+        '_bilgi_al"], "parameters": {"period": "current", "ic": {"x": [1, 2]}}, ',
+        '"response_type": "immediate"}',
+    ])
+    assert completed[1] == {
+        "required_tools": ["fatura_bilgi_al", "musteri_bilgi_al"],
+        "parameters": {"period": "current", "ic": {"x": [1, 2]}},
+    }
+    assert parser.values["response_type"] == "immediate"
+    assert parser.done
+
+
+def test_text_before_object_is_ignored():
+    parser = IncrementalJSONParser()
+    parser.feed('Tabii, işte JSON: {"intent": "genel_soru"}')
+    assert parser.values == {"intent": "genel_soru"}
+
+
+def test_truncated_stream_keeps_completed_values_only():
+    parser = IncrementalJSONParser()
+    feed_all(parser, ['{"intent": "paket_degistirme", "parameters": {"new_package_id": "PN', '2"'])
+    assert parser.values == {"intent": "paket_degistirme"}
+    assert not parser.done
+
+
+def test_null_value_is_kept():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": null, "b": true}')
+    assert parser.values == {"a": None, "b": True}
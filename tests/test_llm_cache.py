@@ -0,0 +1,59 @@
+import pytest
+
+from chat import llm_cache
+from chat.llm_cache import LLMResponseCache
+
+
+@pytest.fixture
+def clock(clock, monkeypatch):
+    """conftest'teki saat; önbellek time.time'ı doğrudan kullandığı için yerine konur"""
+    monkeypatch.setattr(llm_cache.time, "time", clock)
+    return clock
+
+
+def test_key_depends_on_model_prompt_and_options():
+    key = LLMResponseCache.make_key("llama3", "merhaba", {"temperature": 0})
+    assert key == LLMResponseCache.make_key("llama3", "merhaba", {"temperature": 0})
+    assert key != LLMResponseCache.make_key("llama3", "merhaba", {"temperature": 1})
+    assert key != LLMResponseCache.make_key("mistral", "merhaba", {"temperature": 0})
+
+
+def test_entry_expires_after_ttl(clock):
+    cache = LLMResponseCache(default_ttl=10)
+    cache.set("k", "yanit")
+    clock.now += 9
+    assert cache.get("k") == "yanit"
+    clock.now += 2
+    assert cache.get("k") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_per_entry_ttl_and_zero_ttl_is_not_stored(clock):
+    cache = LLMResponseCache(default_ttl=100)
+    cache.set("kisa", "a", ttl=1)
+    cache.set("yok", "b", ttl=0)
+    clock.now += 5
+    assert cache.get("kisa") is None
+    assert cache.get("yok") is None
+
+
+def test_lru_evicts_least_recently_used(clock):
+    cache = LLMResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_disk_layer_survives_memory_eviction(clock, tmp_path):
+    cache = LLMResponseCache(max_entries=1, disk_path=str(tmp_path / "llm.sqlite"))
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    assert cache.stats()["disk_hits"] == 1
+    clock.now += llm_cache.DEFAULT_TTL + 1
+    assert cache.get("a") is None
@@ -0,0 +1,46 @@
+import pytest
+
+from central_agent import AgentConfig, CentralAgent
+from intent_classifier import LocalIntentClassifier
+from slot_filling import parse_period
+
+FATURA = ("fatura_sorgulama", ["fatura_bilgi_al"])
+TEKNIK = ("teknik_destek", ["ticket_olustur"])
+EXAMPLES = [
+    (message, *FATURA) for message in (
+        "faturamı öğrenmek istiyorum", "fatura tutarım ne kadar", "bu ayki faturam ne kadar",
+        "geçen ayın faturasını görmek istiyorum", "faturamı göster", "mart ayı faturam",
+    )
+] + [
+    (message, *TEKNIK) for message in (
+        "internetim çok yavaş", "internet bağlantım kopuyor", "modemim çalışmıyor",
+        "internet çekmiyor arıza var", "bağlantı sorunu yaşıyorum", "internetim gitti",
+    )
+]
+
+
+@pytest.fixture(scope="module")
+def classifier():
+    model = LocalIntentClassifier(threshold=0.5)
+    model.fit(EXAMPLES, holdout=0)
+    return model
+
+
+@pytest.fixture
+def agent(classifier):
+    return CentralAgent(lambda *args, **kwargs: "", config=AgentConfig(intent_classifier_path=None),
+                        intent_classifier=classifier)
+
+
+def test_classifier_extracts_billing_period_from_message(classifier):
+    analysis = classifier.analyze("Mart ayı faturamı öğrenmek istiyorum")
+    assert analysis["intent"] == "fatura_sorgulama"
+    assert analysis["parameters"] == {"period": parse_period("Mart")}
+    assert classifier.analyze("son 6 ayın faturalarını göster")["parameters"] == {"period": "last_6_months"}
+    assert classifier.analyze("faturamı öğrenmek istiyorum")["parameters"] == {"period": "current"}
+
+
+def test_write_tools_are_left_to_llm(classifier, agent):
+    assert classifier.predict("internetim çok yavaş")[0] == "teknik_destek"
+    assert classifier.analyze("internetim çok yavaş") is None
+    assert agent._local_intent_analysis("internetim çok yavaş") is None
@@ -0,0 +1,57 @@
+import pytest
+
+from message_history import MessageHistory
+
+
+def filled(capacity, n):
+    history = MessageHistory(capacity)
+    for i in range(n):
+        history.append("user" if i % 2 == 0 else "assistant", f"m{i}", float(i))
+    return history
+
+
+def messages(records):
+    return [r["message"] for r in records]
+
+
+def test_wraparound_keeps_last_capacity_messages_in_order():
+    history = filled(3, 5)
+    assert len(history) == 3
+    assert messages(history) == ["m2", "m3", "m4"]
+    assert history[0] == {"role": "user", "message": "m2", "timestamp": 2.0}
+    assert history[-1]["message"] == "m4"
+
+
+def test_slicing_after_wraparound():
+    history = filled(4, 7)
+    assert messages(history[-2:]) == ["m5", "m6"]
+    assert messages(history[1:3]) == ["m4", "m5"]
+    assert messages(history[::-1]) == ["m6", "m5", "m4", "m3"]
+    assert history[-10:] == history.to_list()
+
+
+@pytest.mark.parametrize("index", [2, -3])
+def test_index_out_of_range(index):
+    with pytest.raises(IndexError):
+        filled(3, 2)[index]
+
+
+def test_columns_roundtrip_after_wraparound():
+    history = filled(3, 5)
+    restored = MessageHistory.from_columns(3, *history.columns())
+    assert restored.to_list() == history.to_list()
+    restored.append("user", "yeni", 9.0)
+    assert messages(restored) == ["m3", "m4", "yeni"]
+
+
+def test_unbounded_and_zero_capacity():
+    assert len(filled(None, 100)) == 100
+    zero = filled(0, 3)
+    assert len(zero) == 0 and not zero
+
+
+def test_clear_resets_ring():
+    history = filled(2, 5)
+    history.clear()
+    history.append("user", "a", 1.0)
+    assert messages(history) == ["a"]
@@ -0,0 +1,42 @@
+import pytest
+
+from response_templates import ResponseRenderer, Template, TemplateError
+
+PAYMENT = {"amount": 1234.5, "payment_id": "PAY-1", "new_balance": 250.0}
+
+
+def test_filters_and_conditionals():
+    template = Template("{{ tutar|tl }}{% if odendi %} ödendi{% else %} bekliyor{% endif %} {{ tarih|tarih }}")
+    assert template.render({"tutar": 1234.5, "odendi": False, "tarih": "2024-12-15"}) == \
+        "1.234,50 TL bekliyor 15 Aralık 2024"
+
+
+def test_undefined_variable_raises():
+    with pytest.raises(TemplateError):
+        Template("{{ nesne.yok }}").render({"nesne": {}})
+
+
+def test_unknown_filter_and_unclosed_if_fail_at_compile_time():
+    with pytest.raises(TemplateError):
+        Template("{{ x|bilinmeyen }}")
+    with pytest.raises(TemplateError):
+        Template("{% if x %}açık")
+
+
+def test_renderer_formats_tool_result():
+    assert ResponseRenderer().render("odeme_islem", PAYMENT) == (
+        "1.234,50 TL tutarındaki ödemeniz başarıyla alındı. İşlem numaranız PAY-1, güncel bakiyeniz 250 TL."
+    )
+
+
+def test_renderer_returns_none_on_undefined_variable():
+    data = {key: value for key, value in PAYMENT.items() if key != "payment_id"}
+    assert ResponseRenderer().render("odeme_islem", data) is None
+
+
+def test_renderer_returns_none_for_bad_data_or_unknown_tool():
+    renderer = ResponseRenderer()
+    assert renderer.render("odeme_islem", {**PAYMENT, "amount": "yok"}) is None
+    assert renderer.render("fatura_bilgi_al", {"bills": []}) is None
+    assert renderer.render("odeme_islem", None) is None
+    assert renderer.render("bilgi_tabanı_ara", PAYMENT) is None
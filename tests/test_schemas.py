@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from central_agent import AgentConfig, CentralAgent
+from chat.ollama_client import OllamaClient
+from chat.schemas import INTENT_SCHEMA, SENTIMENT_SCHEMA, StructuredOutputError, validate_payload
+
+GECERLI_NIYET = {"intent": "fatura_sorgula", "required_tools": ["fatura_bilgi_al"], "parameters": {},
+                 "confidence": 0.9, "response_type": "immediate"}
+GECERLI_DUYGU = {"sentiment": "positive", "confidence": 0.8, "emotion": "happy", "satisfaction_score": 9}
+
+
+def without(payload, key):
+    return {k: v for k, v in payload.items() if k != key}
+
+
+@pytest.mark.parametrize("payload, schema, path", [
+    (without(GECERLI_NIYET, "intent"), INTENT_SCHEMA, "$"),
+    (without(GECERLI_NIYET, "required_tools"), INTENT_SCHEMA, "$"),
+    (without(GECERLI_DUYGU, "satisfaction_score"), SENTIMENT_SCHEMA, "$"),
+    ({**GECERLI_NIYET, "parameters": []}, INTENT_SCHEMA, "$.parameters"),
+    ({**GECERLI_NIYET, "required_tools": "fatura_bilgi_al"}, INTENT_SCHEMA, "$.required_tools"),
+    ({**GECERLI_NIYET, "confidence": "yüksek"}, INTENT_SCHEMA, "$.confidence"),
+    ({**GECERLI_NIYET, "confidence": True}, INTENT_SCHEMA, "$.confidence"),
+    ({**GECERLI_NIYET, "intent": "uydurma_niyet"}, INTENT_SCHEMA, "$.intent"),
+    ({**GECERLI_NIYET, "required_tools": ["fatura_bilgi_al", "uydurma_arac"]}, INTENT_SCHEMA, "$.required_tools[1]"),
+    ({**GECERLI_NIYET, "confidence": 1.5}, INTENT_SCHEMA, "$.confidence"),
+    ({**GECERLI_DUYGU, "satisfaction_score": 0}, SENTIMENT_SCHEMA, "$.satisfaction_score"),
+    ([GECERLI_NIYET], INTENT_SCHEMA, "$"),
+])
+def test_invalid_payload_raises_with_path(payload, schema, path):
+    with pytest.raises(StructuredOutputError) as excinfo:
+        validate_payload(payload, schema)
+    assert str(excinfo.value).startswith(f"{path}:")
+
+
+@pytest.mark.parametrize("payload, schema", [
+    (GECERLI_NIYET, INTENT_SCHEMA),
+    (without(GECERLI_NIYET, "confidence"), INTENT_SCHEMA),
+    # Şemada additionalProperties kullanılmaz; fazladan alanlar kabul edilir
+    ({**GECERLI_NIYET, "aciklama": "serbest metin"}, INTENT_SCHEMA),
+    ({**GECERLI_DUYGU, "ek": 1}, SENTIMENT_SCHEMA),
+])
+def test_valid_payload_passes(payload, schema):
+    validate_payload(payload, schema)
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Ollama akışı yerine verilen parçaları döndüren istemci"""
+    client = OllamaClient()
+    client.chunks = []
+    monkeypatch.setattr(client, "_iter_tokens", lambda *args, **kwargs: iter(client.chunks))
+    return client
+
+
+@pytest.mark.parametrize("raw", [
+    "niyet: fatura",
+    json.dumps({**GECERLI_NIYET, "intent": "uydurma_niyet"}),
+    json.dumps(without(GECERLI_NIYET, "parameters")),
+])
+def test_chat_json_rejects_invalid_model_output(client, raw):
+    client.chunks = [raw]
+    with pytest.raises(StructuredOutputError):
+        client.chat_json("prompt", INTENT_SCHEMA)
+
+
+def test_chat_json_stream_rejects_invalid_or_incomplete_output(client):
+    client.chunks = [json.dumps({**GECERLI_NIYET, "intent": "uydurma_niyet"})]
+    with pytest.raises(StructuredOutputError):
+        list(client.chat_json_stream("prompt", INTENT_SCHEMA))
+    client.chunks = ['{"intent": "fatura_sorgula", "required_tools": [']
+    with pytest.raises(StructuredOutputError):
+        list(client.chat_json_stream("prompt", INTENT_SCHEMA))
+
+
+@pytest.mark.parametrize("stream_tool_dispatch", [False, True])
+def test_invalid_intent_output_falls_back_to_keywords(client, stream_tool_dispatch):
+    agent = CentralAgent(client, config=AgentConfig(intent_classifier_path=None,
+                                                    stream_tool_dispatch=stream_tool_dispatch))
+    client.chunks = [json.dumps({**GECERLI_NIYET, "intent": "uydurma_niyet"})]
+    mesaj = "Faturamı öğrenmek istiyorum"
+    analysis = agent._analyze_intent_with_llm(mesaj, [], on_tools_ready=lambda tools, params: None)
+    assert analysis == agent._fallback_intent_analysis(mesaj)
+    # Geçersiz çıktı niyet önbelleğine alınmaz
+    client.chunks = [json.dumps(GECERLI_NIYET)]
+    assert agent._analyze_intent_with_llm(mesaj, [], on_tools_ready=lambda tools, params: None)["confidence"] == 0.9
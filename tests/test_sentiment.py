@@ -0,0 +1,52 @@
+import json
+import threading
+
+from central_agent import AgentConfig, CentralAgent
+
+NIYET = {"intent": "fatura_sorgula", "confidence": 0.95, "required_tools": ["fatura_bilgi_al"],
+         "parameters": {"period": "current"}, "context_update": {}, "response_type": "immediate"}
+ARAC_SONUCU = {"success": True, "result": "Fatura tutarı: 250 TL, Durum: Ödendi", "tool_used": "fatura_bilgi_al",
+               "data": None}
+
+
+def fake_llm(prompt, *args, **kwargs):
+    return json.dumps(NIYET) if "Kullanıcının Son Mesajı" in prompt else "Faturanız 250 TL."
+
+
+def test_reply_does_not_wait_for_sentiment():
+    agent = CentralAgent(fake_llm, config=AgentConfig(
+        intent_classifier_path=None, speculative_prefetch=False, turn_budget_seconds=None))
+    agent._run_tools = lambda *args, **kwargs: [ARAC_SONUCU]
+    started, release = threading.Event(), threading.Event()
+
+    def slow_sentiment(message):
+        started.set()
+        release.wait(5)
+        return {"sentiment": "negative", "confidence": 0.9, "emotion": "frustrated", "satisfaction_score": 2}
+
+    agent._analyze_sentiment = slow_sentiment
+    try:
+        reply = agent.generate_response("Faturam yine çok yüksek geldi", "u")
+        # Yanıt döndüğünde duygu analizi başlamış ama bitmemiştir
+        assert started.wait(5)
+        assert reply.startswith("Faturanız 250 TL.")
+        assert agent.sessions.get("u").sentiment_result is None
+    finally:
+        release.set()
+    # Havuz kapanırken tamamlanma geri çağrısı da çalışmış olur
+    agent._background_pool.shutdown(wait=True)
+    assert agent.sessions.get("u").sentiment_result["sentiment"] == "negative"
+
+
+def test_stale_sentiment_result_does_not_overwrite_newer_message():
+    agent = CentralAgent(lambda *args, **kwargs: "", config=AgentConfig(intent_classifier_path=None))
+    releases = {"ilk": threading.Event(), "ikinci": threading.Event()}
+    agent._analyze_sentiment = lambda message: releases[message].wait(5) and {"sentiment": message}
+    first = agent._schedule_sentiment("ilk", "u")
+    second = agent._schedule_sentiment("ikinci", "u")
+    releases["ikinci"].set()
+    second.result(5)
+    releases["ilk"].set()
+    first.result(5)
+    agent._background_pool.shutdown(wait=True)
+    assert agent.sessions.get("u").sentiment_result == {"sentiment": "ikinci"}
@@ -0,0 +1,92 @@
+import pytest
+
+from central_agent import ConversationState
+from db.session_backend import InMemorySessionBackend, SessionBackend, decode_record, encode_record
+from session_store import SessionStore
+
+
+def worker(backend):
+    """Aynı arka ucu paylaşan ayrı bir worker sürecinin oturum deposu"""
+    return SessionStore(ConversationState, backend=backend, dumps=ConversationState.to_record,
+                        loads=ConversationState.from_record, merge=ConversationState.merge_remote)
+
+
+def messages(backend, user_id="u"):
+    state = ConversationState.from_record(backend.load(user_id)[1])
+    return [m["message"] for m in state.conversation_history]
+
+
+def test_record_roundtrip_with_compression():
+    small = {"u": "u", "h": [["user"], ["kısa"], [1.0]]}
+    large = {"u": "u", "h": [["user"] * 50, ["uzun bir mesaj"] * 50, [1.0] * 50]}
+    assert encode_record(small)[:1] == b"j"
+    assert encode_record(large)[:1] == b"z"
+    assert decode_record(encode_record(large)) == large
+
+
+def test_incomplete_backend_fails_at_construction():
+    class LoadOnly(SessionBackend):
+        def load(self, user_id, newer_than=0):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnly()
+
+
+def test_save_is_compare_and_set():
+    backend = InMemorySessionBackend()
+    assert backend.save("u", 0, 1, {"a": 1})
+    assert not backend.save("u", 0, 1, {"a": 2})
+    assert backend.save("u", 1, 2, {"a": 3})
+    assert backend.load("u") == (2, {"a": 3})
+    assert backend.load("u", newer_than=2) is None
+
+
+def test_field_update_bumps_version_and_full_save_absorbs_it():
+    backend = InMemorySessionBackend()
+    assert backend.update_fields("u", {"s": 1}) is None
+    backend.save("u", 0, 1, {"a": 1, "s": None})
+    assert backend.update_fields("u", {"s": {"sentiment": "positive"}}) == 2
+    assert backend.load("u") == (2, {"a": 1, "s": {"sentiment": "positive"}})
+    backend.save("u", 2, 3, {"a": 2, "s": None})
+    assert backend.load("u") == (3, {"a": 2, "s": None})
+
+
+def test_stale_worker_does_not_roll_back_newer_turn():
+    backend = InMemorySessionBackend()
+    a, b = worker(backend), worker(backend)
+    state_a = a.get_or_create("u", refresh=True)
+    state_a.add_message("user", "1")
+    state_a.sentiment_seq = 1
+    a.save("u")
+
+    state_b = b.get_or_create("u", refresh=True)
+    state_b.add_message("assistant", "1 yanıt")
+    state_b.add_message("user", "2")
+    state_b.sentiment_seq = 2
+    b.save("u")
+
+    # A'nın geç gelen arka plan duygu sonucu sadece kendi alanını yazar
+    state_a.sentiment_result = {"sentiment": "neutral"}
+    a.update("u", state_a.sentiment_fields())
+    assert messages(backend) == ["1", "1 yanıt", "2"]
+
+    # A'nın eski kopyasıyla tam yazma çakışır, kayıt okunup birleştirilir
+    state_a.satisfaction_rating = 9
+    a.save("u")
+    merged = ConversationState.from_record(backend.load("u")[1])
+    assert [m["message"] for m in merged.conversation_history] == ["1", "1 yanıt", "2"]
+    assert merged.sentiment_seq == 2
+    assert merged.satisfaction_rating == 9
+    assert a.stats()["backend_conflicts"] == 1
+
+
+def test_refresh_picks_up_other_worker_turn():
+    backend = InMemorySessionBackend()
+    a, b = worker(backend), worker(backend)
+    a.get_or_create("u", refresh=True).add_message("user", "1")
+    a.save("u")
+    b.get_or_create("u", refresh=True).add_message("user", "2")
+    b.save("u")
+    state = a.get_or_create("u", refresh=True)
+    assert [m["message"] for m in state.conversation_history] == ["1", "2"]
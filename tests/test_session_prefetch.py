@@ -0,0 +1,52 @@
+import json
+from concurrent.futures import wait
+
+import pytest
+
+import mock_apis
+from central_agent import AgentConfig, CentralAgent
+from tool_cache import DEFAULT_TOOL_CACHE
+from tools import SESSION_PREFETCH_CALLS
+
+USER_ID = "05551234567"
+NIYET = {"intent": "fatura_sorgula", "confidence": 0.95, "required_tools": ["musteri_bilgi_al", "fatura_bilgi_al"],
+         "parameters": {"period": "current"}, "context_update": {}, "response_type": "immediate"}
+
+
+@pytest.fixture
+def api_calls(monkeypatch):
+    """Gecikmesiz mock API'ler; backend'e giden çağrıların adlarını kaydeder"""
+    calls = []
+    for api_name in mock_apis.API_LATENCIES:
+        monkeypatch.setitem(mock_apis.API_LATENCIES, api_name, (0, 0))
+    for api_name, *_ in SESSION_PREFETCH_CALLS:
+        original = getattr(mock_apis, api_name)
+
+        def counting(*args, _original=original, _name=api_name):
+            calls.append(_name)
+            return _original(*args)
+
+        monkeypatch.setattr(mock_apis, api_name, counting)
+    DEFAULT_TOOL_CACHE.invalidate(USER_ID)
+    yield calls
+    DEFAULT_TOOL_CACHE.invalidate(USER_ID)
+
+
+def test_session_start_prefetch_serves_first_turn_from_cache(api_calls):
+    agent = CentralAgent(lambda prompt, *args, **kwargs: json.dumps(NIYET),
+                         config=AgentConfig(intent_classifier_path=None, speculative_prefetch=False))
+    agent._schedule_sentiment = lambda message, user_id: None
+    wait(agent.start_session(USER_ID), timeout=5)
+    assert sorted(api_calls) == ["getBillingInfo", "getUserInfo"]
+
+    api_calls.clear()
+    reply = agent.generate_response("Faturamı öğrenmek istiyorum", USER_ID)
+    assert api_calls == []
+    assert "Başka bir isteğiniz var mı?" in reply
+
+
+def test_session_prefetch_can_be_disabled(api_calls):
+    agent = CentralAgent(lambda *args, **kwargs: "",
+                         config=AgentConfig(intent_classifier_path=None, session_prefetch=False))
+    assert agent.start_session(USER_ID) == []
+    assert api_calls == []
@@ -0,0 +1,55 @@
+from session_store import SessionStore
+
+
+def store(clock, max_sessions=3, idle_ttl=None):
+    return SessionStore(lambda user_id: {"user_id": user_id}, max_sessions=max_sessions,
+                        idle_ttl=idle_ttl, clock=clock)
+
+
+def test_get_or_create_reuses_session(clock):
+    sessions = store(clock)
+    first = sessions.get_or_create("a")
+    assert sessions.get_or_create("a") is first
+    assert sessions.stats()["created"] == 1
+    assert sessions.stats()["hits"] == 1
+
+
+def test_lru_evicts_least_recently_used(clock):
+    sessions = store(clock, max_sessions=2)
+    sessions.get_or_create("a")
+    sessions.get_or_create("b")
+    sessions.get_or_create("a")
+    sessions.get_or_create("c")
+    assert "b" not in sessions
+    assert "a" in sessions and "c" in sessions
+    assert sessions.stats()["evicted_lru"] == 1
+
+
+def test_get_does_not_create_or_touch(clock):
+    sessions = store(clock, max_sessions=2)
+    sessions.get_or_create("a")
+    sessions.get_or_create("b")
+    assert sessions.get("yok") is None
+    # get erişim sırasını değiştirmez: "a" hâlâ en eski
+    sessions.get("a")
+    sessions.get_or_create("c")
+    assert "a" not in sessions
+
+
+def test_idle_sessions_expire_on_access(clock):
+    sessions = store(clock, idle_ttl=60)
+    sessions.get_or_create("a")
+    clock.now = 30
+    sessions.get_or_create("b")
+    clock.now = 61
+    assert sessions.get("a") is None
+    assert sessions.get("b") is not None
+    assert sessions.stats()["evicted_ttl"] == 1
+
+
+def test_expired_session_is_recreated(clock):
+    sessions = store(clock, idle_ttl=10)
+    old = sessions.get_or_create("a")
+    clock.now = 11
+    assert sessions.get_or_create("a") is not old
+    assert len(sessions) == 1
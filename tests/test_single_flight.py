@@ -0,0 +1,104 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from single_flight import AsyncSingleFlight, SingleFlight
+
+
+def wait_for_follower(flight, timeout=5.0):
+    end = time.monotonic() + timeout
+    while flight.stats["coalesced"] == 0 and time.monotonic() < end:
+        time.sleep(0.001)
+
+
+def test_concurrent_calls_share_one_result():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"success": True}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=lambda: results.append(flight.do("k", fetch)))
+    follower.start()
+    wait_for_follower(flight)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert calls == [1]
+    assert results == [{"success": True}, {"success": True}]
+
+
+def test_leader_exception_reaches_followers():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+
+    def fetch():
+        started.set()
+        release.wait(5)
+        raise ConnectionError("backend kapalı")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", fetch)
+        except ConnectionError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    wait_for_follower(flight)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["backend kapalı", "backend kapalı"]
+    # Hata sonrası anahtar serbest kalır, sonraki çağrı yeni istektir
+    assert flight.do("k", lambda: 1) == 1
+
+
+def test_async_leader_exception_reaches_followers():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ConnectionError("backend kapalı")
+
+    async def main():
+        return await asyncio.gather(flight.do("k", fetch), flight.do("k", fetch), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert [type(r) for r in results] == [ConnectionError, ConnectionError]
+    assert flight.stats == {"calls": 2, "coalesced": 1}
+
+
+def test_async_leader_cancellation_is_plain_error_for_followers():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(1)
+        return 1
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(RuntimeError):
+            await follower
+        assert leader.cancelled()
+
+    asyncio.run(main())
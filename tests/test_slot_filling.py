@@ -0,0 +1,104 @@
+from types import SimpleNamespace
+
+import pytest
+
+from slot_filling import (CONFIRMATION_SLOT, SlotFiller, parse_amount, parse_confirmation,
+                          parse_package_id, parse_payment_method, parse_period)
+
+TOOLS = {
+    "fatura_bilgi_al": SimpleNamespace(name="Fatura Bilgilerini Al", read_only=True,
+                                       parameters={"user_id": "string", "period": "string"}),
+    "odeme_islem": SimpleNamespace(name="Ödeme İşlemi", read_only=False,
+                                   parameters={"user_id": "string", "amount": "number", "payment_method": "string"}),
+}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Temmuz", "current"),
+    ("haziran", "last_3_months"),
+    ("Ocak ayının faturası", "last_6_months"),
+    ("son 3 ay", "last_3_months"),
+    ("son 6 ay", "last_6_months"),
+    ("bu ayki", "current"),
+    ("geçen ay", "last_3_months"),
+    ("bilmiyorum", None),
+])
+def test_parse_period(text, expected):
+    assert parse_period(text, month=7) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("250", 250.0),
+    ("250,50 TL", 250.5),
+    ("150.75 lira", 150.75),
+    ("250 TL ödemek istiyorum", 250.0),
+    ("Hayır, 2 faturayı birden ödemeyeceğim", None),
+    ("2 faturayı öde", None),
+    ("300 TL ödemek istemiyorum", None),
+    ("0", None),
+    ("iki yüz", None),
+])
+def test_parse_amount_accepts_only_explicit_amounts(text, expected):
+    assert parse_amount(text) == expected
+
+
+def test_parse_payment_method_and_package():
+    assert parse_payment_method("Kredi kartı ile") == "credit_card"
+    assert parse_payment_method("havale") == "bank_transfer"
+    assert parse_payment_method("kartla ödemeyeceğim") is None
+    assert parse_package_id("PN3 olsun") == "PN3"
+    assert parse_package_id("Premium 5G") == "PN2"
+    assert parse_package_id("öğrenci paketi") == "PN5"
+    assert parse_package_id("hiçbiri") is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("evet", True), ("Evet, onaylıyorum", True), ("tamam", True),
+    ("hayır", None), ("onaylamıyorum", None), ("olmaz", None), ("bilmem", None),
+])
+def test_parse_confirmation(text, expected):
+    assert parse_confirmation(text) is expected
+
+
+def test_read_tool_slot_asked_only_on_clarification():
+    filler, pending = SlotFiller(TOOLS), []
+    assert filler.open(pending, "fatura_sorgulama", ["fatura_bilgi_al"], {}) is None
+    assert filler.open(pending, "fatura_sorgulama", ["fatura_bilgi_al"], {}, clarification=True)
+    analysis = filler.resume(pending, "Haziran")
+    assert analysis["parameters"]["period"] in ("last_3_months", "last_6_months", "current")
+    assert analysis["slot_filled"] == "period"
+    assert CONFIRMATION_SLOT not in analysis["parameters"]
+    assert pending == []
+
+
+def test_unparseable_answer_drops_pending_action():
+    filler, pending = SlotFiller(TOOLS), []
+    filler.open(pending, "odeme_yapma", ["odeme_islem"], {})
+    assert filler.resume(pending, "Hayır, 2 faturayı birden ödemeyeceğim") is None
+    assert pending == []
+
+
+def test_write_tool_asks_each_slot_then_confirmation():
+    filler, pending = SlotFiller(TOOLS), []
+    assert filler.open(pending, "odeme_yapma", ["odeme_islem"], {"user_id": "u"}).startswith("Ne kadar")
+    analysis = filler.resume(pending, "250 TL")
+    question = filler.open(pending, analysis["intent"], analysis["required_tools"], analysis["parameters"])
+    assert question.startswith("Hangi yöntemle")
+
+    analysis = filler.resume(pending, "kredi kartı")
+    question = filler.open(pending, analysis["intent"], analysis["required_tools"], analysis["parameters"])
+    assert "Onaylıyor musunuz" in question and "250.0" in question
+    assert pending[0]["slot"] == CONFIRMATION_SLOT
+
+    analysis = filler.resume(pending, "evet")
+    assert filler.open(pending, analysis["intent"], analysis["required_tools"], analysis["parameters"]) is None
+    assert analysis["parameters"] == {"amount": 250.0, "payment_method": "credit_card", CONFIRMATION_SLOT: True}
+
+
+def test_declined_confirmation_cancels_write():
+    filler, pending = SlotFiller(TOOLS), []
+    filler.open(pending, "odeme_yapma", ["odeme_islem"], {"payment_method": "credit_card"})
+    analysis = filler.resume(pending, "100")
+    filler.open(pending, analysis["intent"], analysis["required_tools"], analysis["parameters"])
+    assert filler.resume(pending, "hayır vazgeçtim") is None
+    assert pending == []
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+import requests
+
+from central_agent import AgentConfig, CentralAgent
+from chat.llm_cache import LLMResponseCache
+from chat.ollama_client import OllamaClient
+
+ARAC_SONUCU = {"success": True, "result": "Fatura tutarı: 250 TL, Durum: Ödendi", "tool_used": "fatura_bilgi_al",
+               "data": None}
+HAM_YANIT = "Fatura tutarı: 250 TL, Durum: Ödendi\n\nBaşka bir isteğiniz var mı?"
+
+
+@pytest.mark.parametrize("chunks, strip_quotes, expected", [
+    (["  ", "\n Merhaba", " ", "dünya", "  ", "\n"], False, ["Merhaba", " dünya"]),
+    (["Mer", "haba ", " ", "dünya"], False, ["Mer", "haba", "  dünya"]),
+    ([' "', 'Faturanız 250 TL', '."', ' \n'], True, ["Faturanız 250 TL", "."]),
+    (['"Bir "', 'alıntı"'], True, ["Bir", ' "alıntı']),
+    (["  ", "\n"], False, []),
+])
+def test_strip_stream_across_chunk_boundaries(chunks, strip_quotes, expected):
+    assert list(CentralAgent._strip_stream(chunks, strip_quotes=strip_quotes)) == expected
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Ollama akışı yerine verilen parçaları (veya istisnaları) döndüren, önbellekli istemci"""
+    client = OllamaClient(cache=LLMResponseCache())
+    client.chunks = []
+
+    def iter_tokens(*args, **kwargs):
+        for chunk in client.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    monkeypatch.setattr(client, "_iter_tokens", iter_tokens)
+    return client
+
+
+def test_completed_stream_is_cached(client):
+    client.chunks = [" Merhaba", " dünya", " \n"]
+    assert "".join(client.chat_stream("prompt", call_site="summary")) == " Merhaba dünya \n"
+    assert client.cache.get(client._cache_key("prompt")) == "Merhaba dünya"
+    client.chunks = ["başka"]
+    assert list(client.chat_stream("prompt", call_site="summary")) == ["Merhaba dünya"]
+
+
+def test_aborted_stream_is_not_cached(client):
+    client.chunks = ["Merhaba", " dünya"]
+    stream = client.chat_stream("prompt", call_site="summary")
+    assert next(stream) == "Merhaba"
+    stream.close()
+    assert client.cache.get(client._cache_key("prompt")) is None
+
+
+def test_stream_broken_by_connection_error_is_not_cached(client):
+    client.chunks = ["Merhaba", requests.exceptions.ConnectionError("koptu")]
+    chunks = list(client.chat_stream("prompt", call_site="summary"))
+    assert chunks[0] == "Merhaba" and chunks[1].startswith("Ollama bağlantı hatası")
+    assert client.cache.get(client._cache_key("prompt")) is None
+
+
+def test_empty_stream_yields_notice_and_is_not_cached(client):
+    assert list(client.chat_stream("prompt", call_site="summary")) == ["Ollama'dan yanıt alınamadı."]
+    assert client.cache.get(client._cache_key("prompt")) is None
+
+
+@pytest.fixture
+def agent():
+    agent = CentralAgent(lambda *args, **kwargs: "", config=AgentConfig(
+        intent_classifier_path=None, llm_summarization=True, speculative_prefetch=False))
+    agent.sessions.get_or_create("u")
+    return agent
+
+
+@pytest.mark.parametrize("llm_chunks", [[], ["  ", "\n"]])
+def test_response_falls_back_to_tool_text_when_stream_yields_no_text(agent, llm_chunks):
+    agent._stream_llm = lambda *args, **kwargs: iter(llm_chunks)
+    state = agent.sessions.get("u")
+    chunks = list(agent._stream_response_with_context("faturam", [ARAC_SONUCU], state))
+    assert chunks == [HAM_YANIT]
+
+
+def test_async_response_falls_back_to_tool_text_on_blank_output(agent):
+    async def blank(*args, **kwargs):
+        return "  \n"
+
+    agent._allm_chat = blank
+    state = agent.sessions.get("u")
+    yanit = asyncio.run(agent._agenerate_response_with_context("faturam", [ARAC_SONUCU], state))
+    assert yanit == HAM_YANIT
+
+
+def test_chunks_reach_caller_before_stream_ends(agent):
+    received = []
+
+    def llm_stream(*args, **kwargs):
+        yield "Faturanız"
+        # Sonraki parça üretilmeden önceki parça çağırana ulaşmış olmalı
+        assert received == ["Faturanız"]
+        yield " 250 TL."
+
+    agent._stream_llm = llm_stream
+    state = agent.sessions.get("u")
+    for chunk in agent._stream_response_with_context("faturam", [ARAC_SONUCU], state):
+        received.append(chunk)
+    assert "".join(received) == "Faturanız 250 TL.\n\nBaşka bir isteğiniz var mı?"
@@ -0,0 +1,49 @@
+from tool_cache import ToolResultCache
+
+OK = {"success": True}
+
+
+def test_read_is_cached_until_ttl(clock):
+    cache = ToolResultCache(clock=clock)
+    cache.record("getBillingInfo", ("u", "current"), OK)
+    assert cache.get("getBillingInfo", "u", ("current",)) is OK
+    clock.now = 121
+    assert cache.get("getBillingInfo", "u", ("current",)) is None
+
+
+def test_failed_reads_are_not_cached():
+    cache = ToolResultCache()
+    cache.record("getUserInfo", ("u",), {"success": False})
+    assert cache.get("getUserInfo", "u") is None
+
+
+def test_successful_write_invalidates_only_affected_user_and_apis():
+    cache = ToolResultCache()
+    for user_id in ("u", "v"):
+        cache.record("getUserInfo", (user_id,), OK)
+        cache.record("getAvailablePackages", (user_id,), OK)
+    cache.record("processPayment", ("u", 100, "credit_card"), OK)
+    assert cache.get("getUserInfo", "u") is None
+    assert cache.get("getAvailablePackages", "u") is OK
+    assert cache.get("getUserInfo", "v") is OK
+
+
+def test_read_started_before_write_is_not_stored():
+    cache = ToolResultCache()
+    generation = cache.generation("u")
+    # Okuma sürerken ödeme tamamlanır
+    cache.record("processPayment", ("u", 250, "credit_card"), OK)
+    cache.record("getBillingInfo", ("u", "current"), {"success": True, "eski": True}, generation)
+    assert cache.get("getBillingInfo", "u", ("current",)) is None
+    assert cache.stats["stale_drops"] == 1
+
+    cache.record("getBillingInfo", ("u", "current"), OK, cache.generation("u"))
+    assert cache.get("getBillingInfo", "u", ("current",)) is OK
+
+
+def test_generation_is_per_user():
+    cache = ToolResultCache()
+    generation = cache.generation("v")
+    cache.record("resetPassword", ("u",), OK)
+    cache.record("getUserInfo", ("v",), OK, generation)
+    assert cache.get("getUserInfo", "v") is OK
@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+from deadline import Deadline
+from tool_executor import ToolExecutor
+
+READ_ONLY = {"musteri_bilgi_al", "fatura_bilgi_al", "paket_listesi_al"}
+
+
+class Recorder:
+    """Çağrıları kaydeden sahte araç çalıştırıcı; fail'deki araçlar başarısız döner"""
+
+    def __init__(self, fail=(), delays=None):
+        self.fail = set(fail)
+        self.delays = delays or {}
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, tool_name, parameters, user_id, deadline=None):
+        with self._lock:
+            self.calls.append(tool_name)
+        time.sleep(self.delays.get(tool_name, 0))
+        return {"success": tool_name not in self.fail, "tool_used": tool_name}
+
+    async def aexecute(self, tool_name, parameters, user_id, deadline=None):
+        self.calls.append(tool_name)
+        await asyncio.sleep(self.delays.get(tool_name, 0))
+        return {"success": tool_name not in self.fail, "tool_used": tool_name}
+
+
+def executor(recorder):
+    return ToolExecutor(recorder, lambda name: name in READ_ONLY, aexecute=recorder.aexecute)
+
+
+def test_results_keep_requested_order():
+    recorder = Recorder(delays={"musteri_bilgi_al": 0.05})
+    results = executor(recorder).run(["musteri_bilgi_al", "fatura_bilgi_al", "odeme_islem"], {}, "u")
+    assert [r["tool_used"] for r in results] == ["musteri_bilgi_al", "fatura_bilgi_al", "odeme_islem"]
+
+
+def test_writes_skipped_when_critical_lookup_fails():
+    recorder = Recorder(fail={"musteri_bilgi_al"})
+    results = executor(recorder).run(["musteri_bilgi_al", "odeme_islem", "fatura_bilgi_al"], {}, "u")
+    assert "odeme_islem" not in recorder.calls
+    assert [r["tool_used"] for r in results] == ["musteri_bilgi_al", "fatura_bilgi_al"]
+
+
+def test_async_writes_skipped_when_critical_lookup_fails():
+    recorder = Recorder(fail={"musteri_bilgi_al"})
+    results = asyncio.run(executor(recorder).arun(["musteri_bilgi_al", "paket_degistir"], {}, "u"))
+    assert "paket_degistir" not in recorder.calls
+    assert [r["tool_used"] for r in results] == ["musteri_bilgi_al"]
+
+
+def test_matching_prefetched_call_is_reused():
+    recorder = Recorder()
+    future = Future()
+    future.set_result({"success": True, "tool_used": "fatura_bilgi_al", "onceden": True})
+    prefetched = {"fatura_bilgi_al": ({"period": "current", "user_id": "u"}, future)}
+    results = executor(recorder).run(["fatura_bilgi_al"], {"period": "current"}, "u", prefetched=prefetched)
+    assert results[0]["onceden"]
+    assert recorder.calls == []
+
+
+def test_slow_read_returns_deadline_result():
+    recorder = Recorder(delays={"paket_listesi_al": 0.5})
+    results = executor(recorder).run(["paket_listesi_al"], {}, "u", deadline=Deadline(0.05))
+    assert results[0]["deadline_exceeded"]
+    assert not results[0]["success"]
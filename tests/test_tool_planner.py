@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from tool_planner import ToolPlanner
+
+
+def tool(read_only, latency, depends_on=()):
+    return SimpleNamespace(read_only=read_only, expected_latency=latency, depends_on=depends_on)
+
+
+TOOLS = {
+    "musteri_bilgi_al": tool(True, 0.3),
+    "fatura_bilgi_al": tool(True, 0.4),
+    "paket_listesi_al": tool(True, 0.5),
+    "bilgi_tabanı_ara": tool(True, 0.1),
+    "odeme_islem": tool(False, 0.8),
+    "paket_degistir": tool(False, 0.6, depends_on=("paket_listesi_al",)),
+    "sifre_sifirla": tool(False, 0.3),
+}
+
+
+def planner():
+    return ToolPlanner(TOOLS, critical_tools=("musteri_bilgi_al",))
+
+
+def test_unused_reads_become_fallbacks_slowest_first():
+    plan = planner().plan(["musteri_bilgi_al", "bilgi_tabanı_ara", "fatura_bilgi_al", "paket_listesi_al"])
+    assert plan.primary == "fatura_bilgi_al"
+    assert plan.tools == ["fatura_bilgi_al"]
+    assert plan.fallbacks == ["paket_listesi_al", "musteri_bilgi_al", "bilgi_tabanı_ara"]
+
+
+def test_fallback_only_needed_when_primary_fails():
+    plan = planner().plan(["musteri_bilgi_al", "fatura_bilgi_al"])
+    assert not plan.needs_fallback([{"success": True, "tool_used": "fatura_bilgi_al"}])
+    assert plan.needs_fallback([{"success": False, "tool_used": "fatura_bilgi_al"}])
+
+
+def test_writes_keep_critical_reads_and_run_after_reads():
+    plan = planner().plan(["odeme_islem", "fatura_bilgi_al", "musteri_bilgi_al"])
+    assert plan.primary == "odeme_islem"
+    assert plan.tools == ["musteri_bilgi_al", "odeme_islem"]
+    assert plan.fallbacks == ["fatura_bilgi_al"]
+
+
+def test_dependency_runs_before_dependent_tool():
+    plan = ToolPlanner(TOOLS, response_priority=()).plan(["paket_degistir", "paket_listesi_al"])
+    assert plan.primary is None
+    assert plan.tools == ["paket_listesi_al", "paket_degistir"]
+
+
+def test_exclusive_tool_wins_and_duplicates_are_dropped():
+    plan = planner().plan(["fatura_bilgi_al", "sifre_sifirla", "fatura_bilgi_al"])
+    assert plan.primary == "sifre_sifirla"
+    assert plan.tools == ["sifre_sifirla"]
+    assert plan.fallbacks == ["fatura_bilgi_al"]
+    assert plan.duplicates == ["fatura_bilgi_al"]
+
+
+def test_without_primary_all_reads_run_slowest_first():
+    plan = planner().plan(["bilgi_tabanı_ara", "paket_listesi_al"])
+    assert plan.primary is None
+    assert plan.tools == ["paket_listesi_al", "bilgi_tabanı_ara"]
+    assert plan.fallbacks == []